@@ -1,10 +1,11 @@
 import argparse
 import sys
-import pygraphviz as pgv
 from graph import Digraph, Graph, IGraph, IDirectedGraph, IWeightedGraph, WeightedDigraph, WeightedGraph
 
 
 def draw_graph(graph: IGraph, layout="circo"):
+    import pygraphviz as pgv  # pylint: disable=import-outside-toplevel
+
     directed = isinstance(graph, IDirectedGraph)
     weighted = isinstance(graph, IWeightedGraph)
 
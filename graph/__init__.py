@@ -1,3 +1,5 @@
+from .csr import CSRGraph
+from .bitset import BitsetGraph
 from .abstract_graphs import IGraph, IUndirectedGraph, IDirectedGraph, \
     IUnweightedGraph, IWeightedGraph
 from .graph import Graph
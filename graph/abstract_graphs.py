@@ -1,14 +1,59 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Any, Iterator, Self
+from io import StringIO
+from os import PathLike
+from typing import IO, Any, Callable, Iterator, Literal, NamedTuple, Self
+
+from graph.bitset import BitsetGraph
+from graph.csr import CSRGraph
+from graph.fingerprint import weisfeiler_lehman_fingerprint
+from graph.serialization import Source, iter_adjacency_list_lines, read_adjacency_list, \
+    read_binary, write_binary, write_lines
+
+EdgeIndexMode = Literal["lazy", "eager", "off"]
 
 
 class IGraph(ABC):
     """Abstract type for all graphs"""
 
+    is_directed: bool
+
     @abstractmethod
-    def __init__(self, adjacency_list: list[list[Any]]):
+    def __init__(self, adjacency_list: list[list[Any]], edge_index: EdgeIndexMode = "lazy"):
+        """edge_index controls the per-vertex hash index used for O(1) has_edge
+        and remove_edge: "eager" builds it immediately, "lazy" builds it on the
+        first membership query and "off" never builds it."""
+        self.edge_index_mode = edge_index
         self.adjacency_list = adjacency_list
+        if edge_index == "eager":
+            self._get_edge_index()
+
+    @property
+    def adjacency_list(self) -> list[list[Any]]:
+        if self._adjacency_list is None:
+            # the graph was loaded with from_csr_lazily()
+            self._adjacency_list = type(self).from_csr(self._source_csr).adjacency_list
+            self._source_csr = None
+        if self._stale_rows:
+            self._compact_rows()
+        return self._adjacency_list
+
+    @adjacency_list.setter
+    def adjacency_list(self, adjacency_list: list[list[Any]]):
+        self._adjacency_list: list[list[Any]] | None = adjacency_list
+        # CSR arrays the adjacency list is built from when first accessed
+        self._source_csr: CSRGraph | None = None
+        # derived properties, stored together with the version they were computed for
+        self._version = 0
+        self._cache: dict[str, tuple[int, Any]] = {}
+        # maps every neighbour of a vertex to its entry, in the order of the
+        # adjacency list
+        self._edge_index: list[dict[int, Any]] | None = None
+        # rows whose removed entries are so far only missing from the edge index
+        self._stale_rows: set[int] = set()
+        # set when the adjacency list contains parallel edges or loops, which
+        # can't be indexed by neighbour alone
+        self._edge_index_unusable = False
 
     @classmethod
     def empty(cls, vertex_count: int) -> Self:
@@ -16,6 +61,8 @@ class IGraph(ABC):
 
     @property
     def vertex_count(self) -> int:
+        if self._source_csr is not None:
+            return self._source_csr.vertex_count
         return len(self.adjacency_list)
 
     @property
@@ -27,97 +74,364 @@ class IGraph(ABC):
     def iter_adjacent(self, index) -> Iterator[Any]:
         return iter(self.adjacency_list[index])
 
+    def mark_modified(self):
+        """Invalidate all cached properties and the edge index. Code modifying
+        adjacency_list in place must call it afterwards; the methods of the
+        graph keep the edge index up to date themselves."""
+        self._bump_version()
+        self._drop_edge_index()
+        self._edge_index_unusable = False
+
+    def _bump_version(self):
+        """Invalidate all cached properties, called by every mutating method"""
+        self._version += 1
+
+    @property
+    def version(self) -> int:
+        """Number of modifications since adjacency_list was last assigned"""
+        return self._version
+
+    def _cached(self, name: str, compute: Callable[[], Any]) -> Any:
+        """Return a derived property, recomputing it only if the graph was
+        modified since it was last computed"""
+        entry = self._cache.get(name)
+        if entry is None or entry[0] != self._version:
+            entry = (self._version, compute())
+            self._cache[name] = entry
+        return entry[1]
+
+    @staticmethod
+    @abstractmethod
+    def _entry_vertex(entry) -> int:
+        """The vertex an adjacency list entry points to"""
+
+    @staticmethod
+    @abstractmethod
+    def _entry_position(row: list[Any], vertex: int) -> int:
+        """Position of the first entry of a row pointing to vertex, raises
+        ValueError if there is none"""
+
+    def _get_edge_index(self) -> list[dict[int, Any]] | None:
+        if (self._edge_index is None and self.edge_index_mode != "off"
+                and not self._edge_index_unusable):
+            entry_vertex = self._entry_vertex
+            edge_index = []
+            for row in self.adjacency_list:
+                entries = {entry_vertex(entry): entry for entry in row}
+                if len(entries) != len(row):
+                    self._edge_index_unusable = True
+                    return None
+                edge_index.append(entries)
+            self._edge_index = edge_index
+        return self._edge_index
+
+    def _compact_rows(self):
+        """Rewrite the rows with removals recorded only in the edge index"""
+        for vertex in self._stale_rows:
+            self._adjacency_list[vertex][:] = self._edge_index[vertex].values()
+        self._stale_rows.clear()
+
+    def _drop_edge_index(self):
+        if self._stale_rows:
+            self._compact_rows()
+        self._edge_index = None
+
+    def has_edge(self, vertex_a, vertex_b) -> bool:
+        """Check whether an edge from vertex_a to vertex_b exists"""
+        edge_index = self._get_edge_index()
+        if edge_index is None:
+            return any(self._entry_vertex(entry) == vertex_b
+                       for entry in self.adjacency_list[vertex_a])
+        return vertex_b in edge_index[vertex_a]
+
+    def _append_entry(self, vertex_a, vertex_b, entry):
+        """Add an entry pointing to vertex_b to the adjacency list of vertex_a"""
+        self._bump_version()
+        if self._edge_index is None:
+            self.adjacency_list[vertex_a].append(entry)
+            return
+
+        entries = self._edge_index[vertex_a]
+        if vertex_b in entries:
+            self._drop_edge_index()
+            self._edge_index_unusable = True
+        else:
+            entries[vertex_b] = entry
+        self._adjacency_list[vertex_a].append(entry)
+
+    def _remove_entry(self, vertex_a, vertex_b):
+        """Remove the first entry pointing to vertex_b from the adjacency list
+        of vertex_a, keeping the order of the remaining entries. The edge
+        index is used if it was already built: the entry is then removed from
+        it in O(1), and the row is rewritten from the index the next time
+        adjacency_list is read."""
+        self._bump_version()
+        if self._edge_index is None:
+            row = self.adjacency_list[vertex_a]
+            try:
+                del row[self._entry_position(row, vertex_b)]
+            except ValueError:
+                raise ValueError(f"there is no edge from {vertex_a} to {vertex_b}") from None
+            return
+
+        entries = self._edge_index[vertex_a]
+        if entries.pop(vertex_b, None) is None:
+            raise ValueError(f"there is no edge from {vertex_a} to {vertex_b}")
+        row = self._adjacency_list[vertex_a]
+        if len(row) > 2 * len(entries) + 8:
+            # removed entries are dropped once they make up half of the row
+            row[:] = entries.values()
+            self._stale_rows.discard(vertex_a)
+        else:
+            self._stale_rows.add(vertex_a)
+
+    def _remove_entries(self, vertex_a, vertex_b):
+        """Remove every entry pointing to vertex_b from the adjacency list of
+        vertex_a, if there are any, keeping the order of the remaining entries"""
+        if self._edge_index is not None:
+            # an indexed row has at most one such entry
+            if vertex_b in self._edge_index[vertex_a]:
+                self._remove_entry(vertex_a, vertex_b)
+            return
+        self._bump_version()
+        row = self.adjacency_list[vertex_a]
+        row[:] = [entry for entry in row if self._entry_vertex(entry) != vertex_b]
+
     @classmethod
     @abstractmethod
     def parse(cls, string) -> Self:
         pass
 
+    @classmethod
     @abstractmethod
+    def parse_file(cls, source: Source) -> Self:
+        """Parse a file object or the file at the given path"""
+
     def dump(self) -> str:
-        pass
+        string = StringIO()
+        self.dump_to(string)
+        return string.getvalue()
+
+    @abstractmethod
+    def dump_to(self, file: IO[str]):
+        """Write the graph to a text file object, one row at a time"""
+
+    @classmethod
+    def parse_binary(cls, source: Source) -> Self:
+        """Load a graph stored in the binary CSR format. The arrays stay memory
+        mapped, see from_csr_lazily()."""
+        return cls.from_csr_lazily(read_binary(source))
+
+    def dump_binary(self, file: str | PathLike | IO[bytes]):
+        """Store the graph in the binary CSR format, see read_binary"""
+        write_binary(self.to_csr(), file)
+
+    @abstractmethod
+    def to_csr(self) -> CSRGraph:
+        """Convert the graph into compressed sparse row form"""
+
+    @classmethod
+    @abstractmethod
+    def from_csr(cls, csr: CSRGraph) -> Self:
+        """Build a graph from its compressed sparse row form"""
+
+    @classmethod
+    def from_csr_lazily(cls, csr: CSRGraph) -> Self:
+        """Build a graph backed by CSR arrays, such as memory mapped ones from
+        read_binary(). The adjacency list is only built when first accessed;
+        until then vertex_count, edge_count, degrees, to_csr() and
+        dump_binary() are answered from the arrays without copying them."""
+        cls._check_csr(csr, weighted=issubclass(cls, IWeightedGraph))
+        graph = cls([])
+        graph._adjacency_list = None
+        graph._source_csr = csr
+        return graph
+
+    @classmethod
+    def _check_csr(cls, csr: CSRGraph, weighted: bool):
+        if csr.directed != cls.is_directed:
+            raise ValueError(
+                f"can't build {cls.__name__} from a CSRGraph with directed={csr.directed}")
+        if csr.is_weighted != weighted:
+            raise ValueError(
+                f"can't build {cls.__name__} from a CSRGraph with weighted={csr.is_weighted}")
+
+    def fingerprint(self, iterations: int = 3) -> int:
+        """Label-invariant 64-bit fingerprint of the graph, which can be used to
+        quickly rule out isomorphism, see weisfeiler_lehman_fingerprint"""
+        return self._cached(f"fingerprint_{iterations}", lambda: weisfeiler_lehman_fingerprint(
+            self.to_csr(), iterations))
 
     def __repr__(self):
         return f"{self.__class__.__name__}({self.adjacency_list})"
 
+    # subclasses defining __eq__ must restore it with __hash__ = IGraph.__hash__,
+    # as Python otherwise sets __hash__ to None
     def __hash__(self):
-        return hash(tuple(frozenset(inner_list) for inner_list in self.adjacency_list))
+        return self._cached("hash", lambda: hash(
+            tuple(frozenset(inner_list) for inner_list in self.adjacency_list)))
 
 
 class IUndirectedGraph(IGraph):
     """Abstract type for all undirected graphs"""
 
+    is_directed = False
+
     @property
     def edge_count(self) -> int:
-        return sum(map(len, self.adjacency_list)) // 2
+        if self._source_csr is not None:
+            return self._source_csr.edge_count
+        return self._cached("edge_count", lambda: sum(map(len, self.adjacency_list)) // 2)
 
     @property
     def vertex_degrees(self) -> list[int]:
-        return [len(inner_list) for inner_list in self.adjacency_list]
+        if self._source_csr is not None:
+            return self._source_csr.vertex_degrees.tolist()
+        # cached as a tuple, so callers modifying the returned list can't change it
+        return list(self._cached("vertex_degrees", lambda: tuple(map(len, self.adjacency_list))))
 
 
 class IDirectedGraph(IGraph):
     """Abstract type for all directed graphs"""
 
+    is_directed = True
+
     @property
     def edge_count(self) -> int:
-        return sum(map(len, self.adjacency_list))
+        if self._source_csr is not None:
+            return self._source_csr.edge_count
+        return self._cached("edge_count", lambda: sum(map(len, self.adjacency_list)))
+
+    @property
+    def out_degrees(self) -> list[int]:
+        if self._source_csr is not None:
+            return self._source_csr.vertex_degrees.tolist()
+        return list(self._cached("out_degrees", lambda: tuple(map(len, self.adjacency_list))))
 
 
 class IUnweightedGraph(IGraph):
     """Abstract type for all unweighted graphs"""
 
-    def __init__(self, adjacency_list: list[list[int]]):
-        self.adjacency_list = adjacency_list
+    def __init__(self, adjacency_list: list[list[int]], edge_index: EdgeIndexMode = "lazy"):
+        super().__init__(adjacency_list, edge_index)
 
     @classmethod
     def parse(cls, string: str) -> Self:
         """Parse raw string data into an IUnweightedGraph object"""
-        return cls([[int(value) for value in line.split()] for line in string.splitlines()])
+        return cls.parse_file(StringIO(string))
+
+    @classmethod
+    def parse_file(cls, source: Source) -> Self:
+        """Parse a file object or the file at the given path into an
+        IUnweightedGraph object. The input is read and tokenized in chunks."""
+        return cls.from_csr(read_adjacency_list(source, directed=cls.is_directed))
 
     def iter_adjacent(self, index) -> Iterator[int]:
         return iter(self.adjacency_list[index])
 
-    def dump(self) -> str:
-        string = ""
-        for row in self.adjacency_list:
-            string += " ".join(map(lambda v: f"{v}", row)) + "\n"
-        return string
+    @staticmethod
+    def _entry_vertex(entry) -> int:
+        return entry
+
+    @staticmethod
+    def _entry_position(row: list[int], vertex: int) -> int:
+        return row.index(vertex)
+
+    def dump_to(self, file: IO[str]):
+        write_lines(file, iter_adjacency_list_lines(self.adjacency_list))
+
+    def to_csr(self) -> CSRGraph:
+        if self._source_csr is not None:
+            return self._source_csr
+        return CSRGraph.from_adjacency_list(self.adjacency_list, directed=self.is_directed)
+
+    @classmethod
+    def from_csr(cls, csr: CSRGraph) -> Self:
+        cls._check_csr(csr, weighted=False)
+        return cls(csr.to_adjacency_list())
+
+    def to_bitset(self) -> BitsetGraph:
+        """Convert the graph into a bit matrix, see BitsetGraph"""
+        return BitsetGraph.from_csr(self.to_csr())
+
+    @classmethod
+    def from_bitset(cls, bitset: BitsetGraph) -> Self:
+        """Build a graph from a bit matrix, with sorted adjacency lists"""
+        return cls.from_csr(bitset.to_csr())
 
 
 class IWeightedGraph(IGraph):
     """Abstract type for all weighted graphs"""
 
-    class Adjacency:
-        """An entry in the adjacency list of a WeightedGraph"""
+    class Adjacency(NamedTuple):
+        """An entry in the adjacency list of a WeightedGraph.
 
-        def __init__(self, vertex, weight):
-            self.vertex = vertex
-            self.weight = weight
+        Entries are immutable tuples without a per-instance __dict__, so they
+        can be unpacked as (vertex, weight) pairs in tight loops."""
+
+        vertex: int
+        weight: Any
 
         def __repr__(self):
             return f"{self.vertex}:{self.weight}"
 
-    def __init__(self, adjacency_list: list[list[Adjacency]]):
-        self.adjacency_list = adjacency_list
+    def __init__(self, adjacency_list: list[list[Adjacency]], edge_index: EdgeIndexMode = "lazy"):
+        super().__init__(adjacency_list, edge_index)
 
     def iter_adjacent(self, index) -> Iterator[Adjacency]:
         return iter(self.adjacency_list[index])
 
+    @staticmethod
+    def _entry_vertex(entry) -> int:
+        return entry.vertex
+
+    @staticmethod
+    def _entry_position(row: list[Adjacency], vertex: int) -> int:
+        for position, (adjacent_vertex, _) in enumerate(row):
+            if adjacent_vertex == vertex:
+                return position
+        raise ValueError(f"{vertex} is not in the row")
+
+    def edge_weight(self, vertex_a, vertex_b) -> Any:
+        """Weight of the edge from vertex_a to vertex_b"""
+        edge_index = self._get_edge_index()
+        if edge_index is None:
+            for vertex, weight in self.adjacency_list[vertex_a]:
+                if vertex == vertex_b:
+                    return weight
+        elif vertex_b in edge_index[vertex_a]:
+            return edge_index[vertex_a][vertex_b].weight
+        raise ValueError(f"there is no edge from {vertex_a} to {vertex_b}")
+
     @classmethod
     def parse(cls, string: str) -> Self:
         """Parse raw string data into an IWeightedGraph object"""
+        return cls.parse_file(StringIO(string))
+
+    @classmethod
+    def parse_file(cls, source: Source) -> Self:
+        """Parse a file object or the file at the given path into an
+        IWeightedGraph object. The input is read and tokenized in chunks."""
+        return cls.from_csr(read_adjacency_list(
+            source, weighted=True, directed=cls.is_directed))
+
+    def dump_to(self, file: IO[str]):
+        write_lines(file, (" ".join(f"{vertex}:{weight}" for vertex, weight in row) + "\n"
+                           for row in self.adjacency_list))
+
+    def to_csr(self) -> CSRGraph:
+        if self._source_csr is not None:
+            return self._source_csr
+        return CSRGraph.from_adjacency_list(
+            [[vertex for vertex, _ in row] for row in self.adjacency_list],
+            [[weight for _, weight in row] for row in self.adjacency_list],
+            directed=self.is_directed)
+
+    @classmethod
+    def from_csr(cls, csr: CSRGraph) -> Self:
+        cls._check_csr(csr, weighted=True)
         adjacency_list = []
-        for line in string.splitlines():
-            adjacencies = []
-            for pair in line.split():
-                vertex, weight = map(int, pair.strip().split(":"))
-                adjacencies.append(IWeightedGraph.Adjacency(vertex, weight))
-            adjacency_list.append(adjacencies)
+        for vertices, weights in zip(csr.to_adjacency_list(), csr.to_weight_list()):
+            adjacency_list.append(
+                list(map(IWeightedGraph.Adjacency._make, zip(vertices, weights))))
         return cls(adjacency_list)
-
-    def dump(self) -> str:
-        string = ""
-        for row in self.adjacency_list:
-            string += " ".join(
-                map(lambda a: f"{a.vertex}:{a.weight}", row)) + "\n"
-        return string
@@ -0,0 +1,233 @@
+from __future__ import annotations
+from typing import Any, Self
+import numpy as np
+
+from graph.csr import CSRGraph, index_dtype
+
+# graphs with at least this fraction of all possible edges are dense enough
+# for BitsetGraph to pay off
+DENSITY_THRESHOLD = 0.3
+# number of bits converted at a time between CSR arrays and bit matrices
+CHUNK_SIZE = 1 << 24
+
+
+def density(vertex_count: int, edge_count: int, directed: bool = False) -> float:
+    """Fraction of all possible edges between distinct vertices which are present"""
+    pairs = vertex_count * (vertex_count - 1)
+    if not directed:
+        pairs //= 2
+    return edge_count / pairs if pairs else 0.0
+
+
+# number of set bits of every byte, for NumPy versions without np.bitwise_count
+_BYTE_POPCOUNTS = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+
+
+def _lookup_popcount(words: np.ndarray) -> np.ndarray:
+    """popcount() which sums the set bits of the 8 bytes of every word"""
+    words = np.ascontiguousarray(words, dtype=np.uint64)
+    counts = _BYTE_POPCOUNTS[words.view(np.uint8)].reshape(words.shape + (8,))
+    return counts.sum(axis=-1, dtype=np.uint8)
+
+
+def popcount(words: np.ndarray) -> np.ndarray:
+    """Number of set bits of every 64-bit word. np.bitwise_count needs NumPy
+    2.0, older versions fall back to a lookup table of bytes."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    return _lookup_popcount(words)
+
+
+def _bit_positions(vertices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Word index and bit mask of every vertex in a row"""
+    vertices = np.asarray(vertices, dtype=np.int64)
+    return vertices >> 6, np.left_shift(np.uint64(1), (vertices & 63).astype(np.uint64))
+
+
+class BitsetGraph:
+    """A graph stored as a bit matrix: bit j % 64 of words[i, j // 64] is set
+    when there is an edge from vertex i to vertex j.
+
+    Every row takes n / 8 bytes, so dense graphs take much less memory than
+    adjacency lists, and neighbourhood intersections, degrees and edge
+    lookups are a few vectorised word operations. Only simple graphs can be
+    represented: parallel edges are merged and a loop is a single bit."""
+
+    def __init__(self, words: Any, vertex_count: int, directed: bool = False):
+        self.words = np.asarray(words, dtype=np.uint64)
+        self.directed = directed
+        self._vertex_count = vertex_count
+
+        if self.words.shape != (vertex_count, -(-vertex_count // 64)):
+            raise ValueError("words must have one row of vertex_count bits for every vertex")
+
+    @classmethod
+    def empty(cls, vertex_count: int, directed: bool = False) -> Self:
+        return cls(np.zeros((vertex_count, -(-vertex_count // 64)), dtype=np.uint64),
+                   vertex_count, directed)
+
+    @classmethod
+    def from_csr(cls, csr: CSRGraph) -> Self:
+        if csr.is_weighted:
+            raise ValueError("can't build BitsetGraph from a weighted CSRGraph")
+        bitset = cls.empty(csr.vertex_count, csr.directed)
+        row_bits = bitset.words.shape[1] * 64
+        if row_bits == 0:
+            return bitset
+
+        # rows are filled in as boolean blocks of about CHUNK_SIZE entries and
+        # packed into words, which is much faster than setting single bits
+        indptr = csr.indptr
+        block_rows = max(1, CHUNK_SIZE // row_bits)
+        for start in range(0, csr.vertex_count, block_rows):
+            end = min(start + block_rows, csr.vertex_count)
+            block = np.zeros((end - start, row_bits), dtype=bool)
+            rows = np.repeat(np.arange(end - start), np.diff(indptr[start:end + 1]))
+            block[rows, csr.indices[indptr[start]:indptr[end]]] = True
+            bitset.words[start:end] = np.packbits(block, axis=1, bitorder="little") \
+                .view("<u8").astype(np.uint64)
+        return bitset
+
+    @classmethod
+    def from_adjacency_list(cls, adjacency_list: list[list[int]], directed: bool = False) -> Self:
+        return cls.from_csr(CSRGraph.from_adjacency_list(adjacency_list, directed=directed))
+
+    def to_csr(self) -> CSRGraph:
+        """Compressed sparse row form with sorted rows"""
+        vertex_count = self.vertex_count
+        degrees = self.vertex_degrees
+        indptr = np.zeros(vertex_count + 1, dtype=index_dtype(int(degrees.sum())))
+        np.cumsum(degrees, out=indptr[1:])
+        indices = np.empty(int(indptr[-1]), dtype=index_dtype(vertex_count))
+
+        # the set bits of every block are found in row-major order
+        row_bits = max(self.words.shape[1] * 64, 1)
+        block_rows = max(1, CHUNK_SIZE // row_bits)
+        for start in range(0, vertex_count, block_rows):
+            end = min(start + block_rows, vertex_count)
+            bits = np.unpackbits(self.words[start:end].astype("<u8").view(np.uint8),
+                                 bitorder="little")
+            indices[indptr[start]:indptr[end]] = np.flatnonzero(bits) % row_bits
+        return CSRGraph(indptr, indices, directed=self.directed)
+
+    def to_adjacency_list(self) -> list[list[int]]:
+        return self.to_csr().to_adjacency_list()
+
+    def masks(self) -> list[int]:
+        """Every row as a Python integer, with bit j set for neighbour j"""
+        data = self.words.astype("<u8").tobytes()
+        row_size = self.words.shape[1] * 8
+        if row_size == 0:
+            return []
+        return [int.from_bytes(data[start:start + row_size], "little")
+                for start in range(0, len(data), row_size)]
+
+    @property
+    def vertex_count(self) -> int:
+        return self._vertex_count
+
+    @property
+    def vertex_degrees(self) -> np.ndarray:
+        """Number of neighbours of every vertex, i.e. the popcount of every row"""
+        return popcount(self.words).sum(axis=1, dtype=np.int64)
+
+    @property
+    def edge_count(self) -> int:
+        total = int(self.vertex_degrees.sum())
+        if self.directed:
+            return total
+        loops = int(np.count_nonzero(self.has_edges(np.arange(self.vertex_count),
+                                                    np.arange(self.vertex_count))))
+        return (total + loops) // 2
+
+    @property
+    def density(self) -> float:
+        return density(self.vertex_count, self.edge_count, self.directed)
+
+    def has_edge(self, vertex_a: int, vertex_b: int) -> bool:
+        vertex_b = int(vertex_b)
+        return bool(int(self.words[vertex_a, vertex_b >> 6]) >> (vertex_b & 63) & 1)
+
+    def has_edges(self, vertices_a: Any, vertices_b: Any) -> np.ndarray:
+        """Vectorised has_edge() for parallel arrays of endpoints"""
+        word_indices, bits = _bit_positions(vertices_b)
+        return self.words[np.asarray(vertices_a, dtype=np.int64), word_indices] & bits != 0
+
+    def add_edges(self, vertices_a: Any, vertices_b: Any):
+        """Add edges given as parallel arrays of endpoints"""
+        self._update(vertices_a, vertices_b, add=True)
+
+    def remove_edges(self, vertices_a: Any, vertices_b: Any):
+        """Remove edges given as parallel arrays of endpoints"""
+        self._update(vertices_a, vertices_b, add=False)
+
+    def _update(self, vertices_a: Any, vertices_b: Any, add: bool):
+        vertices_a = np.asarray(vertices_a, dtype=np.int64)
+        vertices_b = np.asarray(vertices_b, dtype=np.int64)
+        if not self.directed:
+            vertices_a, vertices_b = (np.concatenate((vertices_a, vertices_b)),
+                                      np.concatenate((vertices_b, vertices_a)))
+        word_indices, bits = _bit_positions(vertices_b)
+        if add:
+            np.bitwise_or.at(self.words, (vertices_a, word_indices), bits)
+        else:
+            np.bitwise_and.at(self.words, (vertices_a, word_indices), ~bits)
+
+    def neighbours(self, vertex: int) -> np.ndarray:
+        return self._vertices(self.words[vertex])
+
+    def common_neighbours(self, vertex_a: int, vertex_b: int) -> np.ndarray:
+        return self._vertices(self.words[vertex_a] & self.words[vertex_b])
+
+    def common_neighbour_count(self, vertex_a: int, vertex_b: int) -> int:
+        return int(popcount(self.words[vertex_a] & self.words[vertex_b]).sum())
+
+    def _vertices(self, row: np.ndarray) -> np.ndarray:
+        """Indices of the set bits of a row"""
+        bits = np.unpackbits(row.astype("<u8").view(np.uint8), bitorder="little")
+        return np.flatnonzero(bits[:self.vertex_count])
+
+    def component_labels(self) -> np.ndarray:
+        """Labels of the (weakly) connected components, numbered in the order
+        of their smallest vertices. Every step of the breadth-first search
+        merges the rows of a whole frontier at once."""
+        words = self._symmetric_words() if self.directed else self.words
+
+        labels = np.full(self.vertex_count, -1, dtype=np.int64)
+        label = 0
+        for start in range(self.vertex_count):
+            if labels[start] != -1:
+                continue
+            reached = np.zeros(words.shape[1], dtype=np.uint64)
+            frontier = np.array([start])
+            while len(frontier):
+                labels[frontier] = label
+                word_indices, bits = _bit_positions(frontier)
+                np.bitwise_or.at(reached, word_indices, bits)
+                merged = np.bitwise_or.reduce(words[frontier], axis=0)
+                frontier = self._vertices(merged & ~reached)
+            label += 1
+        return labels
+
+    def _symmetric_words(self) -> np.ndarray:
+        """Words of the underlying undirected graph"""
+        csr = self.to_csr()
+        rows = np.repeat(np.arange(self.vertex_count, dtype=np.int64), csr.vertex_degrees)
+        symmetric = BitsetGraph(self.words.copy(), self.vertex_count)
+        symmetric.add_edges(csr.indices, rows)
+        return symmetric.words
+
+    @property
+    def nbytes(self) -> int:
+        return self.words.nbytes
+
+    def __repr__(self):
+        return (f"{self.__class__.__name__}(vertex_count={self.vertex_count}, "
+                f"edge_count={self.edge_count}, directed={self.directed})")
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, BitsetGraph):
+            return False
+        return self.directed == other.directed and np.array_equal(self.words, other.words)
+
+    __hash__ = None  # type: ignore
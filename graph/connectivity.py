@@ -0,0 +1,170 @@
+from __future__ import annotations
+from typing import Literal
+import numpy as np
+
+from graph.abstract_graphs import IUndirectedGraph
+from graph.csr import CSRGraph
+
+ComponentMethod = Literal["search", "propagation", "bitset"]
+
+
+class UnionFind:
+    """Disjoint sets of the integers [0, size), with path compression and
+    union by rank, so every operation takes near-constant amortised time"""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.rank = [0] * size
+        self.component_count = size
+
+    def __len__(self) -> int:
+        return len(self.parent)
+
+    def find(self, x: int) -> int:
+        """Representative of the set containing x"""
+        parent = self.parent
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, x: int, y: int) -> bool:
+        """Merge the sets containing x and y. Returns False if they already
+        were the same set."""
+        x_root = self.find(x)
+        y_root = self.find(y)
+        if x_root == y_root:
+            return False
+
+        if self.rank[x_root] < self.rank[y_root]:
+            x_root, y_root = y_root, x_root
+        self.parent[y_root] = x_root
+        if self.rank[x_root] == self.rank[y_root]:
+            self.rank[x_root] += 1
+        self.component_count -= 1
+        return True
+
+    def same(self, x: int, y: int) -> bool:
+        return self.find(x) == self.find(y)
+
+    def labels(self) -> np.ndarray:
+        """Component label of every element, components are numbered in the
+        order of their smallest elements"""
+        roots = np.array([self.find(x) for x in range(len(self.parent))], dtype=np.int64)
+        return _relabel(roots)
+
+
+def _relabel(labels: np.ndarray) -> np.ndarray:
+    """Renumber arbitrary labels to 0, 1, ... in the order of first occurrence"""
+    _, first, inverse = np.unique(labels, return_index=True, return_inverse=True)
+    order = np.empty(len(first), dtype=np.int64)
+    order[np.argsort(first)] = np.arange(len(first))
+    return order[inverse]
+
+
+def search_labels(adjacency_list: list[list[int]]) -> np.ndarray:
+    """Component labels found with an iterative breadth-first search, which
+    doesn't hit the recursion limit on long paths"""
+    labels = [-1] * len(adjacency_list)
+    label = 0
+    for start, start_label in enumerate(labels):
+        if start_label != -1:
+            continue
+        labels[start] = label
+        queue = [start]
+        for vertex in queue:
+            for adjacent_vertex in adjacency_list[vertex]:
+                if labels[adjacent_vertex] == -1:
+                    labels[adjacent_vertex] = label
+                    queue.append(adjacent_vertex)
+        label += 1
+    return np.array(labels, dtype=np.int64)
+
+
+def propagation_labels(csr: CSRGraph) -> np.ndarray:
+    """Component labels found with vectorised min-label propagation: every
+    vertex repeatedly takes the smallest label among itself and its
+    neighbours, and labels are followed to their own labels (pointer jumping)
+    so long paths converge in few rounds"""
+    vertex_count = csr.vertex_count
+    rows = np.repeat(np.arange(vertex_count, dtype=np.int64), csr.vertex_degrees)
+    columns = csr.indices.astype(np.int64)
+    if csr.directed:
+        rows, columns = np.concatenate((rows, columns)), np.concatenate((columns, rows))
+
+    labels = np.arange(vertex_count, dtype=np.int64)
+    while True:
+        updated = labels.copy()
+        np.minimum.at(updated, rows, labels[columns])
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            break
+        labels = updated
+
+    return _relabel(labels)
+
+
+def components_from_labels(labels: np.ndarray) -> list[list[int]]:
+    """Group vertices into a list of components by their labels"""
+    order = np.argsort(labels, kind="stable")
+    bounds = np.cumsum(np.bincount(labels)).tolist()
+    vertices = order.tolist()
+    return [vertices[start:end] for start, end in zip([0] + bounds, bounds)]
+
+
+class ConnectivityTracker:
+    """Connected components of an undirected graph, kept up to date as edges
+    are added.
+
+    The graph reports every added edge with edge_added(), which merges the
+    components of its endpoints in a UnionFind in near-constant amortised
+    time. Union-find can't split components, so removing an edge, or any
+    other modification which wasn't reported, makes the tracker stale and
+    the next query rebuilds it from the graph in O(n + m)."""
+
+    def __init__(self, graph: IUndirectedGraph):
+        self.graph = graph
+        self._rebuild()
+
+    def _rebuild(self):
+        labels = search_labels(self.graph.adjacency_list)
+        # every vertex points directly to the first vertex of its component
+        _, first = np.unique(labels, return_index=True)
+        sets = UnionFind(len(labels))
+        sets.parent = first[labels].tolist()
+        sets.rank = [0] * len(labels)
+        for root in first.tolist():
+            sets.rank[root] = 1
+        sets.component_count = len(first)
+
+        self._sets = sets
+        self._adjacency_list = self.graph.adjacency_list
+        self._version = self.graph.version
+
+    def _current_sets(self) -> UnionFind:
+        if self._adjacency_list is not self.graph.adjacency_list \
+                or self._version != self.graph.version:
+            self._rebuild()
+        return self._sets
+
+    def edge_added(self, vertex_a: int, vertex_b: int, previous_version: int):
+        """Update the components after an edge was added. previous_version is
+        the version of the graph before adding the edge; if the tracker
+        wasn't up to date then, it stays stale."""
+        if self._adjacency_list is self.graph.adjacency_list \
+                and self._version == previous_version:
+            self._sets.union(vertex_a, vertex_b)
+            self._version = self.graph.version
+
+    @property
+    def component_count(self) -> int:
+        return self._current_sets().component_count
+
+    def same_component(self, vertex_a: int, vertex_b: int) -> bool:
+        return self._current_sets().same(vertex_a, vertex_b)
+
+    def component_labels(self) -> np.ndarray:
+        """Component label of every vertex, see UnionFind.labels()"""
+        return self._current_sets().labels()
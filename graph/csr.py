@@ -0,0 +1,235 @@
+from __future__ import annotations
+from itertools import chain
+from typing import Any, Iterator, Self
+import numpy as np
+
+
+def index_dtype(max_value: int) -> np.dtype:
+    """Smallest signed integer type able to store indices up to max_value"""
+    if max_value < np.iinfo(np.int32).max:
+        return np.dtype(np.int32)
+    return np.dtype(np.int64)
+
+
+class CSRGraph:
+    """A read-only graph stored in compressed sparse row form.
+
+    The neighbours of vertex i are indices[indptr[i]:indptr[i + 1]] and, for
+    weighted graphs, the corresponding weights are stored at the same positions
+    in weights. Undirected graphs store every edge twice, once for each
+    endpoint, exactly like the adjacency lists of the other graph classes."""
+
+    def __init__(self, indptr: Any, indices: Any, weights: Any = None, directed: bool = False):
+        self.indptr = np.asarray(indptr)
+        self.indices = np.asarray(indices)
+        self.weights = None if weights is None else np.asarray(weights)
+        self.directed = directed
+
+        if self.indptr.ndim != 1 or len(self.indptr) == 0:
+            raise ValueError("indptr must be a non-empty one-dimensional array")
+        if self.indptr[-1] != len(self.indices):
+            raise ValueError("indptr[-1] must be equal to the number of indices")
+        if self.weights is not None and len(self.weights) != len(self.indices):
+            raise ValueError("weights and indices must have the same length")
+
+    @classmethod
+    def from_adjacency_list(cls, adjacency_list: list[list[int]],
+                            weights: list[list[Any]] | None = None,
+                            directed: bool = False) -> Self:
+        """Build CSR arrays from an adjacency list of vertex indices and an
+        optional parallel list of weights"""
+        row_lengths = np.fromiter(map(len, adjacency_list), dtype=np.int64,
+                                  count=len(adjacency_list))
+        entry_count = int(row_lengths.sum())
+
+        indptr = np.zeros(len(adjacency_list) + 1,
+                          dtype=index_dtype(entry_count))
+        np.cumsum(row_lengths, out=indptr[1:])
+        indices = np.fromiter(chain.from_iterable(adjacency_list),
+                              dtype=index_dtype(len(adjacency_list)), count=entry_count)
+
+        weight_array = None
+        if weights is not None:
+            weight_array = np.array(list(chain.from_iterable(weights)))
+            if weight_array.dtype.kind == "i" and len(weight_array) > 0:
+                limit = max(abs(int(weight_array.min())),
+                            abs(int(weight_array.max())))
+                weight_array = weight_array.astype(index_dtype(limit))
+            elif len(weight_array) == 0:
+                weight_array = weight_array.astype(np.int32)
+
+        return cls(indptr, indices, weight_array, directed)
+
+    @classmethod
+    def from_entries(cls, vertex_count: int, rows: Any, columns: Any, weights: Any = None,
+                     directed: bool = False) -> Self:
+        """Build CSR arrays from the coordinates of all adjacency entries. Every
+        entry is stored exactly once and the neighbours in each row are sorted."""
+        rows = np.asarray(rows, dtype=np.int64)
+        columns = np.asarray(columns, dtype=np.int64)
+
+        indptr = np.zeros(vertex_count + 1, dtype=index_dtype(len(rows)))
+        np.cumsum(np.bincount(rows, minlength=vertex_count), out=indptr[1:])
+
+        # sorting a single combined key is much faster than a lexsort
+        keys = rows * max(vertex_count, 1) + columns
+        if weights is None:
+            keys.sort()
+            indices = keys % max(vertex_count, 1)
+        else:
+            order = np.argsort(keys, kind="stable")
+            indices = columns[order]
+            weights = np.asarray(weights)[order]
+        return cls(indptr, indices.astype(index_dtype(vertex_count)), weights, directed)
+
+    @classmethod
+    def from_edges(cls, vertex_count: int, sources: Any, targets: Any, weights: Any = None,
+                   directed: bool = False) -> Self:
+        """Build CSR arrays from a list of edges given as parallel arrays of
+        endpoints. Edges of undirected graphs are stored for both endpoints."""
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        if not directed:
+            sources, targets = (np.concatenate((sources, targets)),
+                                np.concatenate((targets, sources)))
+            if weights is not None:
+                weights = np.concatenate((weights, weights))
+        return cls.from_entries(vertex_count, sources, targets, weights, directed)
+
+    @classmethod
+    def from_incidence(cls, vertex_count: int, vertices: Any, edges: Any) -> Self:
+        """Build an undirected graph from the coordinates of the ones in an
+        incidence matrix, given as parallel arrays of row (vertex) and column
+        (edge) indices. Only the first two ones of every column define an edge."""
+        vertices = np.asarray(vertices, dtype=np.int64)
+        edges = np.asarray(edges, dtype=np.int64)
+        # lexsort keeps the vertices of every column in increasing order
+        order = np.lexsort((vertices, edges))
+        vertices = vertices[order]
+        edges = edges[order]
+
+        # keep the first two ones of every column which has at least two
+        first = np.flatnonzero(np.concatenate(([True], edges[1:] != edges[:-1])))
+        first = first[first + 1 < len(edges)]
+        first = first[edges[first] == edges[first + 1]]
+
+        return cls.from_edges(vertex_count, vertices[first], vertices[first + 1])
+
+    @property
+    def vertex_count(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def edge_count(self) -> int:
+        if self.directed:
+            return len(self.indices)
+        return len(self.indices) // 2
+
+    @property
+    def is_weighted(self) -> bool:
+        return self.weights is not None
+
+    @property
+    def vertex_degrees(self) -> np.ndarray:
+        """Number of entries in every row, i.e. the (out-)degree of every vertex"""
+        return np.diff(self.indptr)
+
+    def edge_ids(self) -> np.ndarray:
+        """Index of the edge every entry belongs to. The two entries of an
+        undirected edge share an index, and parallel edges are paired up in
+        the order they appear in the rows, so the ids are in [0, edge_count)."""
+        if self.directed:
+            return np.arange(len(self.indices), dtype=np.int64)
+
+        vertex_count = max(self.vertex_count, 1)
+        rows = np.repeat(np.arange(self.vertex_count, dtype=np.int64), self.vertex_degrees)
+        columns = self.indices.astype(np.int64)
+        keys = np.minimum(rows, columns) * vertex_count + np.maximum(rows, columns)
+        # entries are ordered by row, so a stable sort keeps the entries of the
+        # smaller endpoint first within every group of equal keys
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+
+        group_starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        group_sizes = np.diff(np.append(group_starts, len(keys)))
+        offsets = np.arange(len(keys)) - np.repeat(group_starts, group_sizes)
+        sorted_ids = (np.repeat(group_starts // 2, group_sizes)
+                      + offsets % np.repeat(np.maximum(group_sizes // 2, 1), group_sizes))
+
+        ids = np.empty(len(keys), dtype=np.int64)
+        ids[order] = sorted_ids
+        return ids
+
+    def transpose(self) -> Self:
+        """Graph with every edge reversed, the rows of which list their
+        neighbours in the order of the original rows. Undirected graphs are
+        returned unchanged.
+
+        Entries are ordered by their columns with a stable LSD radix sort on
+        16-bit digits, each pass of which is a linear-time counting sort, so
+        the whole transpose takes O(n + m)."""
+        if not self.directed:
+            return self
+
+        vertex_count = self.vertex_count
+        columns = self.indices.astype(np.int64)
+        order = np.arange(len(columns))
+        for shift in range(0, max(vertex_count - 1, 1).bit_length(), 16):
+            digits = (columns[order] >> shift & 0xFFFF).astype(np.uint16)
+            order = order[np.argsort(digits, kind="stable")]
+
+        rows = np.repeat(np.arange(vertex_count, dtype=self.indices.dtype), self.vertex_degrees)
+        indptr = np.zeros(vertex_count + 1, dtype=self.indptr.dtype)
+        np.cumsum(np.bincount(columns, minlength=vertex_count), out=indptr[1:])
+        weights = None if self.weights is None else self.weights[order]
+        return type(self)(indptr, rows[order], weights, directed=True)
+
+    def iter_adjacent(self, index) -> Iterator[Any]:
+        """Iterate over the neighbours of a vertex. Weighted graphs yield
+        (vertex, weight) pairs instead of bare vertex indices."""
+        start, end = int(self.indptr[index]), int(self.indptr[index + 1])
+        if self.weights is None:
+            return iter(self.indices[start:end].tolist())
+        return zip(self.indices[start:end].tolist(), self.weights[start:end].tolist())
+
+    def to_adjacency_list(self) -> list[list[int]]:
+        """Convert the indices back into a list of lists of vertex indices"""
+        flat = self.indices.tolist()
+        bounds = self.indptr.tolist()
+        return [flat[start:end] for start, end in zip(bounds, bounds[1:])]
+
+    def to_weight_list(self) -> list[list[Any]]:
+        """Convert the weights into a list of lists parallel to to_adjacency_list()"""
+        if self.weights is None:
+            raise ValueError("graph is not weighted")
+        flat = self.weights.tolist()
+        bounds = self.indptr.tolist()
+        return [flat[start:end] for start, end in zip(bounds, bounds[1:])]
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the underlying arrays in bytes"""
+        size = self.indptr.nbytes + self.indices.nbytes
+        if self.weights is not None:
+            size += self.weights.nbytes
+        return size
+
+    def __repr__(self):
+        return (f"{self.__class__.__name__}(vertex_count={self.vertex_count}, "
+                f"edge_count={self.edge_count}, directed={self.directed}, "
+                f"weighted={self.is_weighted})")
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CSRGraph):
+            return False
+
+        if self.directed != other.directed or self.is_weighted != other.is_weighted:
+            return False
+
+        if not (np.array_equal(self.indptr, other.indptr)
+                and np.array_equal(self.indices, other.indices)):
+            return False
+
+        return self.weights is None or np.array_equal(self.weights, other.weights)
+
+    __hash__ = None  # type: ignore
@@ -0,0 +1,144 @@
+from __future__ import annotations
+from itertools import accumulate
+from typing import Any
+import numpy as np
+
+SHORT_SEQUENCE_LENGTH = 64
+
+
+def are_graphic(sequences: Any) -> np.ndarray:
+    """Check which rows of a 2-D array are graphic sequences, i.e. can be the
+    sequences of degrees of some graphs. Returns a boolean array with one
+    value for every row.
+
+    Every row is sorted with a counting sort and checked against the
+    Erdős–Gallai inequalities
+        d_1 + ... + d_k <= k(k - 1) + min(d_k+1, k) + ... + min(d_n, k)
+    for all k at once using prefix sums, so the cost is linear in the size
+    of the array."""
+    sequences = np.asarray(sequences, dtype=np.int64)
+    if sequences.ndim != 2:
+        raise ValueError("sequences must be a two-dimensional array")
+
+    row_count, n = sequences.shape
+    if n == 0:
+        # a sequence of length 0 is always graphic
+        return np.ones(row_count, dtype=bool)
+
+    # degrees must be in [0, n) and their sum must be even
+    valid = ((sequences >= 0) & (sequences < n)).all(axis=1)
+    valid &= sequences.sum(axis=1) % 2 == 0
+    sequences = np.clip(sequences, 0, n - 1)
+
+    # counts[r, j] is the number of vertices with degree j in row r
+    offsets = np.arange(row_count, dtype=np.int64)[:, None] * n
+    counts = np.bincount((sequences + offsets).ravel(),
+                         minlength=row_count * n).reshape(row_count, n)
+
+    # counting sort of every row in non-increasing order
+    degrees = np.repeat(np.tile(np.arange(n - 1, -1, -1, dtype=np.int64), row_count),
+                        counts[:, ::-1].ravel()).reshape(row_count, n)
+
+    # prefix_sums[r, k] = d_1 + ... + d_k
+    prefix_sums = np.zeros((row_count, n + 1), dtype=np.int64)
+    np.cumsum(degrees, axis=1, out=prefix_sums[:, 1:])
+
+    # at_least[r, j] is the number of vertices with degree >= j, so the sum of
+    # min(d_i, k) over all vertices is at_least[r, 1] + ... + at_least[r, k]
+    at_least = np.zeros((row_count, n + 1), dtype=np.int64)
+    at_least[:, :n] = np.cumsum(counts[:, ::-1], axis=1)[:, ::-1]
+    min_sums = np.cumsum(at_least, axis=1) - at_least[:, :1]
+
+    # the first min(k, at_least[k]) of the k largest degrees are capped at k
+    k = np.arange(n + 1, dtype=np.int64)
+    capped = np.minimum(k, at_least)
+    head_min_sums = k * capped + prefix_sums - np.take_along_axis(prefix_sums, capped, axis=1)
+
+    bound = k * (k - 1) + min_sums - head_min_sums
+    return valid & (prefix_sums[:, 1:] <= bound[:, 1:]).all(axis=1)
+
+
+def is_graphic(sequence: list[int]) -> bool:
+    """Check whether or not a sequence is a graphic sequence, see are_graphic().
+    Short sequences are checked in pure Python, where the overhead of numpy
+    calls would dominate."""
+    n = len(sequence)
+    if n > SHORT_SEQUENCE_LENGTH:
+        return bool(are_graphic(np.asarray(sequence, dtype=np.int64).reshape(1, -1))[0])
+
+    counts = [0] * (n + 1)
+    for degree in sequence:
+        if degree < 0 or degree >= n:
+            return False
+        counts[degree] += 1
+
+    if sum(sequence) % 2 == 1:
+        return False
+
+    degrees = [d for d in range(n - 1, -1, -1) for _ in range(counts[d])]
+    prefix_sums = list(accumulate(degrees, initial=0))
+    at_least = list(accumulate(reversed(counts)))[::-1]
+
+    min_sum = 0
+    for k in range(1, n + 1):
+        min_sum += at_least[k]
+        capped = min(k, at_least[k])
+        head_min_sum = k * capped + prefix_sums[k] - prefix_sums[capped]
+        if prefix_sums[k] > k * (k - 1) + min_sum - head_min_sum:
+            return False
+    return True
+
+
+def havel_hakimi_edges(sequence: list[int]) -> tuple[np.ndarray, np.ndarray] | None:
+    """Edges of a graph with the given sequence of degrees, as parallel arrays
+    of endpoints, or None if the sequence isn't graphic.
+
+    Havel–Hakimi repeatedly connects the vertex with the largest remaining
+    degree d to the d vertices with the next largest remaining degrees.
+    Vertices are kept in buckets by remaining degree, so every step only
+    touches the buckets it takes vertices from and the whole construction
+    runs in O(n + m)."""
+    n = len(sequence)
+    if any(degree < 0 or degree >= n for degree in sequence) or sum(sequence) % 2 == 1:
+        return None
+
+    # buckets[d] holds the vertices with d incident edges still missing
+    buckets: list[list[int]] = [[] for _ in range(n)]
+    for vertex, degree in enumerate(sequence):
+        if degree > 0:
+            buckets[degree].append(vertex)
+
+    sources: list[int] = []
+    targets: list[int] = []
+    top = n - 1
+    while True:
+        while top > 0 and not buckets[top]:
+            top -= 1
+        if top == 0:
+            return (np.array(sources, dtype=np.int64),
+                    np.array(targets, dtype=np.int64))
+
+        vertex = buckets[top].pop()
+        missing = top
+        taken = []
+        level = top
+        while missing > 0 and level > 0:
+            bucket = buckets[level]
+            count = min(missing, len(bucket))
+            if count > 0:
+                taken.append((level, bucket[len(bucket) - count:]))
+                del bucket[len(bucket) - count:]
+                missing -= count
+            level -= 1
+
+        if missing > 0:
+            # not enough vertices are left to connect to
+            return None
+
+        # taken vertices are only moved once all of them are chosen, so none of
+        # them gets picked twice
+        for level, neighbours in taken:
+            if level > 1:
+                buckets[level - 1].extend(neighbours)
+            sources.extend([vertex] * len(neighbours))
+            targets.extend(neighbours)
@@ -1,80 +1,114 @@
 from __future__ import annotations
 import random
 import numpy as np
-from typing import Self
+from typing import Iterator, Self
 
-from graph import IDirectedGraph, IUnweightedGraph
+from graph import CSRGraph, IDirectedGraph, IGraph, IUnweightedGraph
+from graph.sampling import decode_ordered_pairs, sample_bernoulli
 
 
 class Digraph(IDirectedGraph, IUnweightedGraph):
     """A directed graph, stored as an adjacency list"""
 
     def add_edge(self, vertex_a, vertex_b):
-        self.adjacency_list[vertex_a].append(vertex_b)
+        previous_version = self.version
+        self._append_entry(vertex_a, vertex_b, vertex_b)
+        predecessor_lists = self._current_predecessor_lists(previous_version)
+        if predecessor_lists is not None:
+            predecessor_lists[vertex_b].append(vertex_a)
 
     def remove_edge(self, vertex_a, vertex_b):
-        self.adjacency_list[vertex_a].remove(vertex_b)
+        previous_version = self.version
+        self._remove_entry(vertex_a, vertex_b)
+        predecessor_lists = self._current_predecessor_lists(previous_version)
+        if predecessor_lists is not None:
+            predecessor_lists[vertex_b].remove(vertex_a)
+
+    def _current_predecessor_lists(self, previous_version: int) -> list[list[int]] | None:
+        """The cached predecessor lists, if they were up to date before the
+        last modification, restamped with the current version"""
+        entry = self._cache.get("predecessor_lists")
+        if entry is None or entry[0] != previous_version:
+            return None
+        self._cache["predecessor_lists"] = (self.version, entry[1])
+        return entry[1]
+
+    @property
+    def predecessor_lists(self) -> list[list[int]]:
+        """The in-adjacency list: for every vertex, the vertices with an edge
+        to it. It is built with a CSR transpose when first needed and then
+        kept up to date by add_edge() and remove_edge(); other modifications
+        make it rebuild on the next access."""
+        return self._cached("predecessor_lists",
+                            lambda: self.to_csr().transpose().to_adjacency_list())
+
+    def iter_predecessors(self, index) -> Iterator[int]:
+        return iter(self.predecessor_lists[index])
+
+    @property
+    def in_degrees(self) -> list[int]:
+        return list(self._cached("in_degrees", lambda: tuple(map(len, self.predecessor_lists))))
 
     @classmethod
-    def generate_with_gnp_model(cls, n: int, p: float) -> Self:
-        """Generate digraph using probability"""
-        output = [[] for _ in range(n)]
+    def generate_with_gnp_model(cls, n: int, p: float,
+                                rng: np.random.Generator | None = None) -> Self:
+        """Generate digraph using probability.
+        Ordered vertex pairs are skipped with geometrically distributed gaps, so
+        the expected cost is O(n + m) instead of one random draw per pair."""
+        if p < 0 or p > 1:
+            raise ValueError("p < 0 or p > 1")
 
-        for i in range(n):
-            for j in range(n):
-                if random.random() <= p and j != i:
-                    output[i].append(j)
+        if n < 0:
+            raise ValueError("n < 0")
 
-        return cls(output)
+        if rng is None:
+            rng = np.random.default_rng()
+
+        sources, targets = decode_ordered_pairs(n, sample_bernoulli(n * (n - 1), p, rng))
+        return cls.from_csr(CSRGraph.from_edges(n, sources, targets, directed=True))
 
     def transpose(self) -> Self:
-        edges = [(vertex_a, vertex_b) for vertex_a in range(
-            self.vertex_count) for vertex_b in self.iter_adjacent(vertex_a)]
-        transposed_graph = Digraph.empty(self.vertex_count)
-        for edge in edges:
-            transposed_graph.add_edge(edge[1], edge[0])
-        return transposed_graph
+        """Digraph with every edge reversed, see CSRGraph.transpose()"""
+        return type(self).from_csr(self.to_csr().transpose())
 
     def find_strongly_connected_components(self) -> set[frozenset[int]]:
-        # the order needs to be tracked, but a seperate set object is also
-        # used to have O(1) lookup
-        visited_vertices = set()
-        visited_vertices_in_order = []
-
-        def visit_recursively(vertex: int):
-            if vertex in visited_vertices:
-                return
-            visited_vertices.add(vertex)
-
-            for adjacent_vertex in self.iter_adjacent(vertex):
-                visit_recursively(adjacent_vertex)
-
-            visited_vertices_in_order.append(vertex)
-
+        """Kosaraju's algorithm with iterative depth-first searches: vertices
+        are ordered by the time their search finishes, then searched in reverse
+        order over the predecessor lists, which reach exactly the strongly
+        connected component of every new start vertex."""
+        adjacency_list = self.adjacency_list
+        visited = [False] * self.vertex_count
+        finished_in_order = []
         for start_vertex in range(self.vertex_count):
-            visit_recursively(start_vertex)
-
-        transposed_graph = self.transpose()
-        visited_vertices = set()
+            if visited[start_vertex]:
+                continue
+            visited[start_vertex] = True
+            stack = [(start_vertex, iter(adjacency_list[start_vertex]))]
+            while stack:
+                vertex, remaining = stack[-1]
+                for adjacent_vertex in remaining:
+                    if not visited[adjacent_vertex]:
+                        visited[adjacent_vertex] = True
+                        stack.append((adjacent_vertex, iter(adjacency_list[adjacent_vertex])))
+                        break
+                else:
+                    stack.pop()
+                    finished_in_order.append(vertex)
+
+        predecessor_lists = self.predecessor_lists
+        assigned = [False] * self.vertex_count
         components = set()
-
-        def get_components_recursively(vertex: int, component: set | None = None):
-            if vertex in visited_vertices:
-                return component
-            visited_vertices.add(vertex)
-
-            if component is None:
-                component = set()
-
-            component.add(vertex)
-            for adjacent_vertex in transposed_graph.iter_adjacent(vertex):
-                get_components_recursively(adjacent_vertex, component)
-            return component
-
-        for start_vertex in reversed(visited_vertices_in_order):
-            component = get_components_recursively(start_vertex)
-            if component is not None:
-                components.add(frozenset(component))
+        for start_vertex in reversed(finished_in_order):
+            if assigned[start_vertex]:
+                continue
+            assigned[start_vertex] = True
+            component = [start_vertex]
+            for vertex in component:
+                for predecessor in predecessor_lists[vertex]:
+                    if not assigned[predecessor]:
+                        assigned[predecessor] = True
+                        component.append(predecessor)
+            components.add(frozenset(component))
         return components
 
     def PageRank_Random(self, N: int):
@@ -83,7 +117,7 @@ class Digraph(IDirectedGraph, IUnweightedGraph):
         choice = random.randint(0, self.vertex_count-1)
         d = 0.15
 
-        if any(len(self.adjacency_list[i]) == 0 for i in range(self.vertex_count)):
+        if min(self.out_degrees, default=0) == 0:
             raise ValueError("at least one vertex is of degree 0")
 
         for _ in range(N):
@@ -114,7 +148,7 @@ class Digraph(IDirectedGraph, IUnweightedGraph):
                 v = self.adjacency_list[i][j]
                 adj_mat[i][v] = 1
 
-        v_degrees = [len(self.adjacency_list[i]) for i in range(self.vertex_count)]
+        v_degrees = self.out_degrees
 
         if min(v_degrees) == 0:
             raise ValueError("at least one vertex is of degree 0")
@@ -158,6 +192,8 @@ class Digraph(IDirectedGraph, IUnweightedGraph):
 
         return True
 
+    __hash__ = IGraph.__hash__
+
 
 if __name__ == "__main__":
     pass
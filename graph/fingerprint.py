@@ -0,0 +1,70 @@
+from __future__ import annotations
+import numpy as np
+
+from graph.csr import CSRGraph
+
+_OUT_SALT = np.uint64(0x9E3779B97F4A7C15)
+_IN_SALT = np.uint64(0xC2B2AE3D27D4EB4F)
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    """splitmix64 finaliser, a cheap bijective scrambling of 64-bit values"""
+    values = values.astype(np.uint64, copy=True)
+    values ^= values >> np.uint64(30)
+    values *= np.uint64(0xBF58476D1CE4E5B9)
+    values ^= values >> np.uint64(27)
+    values *= np.uint64(0x94D049BB133111EB)
+    values ^= values >> np.uint64(31)
+    return values
+
+
+def _weight_hashes(weights: np.ndarray) -> np.ndarray:
+    if weights.dtype.kind == "f":
+        return _mix(weights.astype(np.float64).view(np.uint64))
+    return _mix(weights.astype(np.int64).view(np.uint64))
+
+
+def weisfeiler_lehman_fingerprint(csr: CSRGraph, iterations: int = 3) -> int:
+    """Label-invariant 64-bit fingerprint of a graph, computed with
+    Weisfeiler-Lehman colour refinement.
+
+    Every vertex starts with a colour derived from its degree. In every
+    iteration its colour is replaced by a hash of the old colour and the
+    multiset of (neighbour colour, edge weight) pairs, aggregated with a
+    commutative sum so the order of neighbours doesn't matter. The
+    fingerprint is the hash of the multiset of final colours.
+
+    Isomorphic graphs always have equal fingerprints, so different
+    fingerprints prove two graphs are not isomorphic. Equal fingerprints
+    must be confirmed by an exact isomorphism check."""
+    vertex_count = csr.vertex_count
+    rows = np.repeat(np.arange(vertex_count, dtype=np.int64), csr.vertex_degrees)
+    columns = csr.indices.astype(np.int64)
+    entry_hashes = None if csr.weights is None else _weight_hashes(csr.weights)
+
+    with np.errstate(over="ignore"):
+        colours = _mix(csr.vertex_degrees.astype(np.uint64))
+        if csr.directed:
+            in_degrees = np.bincount(columns, minlength=vertex_count)
+            colours = _mix(colours ^ _mix(in_degrees.astype(np.uint64) + _IN_SALT))
+
+        for _ in range(iterations):
+            out_signatures = colours[columns] + _OUT_SALT
+            if entry_hashes is not None:
+                out_signatures = out_signatures ^ entry_hashes
+            aggregate = np.zeros(vertex_count, dtype=np.uint64)
+            np.add.at(aggregate, rows, _mix(out_signatures))
+
+            if csr.directed:
+                in_signatures = colours[rows] + _IN_SALT
+                if entry_hashes is not None:
+                    in_signatures = in_signatures ^ entry_hashes
+                np.add.at(aggregate, columns, _mix(in_signatures))
+
+            colours = _mix(_mix(colours) + aggregate)
+
+        fingerprint = np.zeros(1, dtype=np.uint64)
+        for value in [vertex_count, len(columns), int(csr.directed),
+                      _mix(colours).sum(dtype=np.uint64)]:
+            fingerprint = _mix(fingerprint + np.uint64(value))
+        return int(fingerprint[0])
@@ -1,10 +1,38 @@
 from __future__ import annotations
-from typing import Iterator, Literal, Self
-import random
+from io import StringIO
+from typing import IO, Any, Iterator, Literal, Self
 import warnings
 import numpy as np
 
-from graph import IUndirectedGraph, IUnweightedGraph
+from graph import CSRGraph, IGraph, IUndirectedGraph, IUnweightedGraph
+from graph.clustering import local_clustering, transitivity, triangle_counts
+from graph.connectivity import ComponentMethod, ConnectivityTracker, \
+    components_from_labels, propagation_labels, search_labels
+from graph.degree_sequences import are_graphic, havel_hakimi_edges, is_graphic
+from graph.hamiltonian import DEFAULT_SPLIT_DEPTH, find_hamiltonian_cycle
+from graph.randomization import SwapStatistics, double_edge_swap
+from graph.sampling import (decode_pairs, pair_count, sample_bernoulli, sample_distinct,
+                            sample_euler_edges, sample_regular_edges)
+from graph.serialization import Source, iter_adjacency_list_lines, \
+    iter_adjacency_matrix_lines, iter_incidence_matrix_lines, read_adjacency_list, \
+    read_adjacency_matrix, read_binary, read_incidence_matrix, write_binary, write_lines
+
+Representation = Literal["adjlist", "adjmatrix", "incmatrix", "binary"]
+
+
+def _scipy_sparse():
+    """scipy is only needed for sparse matrix output, so it's imported on demand"""
+    try:
+        import scipy.sparse  # pylint: disable=import-outside-toplevel
+    except ImportError as error:
+        raise ImportError("sparse matrices require scipy to be installed") from error
+    return scipy.sparse
+
+
+def _as_matrix(input: list[list[int]] | np.ndarray) -> np.ndarray:
+    if len(input) == 0:
+        return np.zeros((0, 0), dtype=np.int8)
+    return np.asarray(input)
 
 
 class Graph(IUndirectedGraph, IUnweightedGraph):
@@ -16,52 +44,86 @@ class Graph(IUndirectedGraph, IUnweightedGraph):
                 if first_vertex < second_vertex:
                     yield (first_vertex, second_vertex)
 
+    _connectivity: ConnectivityTracker | None = None
+
     def add_edge(self, vertex_a, vertex_b):
-        self.adjacency_list[vertex_a].append(vertex_b)
-        self.adjacency_list[vertex_b].append(vertex_a)
+        previous_version = self.version
+        self._append_entry(vertex_a, vertex_b, vertex_b)
+        self._append_entry(vertex_b, vertex_a, vertex_a)
+        if self._connectivity is not None:
+            self._connectivity.edge_added(vertex_a, vertex_b, previous_version)
 
     def remove_edge(self, vertex_a, vertex_b):
-        self.adjacency_list[vertex_a].remove(vertex_b)
-        self.adjacency_list[vertex_b].remove(vertex_a)
+        self._remove_entry(vertex_a, vertex_b)
+        self._remove_entry(vertex_b, vertex_a)
 
     @classmethod
     def parse_with_representation(
-        cls, string: str, representation: Literal["adjlist", "adjmatrix", "incmatrix"]
+        cls, string: str, representation: Representation
     ) -> Self:
         "parse raw string data into a Graph object"
+        return cls.parse_file_with_representation(StringIO(string), representation)
 
-        data = [[int(value) for value in line.split()]
-                for line in string.splitlines()]
+    @classmethod
+    def parse_file_with_representation(
+        cls, source: Source, representation: Representation
+    ) -> Self:
+        """parse a file object or the file at the given path into a Graph object.
+        The input is read in chunks and matrices are never stored densely."""
         match representation:
             case "adjlist":
-                adjacency_list = data
+                csr = read_adjacency_list(source)
             case "adjmatrix":
-                adjacency_list = cls.adjacency_matrix_to_adjacency_list(data)
+                csr = read_adjacency_matrix(source)
             case "incmatrix":
-                adjacency_list = cls.incidence_matrix_to_adjacency_list(data)
-
-        return cls(adjacency_list)
-
-    def dump_with_representation(self, representation: Literal["adjlist", "adjmatrix", "incmatrix"]) -> str:
-        data = []
+                csr = read_incidence_matrix(source)
+            case "binary":
+                return cls.from_csr_lazily(read_binary(source))
+            case _:
+                raise ValueError(f"unknown representation {representation!r}")
+
+        return cls.from_csr(csr)
+
+    def dump_with_representation(self, representation: Representation) -> str:
+        """Returns the graph as a string in the given text representation. The
+        binary representation isn't text, use dump_binary() for it."""
+        if representation == "binary":
+            raise ValueError("binary representation can't be dumped to a string, "
+                             "use dump_binary()")
+        string = StringIO()
+        self.dump_to(string, representation)
+        return string.getvalue()
+
+    def dump_to(self, file: IO[str],
+                representation: Representation = "adjlist"):
+        """Write the graph to a text file object in the given representation.
+        Matrix rows are generated one at a time and never stored as a whole.
+        The binary representation is written to the underlying binary buffer."""
         match representation:
             case "adjlist":
-                data = self.adjacency_list
+                lines = iter_adjacency_list_lines(self.adjacency_list)
             case "adjmatrix":
-                data = Graph.adjacency_list_to_adjacency_matrix(
-                    self.adjacency_list)
+                lines = iter_adjacency_matrix_lines(self.adjacency_list)
             case "incmatrix":
-                data = Graph.adjacency_list_to_incidence_matrix(
-                    self.adjacency_list)
-
-        string = ""
-        for row in data:
-            string += " ".join(map(lambda v: f"{v}", row)) + "\n"
-        return string
+                lines = iter_incidence_matrix_lines(self.adjacency_list)
+            case "binary":
+                if not hasattr(file, "buffer"):
+                    raise ValueError("binary representation needs a file with an underlying "
+                                     "binary buffer, use dump_binary()")
+                file.flush()
+                write_binary(self.to_csr(), file.buffer)  # type: ignore[attr-defined]
+                return
+            case _:
+                raise ValueError(f"unknown representation {representation!r}")
+
+        write_lines(file, lines)
 
     @classmethod
-    def generate_with_gnl_model(cls, n: int, l: int) -> Self:
-        """Generate graph using number of edges"""
+    def generate_with_gnl_model(cls, n: int, l: int,
+                                rng: np.random.Generator | None = None) -> Self:
+        """Generate graph using number of edges.
+        The l edges are sampled directly as distinct vertex pairs, so the cost is
+        O(n + l) and no n x n matrix is ever allocated."""
         if n < 0:
             raise ValueError("n < 0")
 
@@ -71,53 +133,34 @@ class Graph(IUndirectedGraph, IUnweightedGraph):
         if l > n*(n-1)//2:
             raise ValueError(f"{l = } is too large for graph where {n = }")
 
-        output = [[0 for _ in range(n)] for _ in range(n)]
-        if 0 < l < n*(n-1)/2:
-            while l > 0:
-                row = random.randrange(0, n)
-                col = random.randrange(0, n)
+        if rng is None:
+            rng = np.random.default_rng()
 
-                if row != col:
-                    if output[row][col] == 0:
-                        output[row][col] = 1
-                        output[col][row] = 1
-                        l -= 1
-        elif l == n*(n-1)//2:
-            for i in range(n):
-                for j in range(i+1, n):
-                    output[i][j] = output[j][i] = 1
-
-        return cls(cls.adjacency_matrix_to_adjacency_list(output))
+        first, second = decode_pairs(n, sample_distinct(pair_count(n), l, rng))
+        return cls.from_csr(CSRGraph.from_edges(n, first, second))
 
     @classmethod
-    def generate_with_gnp_model(cls, n: int, p: float) -> Self:
-        """Generate graph using probability"""
+    def generate_with_gnp_model(cls, n: int, p: float,
+                                rng: np.random.Generator | None = None) -> Self:
+        """Generate graph using probability.
+        Vertex pairs are skipped with geometrically distributed gaps, so the
+        expected cost is O(n + m) instead of one random draw per pair."""
         if p < 0 or p > 1:
             raise ValueError("p < 0 or p > 1")
 
         if n < 0:
             raise ValueError("n < 0")
 
-        output = [[0 for _ in range(n)] for _ in range(n)]
-
-        edge = 0
-
-        for i in range(n):
-            for j in range(i+1, n):
-
-                if random.random() <= p:
-                    if output[i][j] == 0 and edge <= n*(n-1)/2.:
-
-                        output[i][j] = output[j][i] = 1
-
-                        edge += 1
-                    else:
-                        break
+        if rng is None:
+            rng = np.random.default_rng()
 
-        return cls(cls.adjacency_matrix_to_adjacency_list(output))
+        first, second = decode_pairs(n, sample_bernoulli(pair_count(n), p, rng))
+        return cls.from_csr(CSRGraph.from_edges(n, first, second))
 
     @classmethod
-    def generate_random_regular(cls, n, k) -> Self:
+    def generate_random_regular(cls, n: int, k: int,
+                                rng: np.random.Generator | None = None) -> Self:
+        """Generate a random k-regular graph using the configuration model"""
         if n < 0:
             raise ValueError("n < 0")
 
@@ -130,231 +173,220 @@ class Graph(IUndirectedGraph, IUnweightedGraph):
         if k % 2 == 1 and n % 2 == 1:
             raise ValueError("both k and n are odd")
 
-        output = [[] for j in range(n)]
+        if rng is None:
+            rng = np.random.default_rng()
 
-        edges = [[k, i] for i in range(0, n)]
-        random.shuffle(edges)
-
-        while edges[0][0] != 0:
-            v = edges[0][1]
-            amount = edges[0][0]
-
-            for i in range(amount):
-                edges[0][0] -= 1
-                edges[i+1][0] -= 1
-
-                v2 = edges[i+1][1]
-
-                output[v].append(v2)
-                output[v2].append(v)
-
-            edges.sort(reverse=True)
-
-        return cls(output)
+        first, second = sample_regular_edges(n, k, rng)
+        return cls.from_csr(CSRGraph.from_edges(n, first, second))
 
     @staticmethod
-    def adjacency_matrix_to_adjacency_list(input: list[list[int]]) -> list[list[int]]:
-        """transform 'adjacency matrix' to 'adjacency list'"""
-        output = []
-        for i in input:
-            row = []
-            for id, j in enumerate(i):
-                if j == 1:
-                    row.append(id)
-            output.append(row)
-        return output
+    def adjacency_matrix_to_adjacency_list(input: list[list[int]] | np.ndarray | Any
+                                           ) -> list[list[int]]:
+        """transform 'adjacency matrix' to 'adjacency list'.
+        The matrix may also be a NumPy array or a scipy.sparse matrix."""
+        if hasattr(input, "tocoo"):
+            matrix = input.tocoo()
+            ones = matrix.data == 1
+            rows, columns = matrix.row[ones], matrix.col[ones]
+            vertex_count = matrix.shape[0]
+        else:
+            matrix = _as_matrix(input)
+            rows, columns = np.nonzero(matrix == 1)
+            vertex_count = len(matrix)
+        return CSRGraph.from_entries(vertex_count, rows, columns).to_adjacency_list()
 
     @staticmethod
-    def adjacency_list_to_adjacency_matrix(input: list[list[int]]) -> list[list[int]]:
-        """transform 'adjacency list' to 'adjacency matrix'"""
+    def adjacency_list_to_adjacency_matrix(input: list[list[int]], sparse: bool = False
+                                           ) -> list[list[int]] | Any:
+        """transform 'adjacency list' to 'adjacency matrix'.
+        With sparse=True a scipy.sparse.csr_array is returned instead."""
         node_amount = len(input)
-        output = [[0 for i in range(node_amount)] for j in range(node_amount)]
-        for iid, i in enumerate(input):
-            for j in i:
-                output[iid][j] = 1
-        return output
+        csr = CSRGraph.from_adjacency_list(input, directed=True)
+        rows = np.repeat(np.arange(node_amount), csr.vertex_degrees)
+
+        if sparse:
+            # drop parallel entries, the matrix only records whether an edge exists
+            entries = np.unique(rows * node_amount + csr.indices)
+            return _scipy_sparse().csr_array(
+                (np.ones(len(entries), dtype=np.int8),
+                 (entries // node_amount, entries % node_amount)),
+                shape=(node_amount, node_amount))
+
+        output = np.zeros((node_amount, node_amount), dtype=np.int8)
+        output[rows, csr.indices] = 1
+        return output.tolist()
 
     @staticmethod
-    def adjacency_list_to_incidence_matrix(input: list[list[int]]) -> list[list[int]]:
-        """transform 'adjacency list' to 'incidence matrix'"""
+    def adjacency_list_to_incidence_matrix(input: list[list[int]], sparse: bool = False
+                                           ) -> list[list[int]] | Any:
+        """transform 'adjacency list' to 'incidence matrix'.
+        Edges are numbered in the order in which they appear in the adjacency list.
+        With sparse=True a scipy.sparse.csr_array is returned instead."""
         m = len(input)
-        n = 0
-        for i in input:
-            n += len(i)
-        n = int(n/2)
-        output = [[0 for i in range(n)] for j in range(m)]
-        col_it = 0
-        for iid, i in enumerate(input):
-            for j in i:
-                if iid < j:
-                    output[iid][col_it] = 1
-                    output[j][col_it] = 1
-                    col_it += 1
-            if col_it == n:
-                break
-        return output
+        csr = CSRGraph.from_adjacency_list(input, directed=True)
+        first = np.repeat(np.arange(m), csr.vertex_degrees)
+        is_edge = first < csr.indices
+        first, second = first[is_edge], csr.indices[is_edge]
+        n = len(first)
+        columns = np.arange(n)
+
+        if sparse:
+            return _scipy_sparse().csr_array(
+                (np.ones(2 * n, dtype=np.int8),
+                 (np.concatenate((first, second)), np.concatenate((columns, columns)))),
+                shape=(m, n))
+
+        output = np.zeros((m, n), dtype=np.int8)
+        output[first, columns] = 1
+        output[second, columns] = 1
+        return output.tolist()
 
     @staticmethod
-    def incidence_matrix_to_adjacency_list(input: list[list[int]]) -> list[list[int]]:
-        """transform 'incidence matrix' to 'adjacency list'"""
-        m = len(input)
-        n = len(input[0])
-        output = [[] for j in range(m)]
-        for i in range(n):
-            id = -1
-            for j in range(m):
-                if input[j][i] == 1:
-                    if id > -1:
-                        output[id].append(j)
-                        output[j].append(id)
-                        break
-                    else:
-                        id = j
-        output = list(map(sorted, output))  # sort rows
-        return output
+    def incidence_matrix_to_adjacency_list(input: list[list[int]] | np.ndarray | Any
+                                           ) -> list[list[int]]:
+        """transform 'incidence matrix' to 'adjacency list'.
+        The matrix may also be a NumPy array or a scipy.sparse matrix."""
+        if hasattr(input, "tocoo"):
+            matrix = input.tocoo()
+            ones = matrix.data == 1
+            vertices, edges = matrix.row[ones], matrix.col[ones]
+            vertex_count = matrix.shape[0]
+        else:
+            matrix = _as_matrix(input)
+            vertices, edges = np.nonzero(matrix == 1)
+            vertex_count = len(matrix)
+        return CSRGraph.from_incidence(vertex_count, vertices, edges).to_adjacency_list()
 
     @staticmethod
     def check_if_sequence_is_graphic(sequence: list[int]) -> bool:
         """Check whether or not a provided sequence is a graphic sequence,
         i.e. can be the sequence of degrees for some graph"""
+        return is_graphic(sequence)
 
-        if not sequence:
-            # a sequence of length 0 is always graphic
-            return True
-
-        if max(sequence) >= len(sequence):
-            # highest degree of a vertex is larger than the number of other
-            # vertices, meaning the graph can't be constructed
-            return False
-
-        if sum(sequence) % 2 == 1:
-            # sum of degrees must be even
-            return False
-
-        # create new list to avoid modifying input
-        remaining_edges = list(sequence)
-
-        # this loop involves "adding" edges until all vertices have the target
-        # number of incident edges. the actual edges are not tracked, only the
-        # remaining number of incident edges for each vertex
-        while True:
-            remaining_edges.sort(reverse=True)
-
-            if all(d == 0 for d in remaining_edges):
-                # all vertices have the correct number of edges
-                return True
-
-            if min(remaining_edges) < 0:
-                # one of the vertices has more incident edges than its
-                # target degree
-                return False
-
-            # create edges between the vertex with the largest number of remaining
-            # edges n and the n next vertices with the largest number of remaining
-            # edges
-            for index in range(1, remaining_edges[0] + 1):
-                remaining_edges[index] -= 1
-            remaining_edges[0] = 0
+    @staticmethod
+    def check_if_sequences_are_graphic(sequences: np.ndarray | list[list[int]]) -> np.ndarray:
+        """Check many sequences of the same length at once. Takes a 2-D array
+        with one sequence per row and returns a boolean array."""
+        return are_graphic(sequences)
 
     @classmethod
     def from_graphic_sequence(cls, sequence: list[int]) -> Self | None:
+        """Build a graph with the given sequence of degrees using Havel–Hakimi,
+        or return None if the sequence isn't graphic"""
         if not sequence:
             # a sequence of length 0 corresponds to a graph with no vertices
             return cls([])
 
-        if max(sequence) >= len(sequence):
-            # highest degree of a vertex is larger than the number of other
-            # vertices, meaning the graph can't be constructed
-            return None
-
-        if sum(sequence) % 2 == 1:
-            # sum of degrees must be even
+        edges = havel_hakimi_edges(sequence)
+        if edges is None:
             return None
+        return cls.from_csr(CSRGraph.from_edges(len(sequence), *edges))
+
+    def track_connectivity(self) -> ConnectivityTracker:
+        """Returns a tracker of the connected components of this graph, which
+        is updated in near-constant time by every add_edge() call. Removing
+        edges makes it rebuild the components on the next query."""
+        if self._connectivity is None:
+            self._connectivity = ConnectivityTracker(self)
+        return self._connectivity
+
+    def component_labels(self, method: ComponentMethod = "search") -> np.ndarray:
+        """Returns an array with the index of the component of every vertex.
+        Components are numbered in the order of their smallest vertices. The
+        "search" method runs a breadth-first search over the adjacency list,
+        "propagation" uses vectorised label propagation over CSR arrays,
+        which is faster on large graphs, and "bitset" a breadth-first search
+        over a BitsetGraph, which merges whole neighbourhoods at once. The
+        bitset method is never chosen automatically, even for dense graphs, so
+        it has to be passed explicitly."""
+        if method not in ("search", "propagation", "bitset"):
+            raise ValueError(f"unknown method: {method}")
+
+        def compute() -> np.ndarray:
+            if method == "search":
+                labels = search_labels(self.adjacency_list)
+            elif method == "propagation":
+                labels = propagation_labels(self.to_csr())
+            else:
+                labels = self.to_bitset().component_labels()
+            labels.flags.writeable = False
+            return labels
 
-        # tracks how many more incident edges must still be added to each vertex
-        remaining_edges = list(sequence)
-
-        # tracks vertex indices. when remaining_edges gets sorted, this list
-        # gets rearranged in the same way
-        vertex_indices = list(range(len(sequence)))
-
-        # resulting graph, to be built up during the upcoming loop
-        graph = cls.empty(len(sequence))
+        return self._cached("component_labels", compute)
 
-        # this loop involves adding edges until all vertices have the target
-        # number of incident edges.
-        while True:
-            # sort remaining_edges, but rearrange vertex_indices in the same way
-            remaining_edges, vertex_indices = (list(t) for t in zip(
-                *sorted(zip(remaining_edges, vertex_indices), reverse=True)))
-
-            if all(d == 0 for d in remaining_edges):
-                # all vertices have the correct number of edges
-                return graph
-
-            if min(remaining_edges) < 0:
-                # one of the vertices has more incident edges than its
-                # target degree
-                return None
-
-            # create edges between the vertex with the largest number of remaining
-            # edges n and the n next vertices with the largest number of remaining
-            # edges
-            for index in range(1, remaining_edges[0] + 1):
-                remaining_edges[index] -= 1
-                graph.add_edge(vertex_indices[0], vertex_indices[index])
-            remaining_edges[0] = 0
-
-    def find_components(self):
+    def find_components(self, method: ComponentMethod = "search") -> list[list[int]]:
         """Finds and returns all the components of the graph."""
-
-        def components_r(nr: int, v: int, g: list[list[int]], comp: list) -> None:
-            for i in range(len(g[v])):
-                if comp[g[v][i]] is None:
-                    comp[g[v][i]] = nr
-                    components_r(nr, g[v][i], g, comp)
-
-        nr = 0
-        comp = []
-        for i in range(len(self.adjacency_list)):
-            comp.append(None)
-        for i in range(len(self.adjacency_list)):
-            if comp[i] is None:
-                comp[i] = nr
-                components_r(nr, i, self.adjacency_list, comp)
-                nr += 1
-
-        components = [[] for _ in range(nr)]
-        for vertex_index, component_index in enumerate(comp):
-            components[component_index].append(vertex_index)
-        return components
-
-    def find_hamiltonian_cycle(self):
+        return components_from_labels(self.component_labels(method))
+
+    def triangle_counts(self) -> np.ndarray:
+        """Returns an array with the number of triangles every vertex belongs
+        to, see graph.clustering.triangle_counts(). Loops and parallel edges
+        are ignored."""
+        def compute() -> np.ndarray:
+            counts = triangle_counts(self.to_csr())
+            counts.flags.writeable = False
+            return counts
+
+        return self._cached("triangle_counts", compute)
+
+    def local_clustering(self) -> np.ndarray:
+        """Returns the local clustering coefficient of every vertex, the
+        fraction of pairs of its neighbours which are adjacent"""
+        return local_clustering(self.to_csr(), self.triangle_counts())
+
+    def average_clustering(self) -> float:
+        """Returns the mean of the local clustering coefficients, counting
+        vertices with fewer than two neighbours as 0"""
+        if self.vertex_count == 0:
+            return 0.0
+        return float(self.local_clustering().mean())
+
+    def transitivity(self) -> float:
+        """Returns the global clustering coefficient, the fraction of paths of
+        two edges which are closed into triangles"""
+        return transitivity(self.to_csr(), self.triangle_counts())
+
+    def find_hamiltonian_cycle(self, parallel: bool = False,
+                               split_depth: int = DEFAULT_SPLIT_DEPTH,
+                               workers: int | None = None,
+                               timeout: float | None = None) -> list[int] | None:
         """A function that returns a Hamiltonian cycle of the graph if one exists,
-        or None otherwise"""
-        def recurse(adjacency_list: list[list[int]], vertex: int,
-                    visited: list[int], s: list) -> list[int] | None:
-            s.append(vertex)
-            if len(s) < len(adjacency_list):
-                visited[vertex] = True
-                for i in range(len(adjacency_list[vertex])):
-                    if not visited[adjacency_list[vertex][i]]:
-                        result = recurse(
-                            adjacency_list, adjacency_list[vertex][i], visited, s)
-                        if result is not None:
-                            return result
-                visited[vertex] = False
-                s.pop()
-            else:
-                for i in range(len(adjacency_list[vertex])):
-                    if adjacency_list[vertex][i] == 0:
-                        return s
-
-                s.pop()
-
-            return None
-
-        return recurse(self.adjacency_list, 0, [0 for _ in self.adjacency_list], [])
+        or None otherwise. With parallel=True the search is split between
+        worker processes, see graph.hamiltonian.parallel_backtrack(). Raises
+        TimeoutError if timeout seconds pass without an answer."""
+        return find_hamiltonian_cycle(self.adjacency_list, parallel, split_depth,
+                                      workers, timeout)
+
+    def swap_edges(self, n_swaps: int, connected: bool = False,
+                   max_attempts: int | None = None,
+                   rng: np.random.Generator | None = None) -> SwapStatistics:
+        """Randomise the edges of this simple graph in place with n_swaps
+        double edge swaps, keeping the degree of every vertex. With
+        connected=True a connected graph stays connected. Returns statistics
+        of the attempted and accepted swaps, see double_edge_swap()."""
+        csr = self.to_csr()
+        rows = np.repeat(np.arange(self.vertex_count, dtype=np.int64), csr.vertex_degrees)
+        columns = csr.indices.astype(np.int64)
+        upper = rows < columns
+        # parallel edges give equal keys, which are adjacent once sorted
+        keys = np.sort(rows * max(self.vertex_count, 1) + columns)
+        if 2 * np.count_nonzero(upper) != len(columns) or (keys[1:] == keys[:-1]).any():
+            raise ValueError("graph has loops or parallel edges")
+
+        # checked from the CSR arrays, without attaching a tracker which every
+        # later add_edge() would have to update
+        if connected and self.vertex_count > 0 and propagation_labels(csr).max() > 0:
+            raise ValueError("graph is not connected")
+
+        if rng is None:
+            rng = np.random.default_rng()
+
+        first, second = rows[upper], columns[upper]
+        statistics = double_edge_swap(self.vertex_count, first, second, n_swaps, rng,
+                                      connected, max_attempts)
+        self.adjacency_list = CSRGraph.from_edges(self.vertex_count, first,
+                                                  second).to_adjacency_list()
+        return statistics
 
     def randomize_edges(self, rand_it: int) -> Self:
         """
@@ -365,59 +397,21 @@ class Graph(IUndirectedGraph, IUnweightedGraph):
         rand_it : int
         number of randomization
         """
-        def _check_if_can_swap(y1, y2, edgesFromx1, edgesFromx2):
-            return (len(output[y1, [edgesFromx1]].nonzero()[0]) == 0 and
-                    len(output[y2, [edgesFromx2]].nonzero()[0]) == 0)
-
-        output = np.array(
-            Graph.adjacency_list_to_incidence_matrix(self.adjacency_list))
-        node_n = len(output)
-        if node_n*(node_n-1)/2 - 2 < len(output[0]):
+        output = type(self)([list(row) for row in self.adjacency_list])
+        node_n = self.vertex_count
+        if node_n*(node_n-1)/2 - 2 < self.edge_count:
             warnings.warn(
                 "this graph have no free space for randomizing edge", RuntimeWarning)
-            return Graph(Graph.incidence_matrix_to_adjacency_list(output.tolist()))
-
-        for _ in range(rand_it):
-            possibilities = list()
-            x1, x2, y1, y2 = None, None, None, None
-            for i in range(len(output[0])):
-                for j in range(i+1, len(output[0])):
-                    x1, x2 = output[:, i].nonzero()[0]
-                    if ((x1 not in output[:, j].nonzero()[0]) and (x2 not in output[:, j].nonzero()[0])):
-                        edgesFromx1 = output[x1].nonzero()[0]
-                        edgesFromx2 = output[x2].nonzero()[0]
-                        y1, y2 = output[:, j].nonzero()[0]
-                        if (_check_if_can_swap(y1, y2, edgesFromx1, edgesFromx2)
-                           or
-                           _check_if_can_swap(y2, y1, edgesFromx1, edgesFromx2)):
-                            possibilities.append((i, j))
-
-            if (not possibilities):
-                warnings.warn('couldn\'t find any possible swap',
-                              RuntimeWarning)
-                break
-            c1, c2 = random.choice(possibilities)
-            x1, x2 = output[:, c1].nonzero()[0]
-            y1, y2 = output[:, c2].nonzero()[0]
-            edgesFromx1 = output[x1].nonzero()[0]
-            edgesFromx2 = output[x2].nonzero()[0]
-            if ((not _check_if_can_swap(y1, y2, edgesFromx1, edgesFromx2))
-                or (random.randint(0, 1) == 0 and
-                    _check_if_can_swap(y2, y1, edgesFromx1, edgesFromx2))):
-                output[x1, c1] = 0
-                output[x1, c2] = 1
-                output[y1, c2] = 0
-                output[y1, c1] = 1
-            else:
-                output[x2, c1] = 0
-                output[x2, c2] = 1
-                output[y1, c2] = 0
-                output[y1, c1] = 1
+            return output
 
-        return Graph(Graph.incidence_matrix_to_adjacency_list(output.tolist()))
+        if output.swap_edges(rand_it).swaps < rand_it:
+            warnings.warn('couldn\'t find any possible swap',
+                          RuntimeWarning)
+        return output
 
     @classmethod
-    def euler_graph_generator(cls, node: int, edge: int, is_connected: bool = True) -> Self:
+    def euler_graph_generator(cls, node: int, edge: int, is_connected: bool = True,
+                              rng: np.random.Generator | None = None) -> Self:
         """Generate euler graph.
 
         Attributes
@@ -427,82 +421,76 @@ class Graph(IUndirectedGraph, IUnweightedGraph):
         edge : int
         number of edges
         is_connected : bool
-        whether or not the graph needs to be connected"""
+        whether or not the graph needs to be connected
+        rng : np.random.Generator | None
+        source of randomness"""
         if node < 0 or edge < 0:
             raise ArithmeticError("number of node and edge must be positive")
-        output = None
-        if is_connected:
-            edge -= node
-            if edge < 0 or edge+node > node*(node-1)/2:
-                raise ArithmeticError(
-                    "number of edge is too big or too small for connected graph")
-            output = np.ones(node).astype(int)
-        else:
-            if edge > node*(node-1)/2:
-                raise ArithmeticError("number of edge is too big")
-            output = np.zeros(node).astype(int)
-            output[random.randint(0, node-1)] = 1
-            edge -= 1
-        for _ in range(edge):
-            choices = [i for i in range(node)
-                       if (2 * output[i] + 1 <= output.sum() and 2*output[i]+2 < node)]
-            if not choices:
-                raise ArithmeticError(
-                    "number of edge and node can't be used to generate euler graph")
-            random_id = random.choice(choices)
-            output[random_id] += 1
-
-        output *= 2
-
-        output = list(output)
-        result = cls.from_graphic_sequence(output)
-
-        if result is None:
+        if is_connected and (edge < node or edge > node*(node-1)/2):
             raise ArithmeticError(
-                "number of edge and node can't be used to generate euler graph")
-
-        try:
-            if edge+node < node*(node-1)/2:
-                result = result.randomize_edges(random.randrange(4))
-        except RuntimeWarning:
-            pass
-
-        if is_connected:
-            while len(result.find_components()) != 1:
-                result = result.randomize_edges(random.randrange(1))
-
-        return result
-
-    def euler_cycle_finder(self: Self) -> list:
-        """Find euler cycle
-        Returns list of nodes number counted from 1"""
-        data = self.adjacency_list
-        node_id = 0
-        while len(data[node_id]) == 0:
-            node_id += 1
-        id_of_next = -1
-        output = list()
-        while len(data[node_id]) != 0:
-            next_node_id = data[node_id][id_of_next]
-            ndata = list([j for j in i if (id not in [node_id, next_node_id]
-                         or j not in [node_id, next_node_id])] for id, i in enumerate(data))
-            components = [i for i in Graph(ndata).find_components() if len(
-                i) > 1 or i[0] == next_node_id]
-
-            if len(components) == 1:
-                data = ndata
-                output.append(node_id)
-                node_id = next_node_id
-                id_of_next = -1
-            else:
-                id_of_next -= 1
-
-        if node_id != 0:
+                "number of edge is too big or too small for connected graph")
+
+        if rng is None:
+            rng = np.random.default_rng()
+
+        first, second = sample_euler_edges(node, edge, is_connected, rng)
+        return cls.from_csr(CSRGraph.from_edges(node, first, second))
+
+    def euler_cycle_finder(self: Self) -> np.ndarray:
+        """Find euler cycle using Hierholzer's algorithm.
+        Returns an array of vertex indices which starts and ends at the first
+        vertex with any edges, or an empty array if the graph has no edges."""
+        degrees = np.fromiter(map(len, self.adjacency_list), dtype=np.int64,
+                              count=self.vertex_count)
+        odd_count = int(np.count_nonzero(degrees % 2))
+        if odd_count == 2:
             raise ArithmeticError(
                 "graph is not euler graph, but has euler path")
+        if odd_count > 0:
+            raise ArithmeticError("graph is not euler graph")
+
+        non_isolated = np.flatnonzero(degrees)
+        if len(non_isolated) == 0:
+            return np.zeros(0, dtype=np.int64)
+        labels = self.component_labels()
+        if (labels[non_isolated] != labels[non_isolated[0]]).any():
+            raise ArithmeticError(
+                "graph is not euler graph, its edges are not connected")
+
+        csr = self.to_csr()
+        neighbours = csr.indices.tolist()
+        edge_ids = csr.edge_ids().tolist()
+        # position of the next entry to check in every row
+        positions = csr.indptr[:-1].tolist()
+        ends = csr.indptr[1:].tolist()
+        used = bytearray(csr.edge_count)
+
+        # walk unused edges until getting stuck, which can only happen at the
+        # start of the current sub-cycle, then backtrack and splice in new
+        # sub-cycles from the vertices on the way back
+        vertex = int(non_isolated[0])
+        stack = [vertex]
+        cycle = []
+        while True:
+            position = positions[vertex]
+            end = ends[vertex]
+            while position < end:
+                edge_id = edge_ids[position]
+                position += 1
+                if not used[edge_id]:
+                    used[edge_id] = 1
+                    positions[vertex] = position
+                    vertex = neighbours[position - 1]
+                    stack.append(vertex)
+                    break
+            else:
+                positions[vertex] = end
+                cycle.append(stack.pop())
+                if not stack:
+                    break
+                vertex = stack[-1]
 
-        output.append(node_id)
-        return output
+        return np.array(cycle[::-1], dtype=csr.indices.dtype)
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, Graph):
@@ -513,6 +501,8 @@ class Graph(IUndirectedGraph, IUnweightedGraph):
 
         return True
 
+    __hash__ = IGraph.__hash__
+
 
 if __name__ == "__main__":
     pass
@@ -0,0 +1,421 @@
+from __future__ import annotations
+from itertools import islice
+from typing import TYPE_CHECKING, Iterator
+import os
+import time
+import numpy as np
+
+from graph.bitset import DENSITY_THRESHOLD, BitsetGraph, density
+
+if TYPE_CHECKING:
+    from multiprocessing.synchronize import Event
+
+# largest number of vertices for which the Held-Karp dynamic programming is
+# used once a short search fails, it needs 2 ** (n - 1) 32-bit words of
+# memory and about 3 seconds for 24 vertices
+HELD_KARP_LIMIT = 24
+# the search tried before Held-Karp takes CHECK_INTERVAL steps on graphs of
+# up to this many vertices, and twice as many for every further vertex
+SHORT_SEARCH_OFFSET = 19
+# number of edges of the paths which split the search tree between processes
+DEFAULT_SPLIT_DEPTH = 3
+# number of search steps between checks of the deadline and the stop event
+CHECK_INTERVAL = 1024
+
+
+class _StepLimitReached(Exception):
+    """Raised by a search which used up its number of steps"""
+
+
+def _check_deadline(deadline: float | None):
+    if deadline is not None and time.monotonic() >= deadline:
+        raise TimeoutError("Hamiltonian cycle search ran out of time")
+
+
+def _neighbour_masks(adjacency_list: list[list[int]]) -> list[int]:
+    """Neighbours of every vertex as a bitmask, without loops. Dense graphs
+    are converted through a BitsetGraph, which avoids a big integer
+    operation per edge."""
+    vertex_count = len(adjacency_list)
+    edge_count = sum(map(len, adjacency_list)) // 2
+    if density(vertex_count, edge_count) >= DENSITY_THRESHOLD:
+        masks = BitsetGraph.from_adjacency_list(adjacency_list).masks()
+    else:
+        masks = []
+        for row in adjacency_list:
+            mask = 0
+            for adjacent_vertex in row:
+                mask |= 1 << adjacent_vertex
+            masks.append(mask)
+    return [mask & ~(1 << vertex) for vertex, mask in enumerate(masks)]
+
+
+def _bits(mask: int) -> list[int]:
+    """Indices of the set bits of a mask"""
+    bits = []
+    while mask:
+        lowest = mask & -mask
+        bits.append(lowest.bit_length() - 1)
+        mask ^= lowest
+    return bits
+
+
+def _has_articulation_point(masks: list[int]) -> bool:
+    """Whether removing some vertex disconnects a connected graph, found with
+    an iterative version of Tarjan's low-link search"""
+    vertex_count = len(masks)
+    order = [-1] * vertex_count
+    low = [0] * vertex_count
+    order[0] = 0
+    counter = 1
+    root_children = 0
+    # every frame is a vertex, its parent and its neighbours left to visit
+    stack = [(0, -1, _bits(masks[0]))]
+    while stack:
+        vertex, parent, remaining = stack[-1]
+        if remaining:
+            adjacent_vertex = remaining.pop()
+            if order[adjacent_vertex] == -1:
+                order[adjacent_vertex] = low[adjacent_vertex] = counter
+                counter += 1
+                if vertex == 0:
+                    root_children += 1
+                stack.append((adjacent_vertex, vertex, _bits(masks[adjacent_vertex])))
+            elif adjacent_vertex != parent:
+                low[vertex] = min(low[vertex], order[adjacent_vertex])
+            continue
+
+        stack.pop()
+        if parent != -1:
+            low[parent] = min(low[parent], low[vertex])
+            if parent != 0 and low[vertex] >= order[parent]:
+                return True
+    return root_children > 1
+
+
+def _is_connected(masks: list[int], vertices: int, start: int) -> bool:
+    """Whether all vertices of a set are reachable from start through it"""
+    reached = 1 << start
+    frontier = reached
+    while frontier:
+        next_frontier = 0
+        for vertex in _bits(frontier):
+            next_frontier |= masks[vertex]
+        frontier = next_frontier & vertices & ~reached
+        reached |= frontier
+    return reached & vertices == vertices
+
+
+def _is_unbalanced_bipartite(masks: list[int]) -> bool:
+    """Whether a connected graph is bipartite with sides of different sizes,
+    such a graph has no Hamiltonian cycle since a cycle alternates sides"""
+    sides = [1, 0]
+    frontier = 1
+    reached = 1
+    depth = 0
+    while frontier:
+        next_frontier = 0
+        for vertex in _bits(frontier):
+            next_frontier |= masks[vertex]
+        frontier = next_frontier & ~reached
+        reached |= frontier
+        depth += 1
+        sides[depth % 2] |= frontier
+
+    for side in sides:
+        if any(masks[vertex] & side for vertex in _bits(side)):
+            return False
+    return sides[0].bit_count() != sides[1].bit_count()
+
+
+def _popcounts(size: int) -> np.ndarray:
+    counts = np.zeros(size, dtype=np.uint8)
+    values = np.arange(size, dtype=np.uint32)
+    while values.any():
+        counts += (values & 1).astype(np.uint8)
+        values >>= 1
+    return counts
+
+
+def held_karp(masks: list[int], deadline: float | None = None) -> list[int] | None:
+    """Hamiltonian cycle found with Held-Karp dynamic programming over
+    subsets, in O(2^n * n) vectorised time. Raises TimeoutError if
+    time.monotonic() passes the deadline before a layer of subsets starts.
+
+    The cycle starts at vertex 0. ends[S] is the set of vertices v in S such
+    that some path starts at 0, visits exactly the vertices of S and ends at
+    v; S and ends[S] are bitmasks over the vertices 1, ..., n - 1. Subsets
+    are processed by size, so every transition reads a finished entry."""
+    vertex_count = len(masks)
+    others = vertex_count - 1
+    # neighbour masks of the vertices 1, ..., n - 1, shifted to bits 0, ..., n - 2
+    shifted = [masks[v + 1] >> 1 for v in range(others)]
+    start_neighbours = masks[0] >> 1
+
+    ends = np.zeros(1 << others, dtype=np.uint32)
+    for v in range(others):
+        if start_neighbours >> v & 1:
+            ends[1 << v] = 1 << v
+
+    popcounts = _popcounts(1 << others)
+    for size in range(2, others + 1):
+        _check_deadline(deadline)
+        subsets = np.flatnonzero(popcounts == size).astype(np.uint32)
+        for v in range(others):
+            bit = np.uint32(1 << v)
+            with_v = subsets[(subsets & bit) != 0]
+            reachable = (ends[with_v ^ bit] & np.uint32(shifted[v])) != 0
+            ends[with_v[reachable]] |= bit
+
+    full = (1 << others) - 1
+    last = int(ends[full]) & start_neighbours
+    if not last:
+        return None
+
+    # walk back through the table
+    vertex = (last & -last).bit_length() - 1
+    subset = full
+    path = [vertex]
+    while subset != 1 << vertex:
+        subset ^= 1 << vertex
+        previous = int(ends[subset]) & shifted[vertex]
+        vertex = (previous & -previous).bit_length() - 1
+        path.append(vertex)
+    return [0] + [v + 1 for v in reversed(path)]
+
+
+def _candidates(masks: list[int], vertex: int, unvisited: int) -> list[int]:
+    """Unvisited neighbours of a vertex, sorted so that the one with the
+    fewest unvisited neighbours is popped first"""
+    return sorted(_bits(masks[vertex] & unvisited),
+                  key=lambda v: (masks[v] & unvisited).bit_count(), reverse=True)
+
+
+def _is_too_loose(masks: list[int], unvisited: int, ends: int = 0) -> bool:
+    """Whether removing some set S of vertices leaves more than |S|
+    components, which rules out a Hamiltonian cycle. The ends of the current
+    path count as a single vertex, since the path joins them.
+
+    S is the neighbourhood of an independent set I of unvisited vertices,
+    chosen greedily with the fewest neighbours first. Every vertex of I is a
+    component of its own, and the vertices outside of I and S add one more."""
+    remaining = unvisited | ends
+    independent = 0
+    neighbourhood = 0
+    for vertex in sorted(_bits(unvisited), key=lambda v: (masks[v] & remaining).bit_count()):
+        if not neighbourhood >> vertex & 1:
+            independent |= 1 << vertex
+            neighbourhood |= masks[vertex] & remaining
+    separator_size = (neighbourhood & unvisited).bit_count() + bool(neighbourhood & ends)
+    components = independent.bit_count()
+    if unvisited & ~independent & ~neighbourhood or (ends and not neighbourhood & ends):
+        components += 1
+    return components > separator_size
+
+
+def _feasible(masks: list[int], start: int, end: int, unvisited: int) -> bool:
+    """Whether a path from start to end may still extend to a Hamiltonian
+    cycle: the start needs an unvisited neighbour, every unvisited vertex
+    needs two neighbours among the unvisited vertices and the ends of the
+    path, the unvisited vertices must be reachable from the end, and they
+    must not be _is_too_loose()"""
+    if not masks[start] & unvisited:
+        return False
+    open_vertices = unvisited | 1 << end | 1 << start
+    for vertex in _bits(unvisited):
+        if (masks[vertex] & open_vertices).bit_count() < 2:
+            return False
+    return (_is_connected(masks, unvisited | 1 << end, end)
+            and not _is_too_loose(masks, unvisited, 1 << start | 1 << end))
+
+
+def _extend(masks: list[int], prefix: list[int], deadline: float | None = None,
+            stop: "Event | None" = None, max_steps: int | None = None) -> list[int] | None:
+    """Hamiltonian cycle starting with the given path, found with iterative
+    backtracking, or None if there is none. Raises TimeoutError once
+    time.monotonic() passes the deadline and _StepLimitReached after about
+    max_steps steps; returns None early once the stop event is set."""
+    vertex_count = len(masks)
+    start = prefix[0]
+    path = list(prefix)
+    unvisited = (1 << vertex_count) - 1
+    for vertex in path:
+        unvisited ^= 1 << vertex
+    if not unvisited:
+        return path if masks[path[-1]] >> start & 1 else None
+
+    _check_deadline(deadline)
+    stack = [_candidates(masks, path[-1], unvisited)]
+    steps = 0
+    while stack:
+        steps += 1
+        if steps % CHECK_INTERVAL == 0:
+            _check_deadline(deadline)
+            if stop is not None and stop.is_set():
+                return None
+            if max_steps is not None and steps >= max_steps:
+                raise _StepLimitReached()
+
+        if not stack[-1]:
+            stack.pop()
+            if not stack:
+                break
+            unvisited |= 1 << path.pop()
+            continue
+
+        vertex = stack[-1].pop()
+        path.append(vertex)
+        unvisited ^= 1 << vertex
+        if not unvisited:
+            if masks[vertex] >> start & 1:
+                return path
+        elif _feasible(masks, start, vertex, unvisited):
+            stack.append(_candidates(masks, vertex, unvisited))
+            continue
+
+        unvisited |= 1 << path.pop()
+    return None
+
+
+def _start_vertex(masks: list[int]) -> int:
+    return min(range(len(masks)), key=lambda v: masks[v].bit_count())
+
+
+def backtrack(masks: list[int], deadline: float | None = None,
+              max_steps: int | None = None) -> list[int] | None:
+    """Hamiltonian cycle found with iterative backtracking over bitsets.
+
+    The search starts at a vertex of minimum degree and tries neighbours
+    with the fewest unvisited neighbours first. A partial path is abandoned
+    as soon as it fails _feasible(), which checks degrees, connectivity and
+    toughness of the unvisited vertices."""
+    return _extend(masks, [_start_vertex(masks)], deadline, max_steps=max_steps)
+
+
+def _prefixes(masks: list[int], depth: int) -> Iterator[list[int]]:
+    """Feasible paths of depth edges from the start vertex, generated in the
+    order in which backtrack() would try them"""
+    vertex_count = len(masks)
+    start = _start_vertex(masks)
+    depth = min(depth, vertex_count - 2)
+    stack = [[start]]
+    while stack:
+        prefix = stack.pop()
+        if len(prefix) > depth:
+            yield prefix
+            continue
+
+        unvisited = (1 << vertex_count) - 1
+        for vertex in prefix:
+            unvisited ^= 1 << vertex
+        for vertex in _candidates(masks, prefix[-1], unvisited):
+            if _feasible(masks, start, vertex, unvisited ^ 1 << vertex):
+                stack.append(prefix + [vertex])
+
+
+class _WorkerState:
+    """State of a worker process, set once by the pool initializer so that it
+    isn't sent with every subtree"""
+
+    def __init__(self):
+        self.masks: list[int] = []
+        self.stop: "Event | None" = None
+
+
+_worker_state = _WorkerState()
+
+
+def _init_worker(masks: list[int], stop: "Event"):
+    _worker_state.masks = masks
+    _worker_state.stop = stop
+
+
+def _search_subtree(prefix: list[int], deadline: float | None) -> list[int] | None:
+    return _extend(_worker_state.masks, prefix, deadline, _worker_state.stop)
+
+
+def parallel_backtrack(masks: list[int], split_depth: int = DEFAULT_SPLIT_DEPTH,
+                       workers: int | None = None,
+                       deadline: float | None = None) -> list[int] | None:
+    """backtrack() with the search tree split into the subtrees below the
+    feasible paths of split_depth edges, which are searched by a pool of
+    worker processes (one per CPU by default). Subtrees are submitted in
+    search order, a few per worker at a time. As soon as one of them yields
+    a cycle the running workers are stopped and the rest is cancelled."""
+    # process pools take a noticeable part of the startup time, so they are
+    # only imported once a parallel search is actually run
+    from concurrent.futures import (  # pylint: disable=import-outside-toplevel
+        FIRST_COMPLETED, Future, ProcessPoolExecutor, wait)
+    import multiprocessing  # pylint: disable=import-outside-toplevel
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    prefixes = _prefixes(masks, split_depth)
+    stop = multiprocessing.Event()
+    pending: set[Future] = set()
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(masks, stop)) as executor:
+        try:
+            while True:
+                for prefix in islice(prefixes, 2 * workers - len(pending)):
+                    pending.add(executor.submit(_search_subtree, prefix, deadline))
+                if not pending:
+                    return None
+
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                done, pending = wait(pending, timeout, FIRST_COMPLETED)
+                if not done:
+                    raise TimeoutError("Hamiltonian cycle search ran out of time")
+                for future in done:
+                    cycle = future.result()
+                    if cycle is not None:
+                        return cycle
+        finally:
+            stop.set()
+            for future in pending:
+                future.cancel()
+
+
+def find_hamiltonian_cycle(adjacency_list: list[list[int]], parallel: bool = False,
+                           split_depth: int = DEFAULT_SPLIT_DEPTH,
+                           workers: int | None = None,
+                           timeout: float | None = None) -> list[int] | None:
+    """Hamiltonian cycle of an undirected graph as a list of its vertices, or
+    None if there is none.
+
+    Graphs which fail a necessary condition (a vertex of degree below 2,
+    disconnectedness, an articulation point, unequal sides of a bipartite
+    graph or an independent set larger than its neighbourhood) are rejected
+    immediately. Small graphs are then given a short backtrack() and solved
+    with held_karp() if it doesn't finish; larger ones are searched with
+    backtrack(), or parallel_backtrack() if parallel is True. If timeout
+    seconds pass before the search ends, TimeoutError is raised."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    vertex_count = len(adjacency_list)
+    if vertex_count == 0:
+        return None
+    if vertex_count == 1:
+        return [0] if 0 in adjacency_list[0] else None
+    if vertex_count == 2:
+        return [0, 1] if 1 in adjacency_list[0] else None
+
+    masks = _neighbour_masks(adjacency_list)
+    if any(mask.bit_count() < 2 for mask in masks):
+        return None
+    if not _is_connected(masks, (1 << vertex_count) - 1, 0):
+        return None
+    if _has_articulation_point(masks) or _is_unbalanced_bipartite(masks) \
+            or _is_too_loose(masks, (1 << vertex_count) - 1):
+        return None
+
+    if vertex_count <= HELD_KARP_LIMIT:
+        # most graphs are solved by a search much shorter than Held-Karp,
+        # which bounds the time needed for the others
+        max_steps = CHECK_INTERVAL << max(0, vertex_count - SHORT_SEARCH_OFFSET)
+        try:
+            return backtrack(masks, deadline, max_steps)
+        except _StepLimitReached:
+            return held_karp(masks, deadline)
+    if parallel:
+        return parallel_backtrack(masks, split_depth, workers, deadline)
+    return backtrack(masks, deadline)
@@ -0,0 +1,142 @@
+from __future__ import annotations
+from typing import NamedTuple
+import numpy as np
+
+from graph.bitset import DENSITY_THRESHOLD, BitsetGraph, density
+from graph.connectivity import propagation_labels
+from graph.csr import CSRGraph
+from graph.sampling import find_repeated, isin_sorted
+
+
+class SwapStatistics(NamedTuple):
+    """Outcome of a run of double edge swaps"""
+    attempts: int
+    swaps: int
+    rolled_back: int = 0
+
+    @property
+    def acceptance_rate(self) -> float:
+        return self.swaps / self.attempts if self.attempts else 0.0
+
+
+def _is_connected(vertex_count: int, first: np.ndarray, second: np.ndarray) -> bool:
+    if vertex_count == 0:
+        return True
+    return int(propagation_labels(CSRGraph.from_edges(vertex_count, first, second)).max()) == 0
+
+
+def double_edge_swap(vertex_count: int, first: np.ndarray, second: np.ndarray, n_swaps: int,
+                     rng: np.random.Generator, connected: bool = False,
+                     max_attempts: int | None = None) -> SwapStatistics:
+    """Randomise a simple graph given as parallel arrays of edge endpoints in
+    place, keeping the degree of every vertex.
+
+    Every swap picks two edges u-v and x-y and replaces them with u-x and
+    v-y, unless that would create a loop or a parallel edge. Swaps are
+    proposed in rounds of up to edge_count / 2 swaps of pairwise distinct
+    edges, which are checked against a sorted array of encoded edges all at
+    once, so an attempt only costs a few vectorised operations. Dense graphs
+    are checked against a BitsetGraph instead, which answers lookups and
+    updates in constant time. A swap whose new edge clashes with another
+    swap of the same round is rejected.
+    Stops after n_swaps successful swaps or max_attempts attempts (100 times
+    n_swaps by default).
+
+    With connected=True the graph must be connected and stays connected:
+    connectivity is checked after every round and a round which
+    disconnected the graph is undone. The round size is halved after every
+    failure and doubled after every success."""
+    if max_attempts is None:
+        max_attempts = 100 * n_swaps
+    edge_count = len(first)
+    if edge_count < 2 or n_swaps <= 0:
+        return SwapStatistics(0, 0)
+
+    def encode(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return np.minimum(a, b) * vertex_count + np.maximum(a, b)
+
+    bitset = None
+    keys = np.empty(0, dtype=np.int64)
+    if density(vertex_count, edge_count) >= DENSITY_THRESHOLD:
+        bitset = BitsetGraph.empty(vertex_count)
+        bitset.add_edges(first, second)
+    else:
+        keys = np.sort(encode(first, second))
+    attempts = 0
+    swaps = 0
+    rolled_back = 0
+    round_limit = edge_count // 2
+
+    while swaps < n_swaps and attempts < max_attempts:
+        # propose about as many swaps as are still needed, given the acceptance so far
+        remaining = n_swaps - swaps
+        expected = remaining if swaps == 0 else -(-remaining * attempts // swaps)
+        size = max(1, min(round_limit, expected, max_attempts - attempts))
+
+        picks = rng.choice(edge_count, size=2 * size, replace=False)
+        i, j = picks[:size], picks[size:]
+        flip = rng.integers(0, 2, size=size).astype(bool)
+        u, v = first[i], second[i]
+        x = np.where(flip, second[j], first[j])
+        y = np.where(flip, first[j], second[j])
+        new_a, new_b = encode(u, x), encode(v, y)
+
+        accepted = (u != x) & (v != y) & (new_a != new_b)
+        if bitset is None:
+            accepted &= ~(isin_sorted(keys, new_a) | isin_sorted(keys, new_b))
+        else:
+            accepted &= ~(bitset.has_edges(u, x) | bitset.has_edges(v, y))
+        candidates = np.flatnonzero(accepted)
+        clashes = find_repeated(np.concatenate((new_a[candidates], new_b[candidates])))
+        accepted[candidates[clashes[:len(candidates)] | clashes[len(candidates):]]] = False
+
+        accepted = np.flatnonzero(accepted)
+        if len(accepted) > remaining:
+            accepted = accepted[:remaining]
+            attempts += int(accepted[-1]) + 1
+        else:
+            attempts += size
+        if len(accepted) == 0:
+            continue
+
+        i, j = i[accepted], j[accepted]
+        old_first_i, old_second_i = first[i], second[i]
+        old_first_j, old_second_j = first[j], second[j]
+        old_keys = keys
+
+        if bitset is None:
+            removed = np.sort(np.concatenate((encode(old_first_i, old_second_i),
+                                              encode(old_first_j, old_second_j))))
+            kept = np.ones(len(keys), dtype=bool)
+            kept[np.searchsorted(keys, removed)] = False
+            added = np.sort(np.concatenate((new_a[accepted], new_b[accepted])))
+            keys = keys[kept]
+            keys = np.insert(keys, np.searchsorted(keys, added), added)
+        else:
+            bitset.remove_edges(np.concatenate((old_first_i, old_first_j)),
+                                np.concatenate((old_second_i, old_second_j)))
+            bitset.add_edges(np.concatenate((u[accepted], v[accepted])),
+                             np.concatenate((x[accepted], y[accepted])))
+
+        first[i], second[i] = u[accepted], x[accepted]
+        first[j], second[j] = v[accepted], y[accepted]
+
+        if connected:
+            if _is_connected(vertex_count, first, second):
+                round_limit = min(2 * round_limit, edge_count // 2)
+            else:
+                first[i], second[i] = old_first_i, old_second_i
+                first[j], second[j] = old_first_j, old_second_j
+                keys = old_keys
+                if bitset is not None:
+                    bitset.remove_edges(np.concatenate((u[accepted], v[accepted])),
+                                        np.concatenate((x[accepted], y[accepted])))
+                    bitset.add_edges(np.concatenate((old_first_i, old_first_j)),
+                                     np.concatenate((old_second_i, old_second_j)))
+                rolled_back += len(accepted)
+                round_limit = max(1, round_limit // 2)
+                continue
+
+        swaps += len(accepted)
+
+    return SwapStatistics(attempts, swaps, rolled_back)
@@ -0,0 +1,336 @@
+from __future__ import annotations
+import numpy as np
+
+from graph.connectivity import propagation_labels
+from graph.csr import CSRGraph
+
+
+def pair_count(n: int) -> int:
+    """Number of unordered pairs of distinct vertices"""
+    return n * (n - 1) // 2
+
+
+def decode_pairs(n: int, indices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Map indices in [0, n(n-1)/2) to the pairs (i, j), i < j, which they
+    number in row-major order: (0, 1), (0, 2), ..., (0, n-1), (1, 2), ..."""
+    indices = np.asarray(indices, dtype=np.int64)
+
+    def row_start(row):
+        return row * (2 * n - row - 1) // 2
+
+    # solve row_start(i) <= k for the largest i, then fix floating point errors
+    b = 2 * n - 1
+    rows = ((b - np.sqrt(np.maximum(b * b - 8.0 * indices, 0))) // 2).astype(np.int64)
+    rows = np.clip(rows, 0, max(n - 2, 0))
+    rows -= row_start(rows) > indices
+    rows += row_start(rows + 1) <= indices
+    columns = indices - row_start(rows) + rows + 1
+    return rows, columns
+
+
+def encode_pairs(n: int, first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Inverse of decode_pairs, the endpoints of every pair may be in any order"""
+    first = np.asarray(first, dtype=np.int64)
+    second = np.asarray(second, dtype=np.int64)
+    rows, columns = np.minimum(first, second), np.maximum(first, second)
+    return rows * (2 * n - rows - 1) // 2 + columns - rows - 1
+
+
+def decode_ordered_pairs(n: int, indices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Map indices in [0, n(n-1)) to the pairs (i, j), i != j, which they
+    number in row-major order: (0, 1), ..., (0, n-1), (1, 0), (1, 2), ..."""
+    indices = np.asarray(indices, dtype=np.int64)
+    rows, columns = np.divmod(indices, max(n - 1, 1))
+    columns += columns >= rows
+    return rows, columns
+
+
+def sample_bernoulli(total: int, p: float, rng: np.random.Generator,
+                     chunk_size: int = 1 << 20) -> np.ndarray:
+    """Sorted indices from [0, total), each one included independently with
+    probability p. Instead of drawing a number for every index, the gaps
+    between included indices are drawn from a geometric distribution
+    (Batagelj and Brandes), so the expected cost is O(1 + total * p)."""
+    if total == 0 or p <= 0:
+        return np.zeros(0, dtype=np.int64)
+    if p >= 1:
+        return np.arange(total, dtype=np.int64)
+
+    batch_size = min(chunk_size, int(total * p * 1.05) + 64)
+    chunks = []
+    position = -1
+    while position < total:
+        positions = position + np.cumsum(rng.geometric(p, size=batch_size))
+        chunks.append(positions[positions < total])
+        position = int(positions[-1])
+    return np.concatenate(chunks)
+
+
+def isin_sorted(sorted_keys: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    """Which queries are in sorted_keys"""
+    if len(sorted_keys) == 0:
+        return np.zeros(len(queries), dtype=bool)
+    # searching for sorted queries is far more cache friendly
+    order = np.argsort(queries)
+    positions = np.minimum(np.searchsorted(sorted_keys, queries[order]), len(sorted_keys) - 1)
+    found = np.empty(len(queries), dtype=bool)
+    found[order] = sorted_keys[positions] == queries[order]
+    return found
+
+
+def find_repeated(values: np.ndarray) -> np.ndarray:
+    """Which values occur more than once"""
+    order = np.argsort(values)
+    sorted_values = values[order]
+    same = sorted_values[1:] == sorted_values[:-1]
+    repeated = np.zeros(len(values), dtype=bool)
+    repeated[order[1:][same]] = True
+    repeated[order[:-1][same]] = True
+    return repeated
+
+
+def sample_distinct(total: int, count: int, rng: np.random.Generator) -> np.ndarray:
+    """Uniformly sample count distinct integers from [0, total), in batches.
+    When count is more than half of total the excluded integers are sampled
+    instead, so the expected number of batches stays small."""
+    if count > total // 2:
+        excluded = sample_distinct(total, total - count, rng)
+        return np.setdiff1d(np.arange(total, dtype=np.int64), excluded, assume_unique=True)
+
+    chosen = np.zeros(0, dtype=np.int64)
+    while len(chosen) < count:
+        missing = count - len(chosen)
+        batch = rng.integers(0, total, size=missing + missing // 8 + 16, dtype=np.int64)
+        chosen = np.concatenate((chosen, batch))
+        chosen.sort()
+        chosen = chosen[np.concatenate(([True], chosen[1:] != chosen[:-1]))]
+
+    # every value in the union is equally likely, so a random subset of the
+    # right size is a uniform sample
+    if len(chosen) > count:
+        excess = rng.choice(len(chosen), size=len(chosen) - count, replace=False)
+        chosen = np.delete(chosen, excess)
+    return chosen
+
+
+def _invalid_edges(n: int, first: np.ndarray, second: np.ndarray,
+                   candidates: np.ndarray) -> np.ndarray:
+    """Those of the candidate edges which are loops or have parallel copies"""
+    loops = first == second
+    keys = encode_pairs(n, first, second)
+    keys[loops] = -1 - np.flatnonzero(loops)
+    sorted_keys = np.sort(keys)
+    # searching for sorted keys is far more cache friendly
+    candidates = candidates[np.argsort(keys[candidates])]
+    candidate_keys = keys[candidates]
+    copies = (np.searchsorted(sorted_keys, candidate_keys, side="right")
+              - np.searchsorted(sorted_keys, candidate_keys, side="left"))
+    return candidates[(copies > 1) | loops[candidates]]
+
+
+def sample_regular_edges(n: int, k: int, rng: np.random.Generator
+                         ) -> tuple[np.ndarray, np.ndarray]:
+    """Edges of a random simple k-regular graph on n vertices, n * k must be even.
+
+    Every vertex gets k stubs which are shuffled and paired up (the
+    configuration model). Loops and multi-edges are repaired by shuffling
+    their stubs together with the stubs of as many randomly chosen edges and
+    pairing them up again, which keeps all degrees and only touches a small
+    fraction of the edges. Graphs with k > (n - 1) / 2 are built as the
+    complement of a random (n - 1 - k)-regular graph."""
+    if 2 * k > n - 1:
+        first, second = sample_regular_edges(n, n - 1 - k, rng)
+        pairs = np.setdiff1d(np.arange(pair_count(n), dtype=np.int64),
+                             encode_pairs(n, first, second), assume_unique=True)
+        return decode_pairs(n, pairs)
+
+    stubs = np.repeat(np.arange(n, dtype=np.int64), k)
+    rng.shuffle(stubs)
+    first, second = stubs[0::2].copy(), stubs[1::2].copy()
+    edge_count = len(first)
+
+    invalid = _invalid_edges(n, first, second, np.arange(edge_count))
+    while len(invalid) > 0:
+        partners = rng.integers(0, edge_count, size=len(invalid) + 1)
+        edges = np.union1d(invalid, partners)
+        stubs = np.concatenate((first[edges], second[edges]))
+        rng.shuffle(stubs)
+        first[edges], second[edges] = stubs[0::2], stubs[1::2]
+        invalid = _invalid_edges(n, first, second, edges)
+
+    return first, second
+
+
+def _pair_index(n: int, a: int, b: int) -> int:
+    """Scalar encode_pairs"""
+    if a > b:
+        a, b = b, a
+    return a * (2 * n - a - 1) // 2 + b - a - 1
+
+
+def _cycle_indices(n: int, vertices: list[int]) -> list[int]:
+    return [_pair_index(n, a, b) for a, b in zip(vertices, vertices[1:] + vertices[:1])]
+
+
+def _add_random_triangles(n: int, pairs: np.ndarray, count: int,
+                          rng: np.random.Generator) -> np.ndarray:
+    """Add count edge-disjoint triangles on random vertices to a sorted array
+    of pair indices. Triangles are proposed in batches; a triangle is
+    rejected if it shares an edge with the graph or with an earlier
+    triangle of its batch."""
+    acceptance = 1.0
+    empty_batches = 0
+    while count > 0:
+        free = pair_count(n) - len(pairs)
+        size = max(16, min(int(count / acceptance * 1.1) + 16, free, 1 << 20))
+        a, b, c = rng.integers(0, n, size=(3, size))
+        distinct = (a != b) & (b != c) & (a != c)
+        triangles = np.stack((encode_pairs(n, a, b), encode_pairs(n, b, c),
+                              encode_pairs(n, a, c)), axis=1)[distinct]
+        triangles = triangles[~isin_sorted(pairs, triangles.ravel()).reshape(-1, 3).any(axis=1)]
+
+        # every edge belongs to the first triangle which contains it
+        edges = triangles.ravel()
+        order = np.argsort(edges, kind="stable")
+        group_starts = np.concatenate(([True], edges[order][1:] != edges[order][:-1]))
+        owners = np.empty(len(edges), dtype=np.int64)
+        owners[order] = order[np.flatnonzero(group_starts)[np.cumsum(group_starts) - 1]] // 3
+        owned = (owners == np.arange(len(edges)) // 3).reshape(-1, 3).all(axis=1)
+        triangles = triangles[owned][:count]
+
+        if len(triangles) == 0:
+            empty_batches += 1
+            if empty_batches > 100:
+                raise ArithmeticError(
+                    "number of edge and node can't be used to generate euler graph")
+        acceptance = max(len(triangles) / size, 1e-3)
+        pairs = np.sort(np.concatenate((pairs, triangles.ravel())))
+        count -= len(triangles)
+    return pairs
+
+
+def _add_random_cycles(n: int, pairs: set[int], edge_count: int, rng: np.random.Generator):
+    """Add edge-disjoint cycles on random vertices with edge_count edges in
+    total to a set of pair indices. Most edges are added as batches of
+    triangles, the last few as cycles which get shorter as the graph gets
+    denser, so that about half of the attempts succeed."""
+    remaining = edge_count
+    if remaining > 8:
+        triangle_count = (remaining - 6) // 3
+        array = np.sort(np.fromiter(pairs, dtype=np.int64, count=len(pairs)))
+        pairs.update(_add_random_triangles(n, array, triangle_count, rng).tolist())
+        remaining -= 3 * triangle_count
+
+    failures = 0
+    while remaining > 0:
+        if remaining in (1, 2):
+            raise ArithmeticError(
+                "number of edge and node can't be used to generate euler graph")
+
+        density = len(pairs) / max(pair_count(n), 1)
+        longest = n if density == 0 else int(np.log(0.5) / np.log1p(-min(density, 0.99)))
+        longest = max(3, min(longest, n, remaining))
+        length = int(rng.integers(3, longest + 1))
+        if remaining - length in (1, 2):
+            # never leave a remainder which no cycle can fill
+            length = remaining if remaining <= n else remaining - 3
+
+        cycle = _cycle_indices(n, rng.choice(n, size=length, replace=False).tolist()) \
+            if 3 <= length <= n else None
+        if cycle is None or any(pair in pairs for pair in cycle):
+            failures += 1
+            if failures > 100 * (edge_count + 10):
+                raise ArithmeticError(
+                    "number of edge and node can't be used to generate euler graph")
+            continue
+
+        pairs.update(cycle)
+        remaining -= length
+
+
+def _sparse_euler_pairs(n: int, k: int, connected: bool, rng: np.random.Generator) -> set[int]:
+    """A covering cycle structure if the graph must be connected, and random
+    edge-disjoint cycles for the remaining edges"""
+    pairs: set[int] = set()
+    remaining = k
+    if connected and n > 0:
+        order = rng.permutation(n).tolist()
+        shared = k - n
+        if shared in (1, 2):
+            # two cycles sharing one or two vertices, every edge of the second
+            # cycle has an endpoint which isn't on the first one
+            if n < 5:
+                raise ArithmeticError(
+                    "number of edge and node can't be used to generate euler graph")
+            length = int(rng.integers(3, n - 1))
+            first_cycle, new_vertices = order[:length], order[length:]
+            second_cycle = [first_cycle[0]] + new_vertices
+            if shared == 2:
+                split = int(rng.integers(1, len(new_vertices)))
+                second_cycle.insert(split + 1, first_cycle[int(rng.integers(1, length))])
+            pairs.update(_cycle_indices(n, first_cycle))
+            pairs.update(_cycle_indices(n, second_cycle))
+            remaining = 0
+        else:
+            pairs.update(_cycle_indices(n, order))
+            remaining = k - n
+
+    _add_random_cycles(n, pairs, remaining, rng)
+    return pairs
+
+
+def _dense_euler_complement(n: int, k: int, rng: np.random.Generator) -> set[int]:
+    """The complement of a dense graph with even degrees. With an even
+    number of vertices every vertex of the complement has an odd degree, so
+    it's a perfect matching (or a small tree and a matching) plus cycles."""
+    pairs: set[int] = set()
+    remaining = pair_count(n) - k
+    if n % 2 == 0 and n > 0:
+        order = rng.permutation(n).tolist()
+        # a star with 3 leaves, or two adjacent vertices with 2 leaves each, has 1
+        # or 2 edges more than a matching of its vertices
+        extra = remaining - n // 2
+        trees = {1: [(0, 1), (0, 2), (0, 3)],
+                 2: [(0, 1), (0, 2), (0, 3), (1, 4), (1, 5)]}.get(extra, [])
+        tree_size = len(trees) + 1 if trees else 0
+        if tree_size > n:
+            raise ArithmeticError(
+                "number of edge and node can't be used to generate euler graph")
+        pairs.update(_pair_index(n, order[a], order[b]) for a, b in trees)
+        rest = order[tree_size:]
+        pairs.update(_pair_index(n, a, b) for a, b in zip(rest[0::2], rest[1::2]))
+        remaining -= len(pairs)
+
+    _add_random_cycles(n, pairs, remaining, rng)
+    return pairs
+
+
+def sample_euler_edges(n: int, k: int, connected: bool, rng: np.random.Generator,
+                       attempts: int = 20) -> tuple[np.ndarray, np.ndarray]:
+    """Edges of a random graph with n vertices, k edges and even degrees,
+    connected if required. Raises ArithmeticError if no such graph exists or
+    none was found in the given number of attempts.
+
+    Sparse graphs are a covering cycle (or two cycles sharing one or two
+    vertices) plus random edge-disjoint cycles. Dense graphs are built by
+    removing such cycles (and a matching when n is even) from the complete
+    graph, and checked for connectivity."""
+    total = pair_count(n)
+    if k > total - (n // 2 if n % 2 == 0 else 0):
+        raise ArithmeticError("number of edge is too big")
+
+    for _ in range(attempts):
+        if 2 * k <= total:
+            pairs = np.fromiter(_sparse_euler_pairs(n, k, connected, rng), dtype=np.int64)
+            first, second = decode_pairs(n, pairs)
+            return first, second
+
+        complement = np.fromiter(_dense_euler_complement(n, k, rng), dtype=np.int64)
+        pairs = np.setdiff1d(np.arange(total, dtype=np.int64), complement)
+        first, second = decode_pairs(n, pairs)
+        if not connected or n == 0 or \
+                propagation_labels(CSRGraph.from_edges(n, first, second)).max() == 0:
+            return first, second
+
+    raise ArithmeticError(
+        "number of edge and node can't be used to generate euler graph")
@@ -0,0 +1,358 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from os import PathLike
+import os
+import stat
+import struct
+from typing import IO, Iterable, Iterator
+import warnings
+import numpy as np
+
+from graph.csr import CSRGraph, index_dtype
+
+# default number of characters read from the input at once
+CHUNK_SIZE = 1 << 22
+
+# default number of characters collected before writing them to the output
+WRITE_BATCH_SIZE = 1 << 20
+
+Source = str | PathLike | IO
+
+
+@contextmanager
+def open_source(source: Source) -> Iterator[IO]:
+    """Open a path for binary reading, or pass an already open file object through"""
+    if isinstance(source, (str, PathLike)):
+        with open(source, "rb") as file:
+            yield file
+    else:
+        yield source
+
+
+def iter_line_chunks(source: Source, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Read the input in chunks of roughly chunk_size characters, each one
+    ending on a line boundary, so no line is ever split between two chunks"""
+    with open_source(source) as file:
+        leftover = b""
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+
+            last_newline = chunk.rfind(b"\n")
+            if last_newline == -1:
+                leftover += chunk
+                continue
+
+            yield leftover + chunk[:last_newline + 1]
+            leftover = chunk[last_newline + 1:]
+
+        if leftover:
+            yield leftover
+
+
+_WHITESPACE = np.zeros(256, dtype=bool)
+_WHITESPACE[list(b" \t\r\n\v\f")] = True
+
+_VALID = _WHITESPACE.copy()
+_VALID[list(b"0123456789+-")] = True
+
+
+def _token_starts(characters: np.ndarray) -> np.ndarray:
+    """Positions of the first characters of all whitespace separated tokens"""
+    whitespace = _WHITESPACE[characters]
+    return np.flatnonzero(~whitespace & np.concatenate(([True], whitespace[:-1])))
+
+
+def tokenize_lines(chunk: bytes) -> tuple[np.ndarray, np.ndarray]:
+    """Convert whitespace separated integers into an array of all values and an
+    array with the number of values found on each line"""
+    characters = np.frombuffer(chunk, dtype=np.uint8)
+    if not _VALID[characters].all():
+        raise ValueError("input contains characters which are not part of an integer")
+
+    token_starts = _token_starts(characters)
+    newlines = np.flatnonzero(characters == ord("\n"))
+
+    line_count = len(newlines)
+    if chunk and not chunk.endswith(b"\n"):
+        line_count += 1
+    counts = np.bincount(np.searchsorted(newlines, token_starts),
+                         minlength=line_count)
+
+    with warnings.catch_warnings():
+        # malformed input is reported below by comparing the token count
+        warnings.simplefilter("ignore", DeprecationWarning)
+        values = np.fromstring(chunk, dtype=np.int64, sep=" ")  # type: ignore
+    if len(values) != len(token_starts):
+        raise ValueError("input contains malformed integers")
+
+    return counts, values
+
+
+def _concatenate_rows(counts: list[np.ndarray], values: list[np.ndarray]
+                      ) -> tuple[np.ndarray, np.ndarray]:
+    row_lengths = np.concatenate(counts) if counts else np.zeros(0, dtype=np.int64)
+    indptr = np.zeros(len(row_lengths) + 1,
+                      dtype=index_dtype(int(row_lengths.sum())))
+    np.cumsum(row_lengths, out=indptr[1:])
+    flat = np.concatenate(values) if values else np.zeros(0, dtype=np.int64)
+    return indptr, flat
+
+
+def _check_pair_separators(chunk: bytes, colons: np.ndarray):
+    """Check that the vertex and weight of every pair are joined by a single
+    colon, i.e. that each weight directly follows a colon which directly
+    follows its vertex, and that there are no other colons"""
+    characters = np.frombuffer(chunk, dtype=np.uint8)
+    weight_starts = _token_starts(characters)[1::2]
+    colon_positions = np.flatnonzero(colons)
+    if (len(colon_positions) != len(weight_starts)
+            or not np.array_equal(colon_positions, weight_starts - 1)
+            or _WHITESPACE[characters[colon_positions - 1]].any()):
+        raise ValueError("every pair of a weighted adjacency list must have the form vertex:weight")
+
+
+def read_adjacency_list(source: Source, weighted: bool = False, directed: bool = False,
+                        chunk_size: int = CHUNK_SIZE) -> CSRGraph:
+    """Read an adjacency list, with one line of neighbours per vertex, directly
+    into CSR arrays. Weighted lists consist of "vertex:weight" pairs."""
+    counts = []
+    vertices = []
+    weights = []
+    for chunk in iter_line_chunks(source, chunk_size):
+        if weighted:
+            colons = np.frombuffer(chunk, dtype=np.uint8) == ord(":")
+            chunk = chunk.replace(b":", b" ")
+        chunk_counts, chunk_values = tokenize_lines(chunk)
+
+        if weighted:
+            if (chunk_counts % 2).any():
+                raise ValueError("weighted adjacency list contains an incomplete pair")
+            _check_pair_separators(chunk, colons)
+            chunk_counts //= 2
+            weights.append(chunk_values[1::2])
+            chunk_values = chunk_values[::2]
+
+        counts.append(chunk_counts)
+        vertices.append(chunk_values)
+
+    indptr, indices = _concatenate_rows(counts, vertices)
+    indices = indices.astype(index_dtype(len(indptr)))
+    weight_array = None
+    if weighted:
+        weight_array = np.concatenate(weights) if weights else np.zeros(0, dtype=np.int64)
+    return CSRGraph(indptr, indices, weight_array, directed)
+
+
+def _read_matrix_entries(source: Source, chunk_size: int
+                         ) -> Iterator[tuple[int, int, np.ndarray, np.ndarray]]:
+    """Yield (row count, column count, row indices, column indices) of all ones
+    in a 0/1 matrix, one chunk of rows at a time"""
+    column_count = None
+    row_offset = 0
+    for chunk in iter_line_chunks(source, chunk_size):
+        chunk_counts, chunk_values = tokenize_lines(chunk)
+        if column_count is None and len(chunk_counts) > 0:
+            column_count = int(chunk_counts[0])
+        if (chunk_counts != column_count).any():
+            raise ValueError("all rows of the matrix must have the same length")
+
+        rows, columns = np.nonzero(
+            chunk_values.reshape(len(chunk_counts), column_count or 0) == 1)
+        row_offset += len(chunk_counts)
+        yield row_offset, column_count or 0, rows + row_offset - len(chunk_counts), columns
+
+
+def read_adjacency_matrix(source: Source, directed: bool = False,
+                          chunk_size: int = CHUNK_SIZE) -> CSRGraph:
+    """Read an adjacency matrix into CSR arrays without ever storing it densely"""
+    rows = []
+    columns = []
+    vertex_count = 0
+    for vertex_count, _, chunk_rows, chunk_columns in _read_matrix_entries(source, chunk_size):
+        rows.append(chunk_rows)
+        columns.append(chunk_columns)
+
+    return CSRGraph.from_entries(
+        vertex_count,
+        np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64),
+        np.concatenate(columns) if columns else np.zeros(0, dtype=np.int64),
+        directed=directed)
+
+
+def read_incidence_matrix(source: Source, chunk_size: int = CHUNK_SIZE) -> CSRGraph:
+    """Read an incidence matrix of an undirected graph into CSR arrays. Only the
+    first two ones of every column are used to define the edge."""
+    vertices = []
+    edges = []
+    vertex_count = 0
+    for vertex_count, _, rows, columns in _read_matrix_entries(source, chunk_size):
+        vertices.append(rows)
+        edges.append(columns)
+
+    return CSRGraph.from_incidence(
+        vertex_count,
+        np.concatenate(vertices) if vertices else np.zeros(0, dtype=np.int64),
+        np.concatenate(edges) if edges else np.zeros(0, dtype=np.int64))
+
+
+def write_lines(file: IO[str], lines: Iterable[str], batch_size: int = WRITE_BATCH_SIZE):
+    """Write lines to a file object, joining them into batches of roughly
+    batch_size characters so the output is never materialised as a whole"""
+    batch = []
+    batch_length = 0
+    for line in lines:
+        batch.append(line)
+        batch_length += len(line)
+        if batch_length >= batch_size:
+            file.write("".join(batch))
+            batch.clear()
+            batch_length = 0
+    if batch:
+        file.write("".join(batch))
+
+
+def iter_adjacency_list_lines(adjacency_list: list[list]) -> Iterator[str]:
+    for row in adjacency_list:
+        yield " ".join(map(str, row)) + "\n"
+
+
+def _iter_matrix_lines(column_count: int, rows: Iterable[list[int]]) -> Iterator[str]:
+    """Yield lines of a 0/1 matrix, given the columns containing ones in each row.
+    A single line buffer is reused, so each row costs O(columns) to copy plus
+    O(ones) to fill in."""
+    line = bytearray(b"0 " * column_count) or bytearray(b" ")
+    line[-1] = ord("\n")
+    for columns in rows:
+        for column in columns:
+            line[2 * column] = ord("1")
+        yield line.decode()
+        for column in columns:
+            line[2 * column] = ord("0")
+
+
+def iter_adjacency_matrix_lines(adjacency_list: list[list[int]]) -> Iterator[str]:
+    return _iter_matrix_lines(len(adjacency_list), adjacency_list)
+
+
+def iter_incidence_matrix_lines(adjacency_list: list[list[int]]) -> Iterator[str]:
+    """Yield lines of the incidence matrix of an undirected graph. Edges are
+    numbered in the order in which they appear in the adjacency list."""
+    incident_edges = [[] for _ in adjacency_list]
+    edge_count = 0
+    for vertex_a, row in enumerate(adjacency_list):
+        for vertex_b in row:
+            if vertex_a < vertex_b:
+                incident_edges[vertex_a].append(edge_count)
+                incident_edges[vertex_b].append(edge_count)
+                edge_count += 1
+    return _iter_matrix_lines(edge_count, incident_edges)
+
+
+# binary format: a fixed size header followed by the indptr, indices and
+# (optionally) weights arrays of a CSRGraph, each aligned to 8 bytes
+BINARY_MAGIC = b"GRAFYCSR"
+BINARY_VERSION = 1
+_BINARY_HEADER = struct.Struct("<8sIIQQ8s8s8s8x")
+_DIRECTED_FLAG = 1
+_WEIGHTED_FLAG = 2
+
+
+def _aligned(offset: int) -> int:
+    return (offset + 7) // 8 * 8
+
+
+def _binary_layout(vertex_count: int, entry_count: int, dtypes: list[np.dtype]
+                   ) -> list[tuple[int, int]]:
+    """Offsets and lengths of all arrays stored after the header"""
+    layout = []
+    offset = _BINARY_HEADER.size
+    for dtype, length in zip(dtypes, [vertex_count + 1, entry_count, entry_count]):
+        layout.append((offset, length))
+        offset = _aligned(offset + length * dtype.itemsize)
+    return layout
+
+
+def write_binary(csr: CSRGraph, file: str | PathLike | IO[bytes]):
+    """Write a CSRGraph in the binary format, which can later be opened
+    without parsing using read_binary"""
+    if isinstance(file, (str, PathLike)):
+        with open(file, "wb") as opened_file:
+            write_binary(csr, opened_file)
+        return
+
+    if hasattr(file, "buffer"):
+        # text streams such as sys.stdout
+        file.flush()
+        file = file.buffer  # type: ignore
+
+    arrays = [csr.indptr, csr.indices]
+    flags = _DIRECTED_FLAG if csr.directed else 0
+    if csr.weights is not None:
+        arrays.append(csr.weights)
+        flags |= _WEIGHTED_FLAG
+    arrays = [np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<"))
+              for array in arrays]
+    dtype_names = [array.dtype.str.encode() for array in arrays] + [b""] * (3 - len(arrays))
+
+    file.write(_BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, flags,
+                                   csr.vertex_count, len(csr.indices), *dtype_names))
+    position = _BINARY_HEADER.size
+    for array in arrays:
+        file.write(b"\0" * (_aligned(position) - position))
+        position = _aligned(position)
+        file.write(array.tobytes())
+        position += array.nbytes
+    file.flush()
+
+
+def _is_mappable(file: IO[bytes]) -> bool:
+    try:
+        return stat.S_ISREG(os.fstat(file.fileno()).st_mode)
+    except (AttributeError, OSError, ValueError):
+        return False
+
+
+def read_binary(source: Source, mmap: bool = True) -> CSRGraph:
+    """Open a graph stored in the binary format. Regular files are memory
+    mapped, so the arrays are loaded lazily by the operating system and shared
+    between processes through the page cache. Other inputs, such as pipes, are
+    read once and wrapped without copying."""
+    with open_source(source) as file:
+        file = getattr(file, "buffer", file)
+        start = file.tell() if _is_mappable(file) else 0
+
+        header = file.read(_BINARY_HEADER.size)
+        if len(header) != _BINARY_HEADER.size:
+            raise ValueError("input is too short to be a binary graph")
+        magic, version, flags, vertex_count, entry_count, *dtype_names = \
+            _BINARY_HEADER.unpack(header)
+        if magic != BINARY_MAGIC:
+            raise ValueError("input is not a binary graph")
+        if version != BINARY_VERSION:
+            raise ValueError(f"unsupported binary graph version {version}")
+
+        dtypes = [np.dtype(name.rstrip(b"\0").decode())
+                  for name in dtype_names if name.rstrip(b"\0")]
+        layout = _binary_layout(vertex_count, entry_count, dtypes)
+
+        arrays = []
+        if mmap and _is_mappable(file):
+            for dtype, (offset, length) in zip(dtypes, layout):
+                if length == 0:
+                    arrays.append(np.zeros(0, dtype=dtype))
+                    continue
+                arrays.append(np.memmap(file, dtype=dtype, mode="r",
+                                        offset=start + offset, shape=(length,)))
+        else:
+            data = header + file.read()
+            for dtype, (offset, length) in zip(dtypes, layout):
+                if offset + length * dtype.itemsize > len(data):
+                    raise ValueError("binary graph is truncated")
+                arrays.append(np.frombuffer(data, dtype=dtype, count=length, offset=offset))
+
+    weights = arrays[2] if flags & _WEIGHTED_FLAG else None
+    return CSRGraph(arrays[0], arrays[1], weights, bool(flags & _DIRECTED_FLAG))
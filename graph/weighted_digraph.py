@@ -1,11 +1,8 @@
 from __future__ import annotations
 import ctypes
 import random
-from copy import deepcopy
-import networkx as nx
-import matplotlib.pyplot as plt
 from typing import Self
-from graph import IDirectedGraph, IWeightedGraph
+from graph import IDirectedGraph, IGraph, IWeightedGraph
 
 
 class WeightedDigraph(IDirectedGraph, IWeightedGraph):
@@ -14,12 +11,11 @@ class WeightedDigraph(IDirectedGraph, IWeightedGraph):
     _approximate_tsp = None
 
     def add_edge(self, vertex_a, vertex_b, weight):
-        self.adjacency_list[vertex_a].append(
-            IWeightedGraph.Adjacency(vertex_b, weight))
+        self._append_entry(vertex_a, vertex_b,
+                           IWeightedGraph.Adjacency(vertex_b, weight))
 
     def remove_edge(self, vertex_a, vertex_b):
-        self.adjacency_list[vertex_a] = [
-            a for a in self.adjacency_list[vertex_a] if a.vertex != vertex_b]
+        self._remove_entries(vertex_a, vertex_b)
 
     @classmethod
     def generate_weighted_digraph(cls, digraph, lower, upper):
@@ -42,6 +38,8 @@ class WeightedDigraph(IDirectedGraph, IWeightedGraph):
 
         return True
 
+    __hash__ = IGraph.__hash__
+
     def bellman_ford(self, v: int, verbose: bool = False) -> tuple[bool, list]:
         """Bellman-Ford's algorithm. 
         Function prints costs and path from start vertex to every vertex in graph. 
@@ -56,20 +54,18 @@ class WeightedDigraph(IDirectedGraph, IWeightedGraph):
         for _ in range(1, self.vertex_count):
             test = True
             for x in range(self.vertex_count):
-                for k in range(len(self.adjacency_list[x])):
-                    y = self.adjacency_list[x][k].vertex
-                    if d[y] > d[x]+self.adjacency_list[x][k].weight:
+                for y, weight in self.adjacency_list[x]:
+                    if d[y] > d[x]+weight:
                         test = False
-                        d[y] = d[x]+self.adjacency_list[x][k].weight
+                        d[y] = d[x]+weight
                         p[y] = x
             if test is True:
                 if verbose:
                     self.__print_result(p, d)
                 return True, d
         for x in range(self.vertex_count):
-            for g in range(len(self.adjacency_list[x])):
-                y = self.adjacency_list[x][g].vertex
-                if d[y] > d[x]+self.adjacency_list[x][g].weight:
+            for y, weight in self.adjacency_list[x]:
+                if d[y] > d[x]+weight:
                     return False, d
         if verbose:
             self.__print_result(p, d)
@@ -89,10 +85,9 @@ class WeightedDigraph(IDirectedGraph, IWeightedGraph):
         queue = [v]
         while queue:
             x = queue.pop(0)
-            for k in range(len(self.adjacency_list[x])):
-                y = self.adjacency_list[x][k].vertex
-                if d[y] > d[x]+self.adjacency_list[x][k].weight:
-                    d[y] = d[x]+self.adjacency_list[x][k].weight
+            for y, weight in self.adjacency_list[x]:
+                if d[y] > d[x]+weight:
+                    d[y] = d[x]+weight
                     p[y] = x
                     queue.append(y)
         if verbose:
@@ -106,22 +101,25 @@ class WeightedDigraph(IDirectedGraph, IWeightedGraph):
         n = self.vertex_count
         s = [IWeightedGraph.Adjacency(i, 0) for i in range(n)]
         self.adjacency_list.append(s)
+        self.mark_modified()
 
         # running Bellman-Ford ,checking for negative cycles
         bellf_success, bellf_d = self.bellman_ford(n)
-        if not bellf_success:
-            return None
 
         # removing the new vertex from the graph
         self.adjacency_list.pop()
+        self.mark_modified()
+
+        if not bellf_success:
+            return None
 
         # creating a new graph, b-f reweighting
-        new_graph = WeightedDigraph(deepcopy(self.adjacency_list))
+        new_graph = WeightedDigraph([
+            [IWeightedGraph.Adjacency(vertex, weight + bellf_d[i] - bellf_d[vertex])
+             for vertex, weight in row]
+            for i, row in enumerate(self.adjacency_list)
+        ])
         d = []
-        for i in range(self.vertex_count):
-            for j in range(len(new_graph.adjacency_list[i])):
-                new_graph.adjacency_list[i][j].weight = new_graph.adjacency_list[i][j].weight + \
-                    bellf_d[i] - bellf_d[new_graph.adjacency_list[i][j].vertex]
 
         # running Dijkstra and reweighting
         for i in range(self.vertex_count):
@@ -142,6 +140,11 @@ class WeightedDigraph(IDirectedGraph, IWeightedGraph):
 
     def Edmonds_Karp(self, s: int, t: int, name: str) -> int:
         """Edmonds-Karp algorithm, returns maximum flow in digraph."""
+        # plotting libraries take most of the startup time, so they are only
+        # imported once something actually gets drawn
+        import networkx as nx  # pylint: disable=import-outside-toplevel
+        import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+
         # https://eduinf.waw.pl/inf/alg/001_search/0146.php
         adjacency_list = []
         for i in range(len(self.adjacency_list)):
@@ -1,96 +1,77 @@
 from __future__ import annotations
-from random import randrange
 from typing import Self
+import numpy as np
 
-from graph import Graph, IUndirectedGraph, IWeightedGraph
+from graph import Graph, IGraph, IUndirectedGraph, IWeightedGraph
+from graph.connectivity import UnionFind, components_from_labels
 
 
 class WeightedGraph(IUndirectedGraph, IWeightedGraph):
     """A weighted graph stored as an adjacency list"""
 
     def add_edge(self, vertex_a, vertex_b, weight):
-        self.adjacency_list[vertex_a].append(
-            IWeightedGraph.Adjacency(vertex_b, weight))
-        self.adjacency_list[vertex_b].append(
-            IWeightedGraph.Adjacency(vertex_a, weight))
+        self._append_entry(vertex_a, vertex_b,
+                           IWeightedGraph.Adjacency(vertex_b, weight))
+        self._append_entry(vertex_b, vertex_a,
+                           IWeightedGraph.Adjacency(vertex_a, weight))
 
     def remove_edge(self, vertex_a, vertex_b):
-        self.adjacency_list[vertex_a] = [
-            a for a in self.adjacency_list[vertex_a] if a.vertex != vertex_b]
-        self.adjacency_list[vertex_b] = [
-            a for a in self.adjacency_list[vertex_b] if a.vertex != vertex_a]
+        self._remove_entries(vertex_a, vertex_b)
+        self._remove_entries(vertex_b, vertex_a)
 
     @classmethod
-    def generate_weighted_connected(cls, n: int, l: int) -> Self:
+    def generate_weighted_connected(cls, n: int, l: int,
+                                    rng: np.random.Generator | None = None) -> Self:
         """Generate random weighted, connected graph using gnl algorithm.
-           Weights are random numbers from 1 to 10 included."""
+           Weights are random numbers from 1 to 10 included. All randomness
+           is drawn from rng, so a seeded generator gives the same graph."""
 
-        output = [[] for _ in range(n)]
-
-        if l >= n-1:
-            graph = Graph.generate_with_gnl_model(n, l)
-
-            comp_list = graph.find_components()
-            comp_list.sort(key=len)
-
-            adj_mat = Graph.adjacency_list_to_adjacency_matrix(
-                graph.adjacency_list)
-
-            while len(comp_list) > 1:
-                adj_mat = Graph.adjacency_list_to_adjacency_matrix(
-                    graph.adjacency_list)
-                comp_list.sort(key=len)
-                to_add = comp_list[0]
-                main_comp = comp_list[-1]
-                prev = comp_list[0][0]
-
-                for i in range(len(to_add)):
-                    v1 = to_add[i]
-                    v2 = main_comp[randrange(0, len(main_comp))]
-
-                    edges = [i for i in range(
-                        0, n) if adj_mat[v2][i] == 1]
-
-                    to_del = adj_mat[v1].index(
-                        1) if 1 in adj_mat[v1] else None
-
-                    choice = edges[randrange(0, len(edges))]
-
-                    adj_mat[v1][v2] = adj_mat[v2][v1] = 1
-                    adj_mat[v2][choice] = adj_mat[choice][v2] = 0
-
-                    if to_del is not None:
-                        adj_mat[v2][to_del] = adj_mat[to_del][v2] = 0
-
-                    prev = v2
-
-                    graph.adjacency_list = Graph.adjacency_matrix_to_adjacency_list(
-                        adj_mat)
-                    comp_list = graph.find_components()
-
-                    main_comp.remove(prev)
+        if l < n-1:
+            raise RuntimeError(
+                f"{l = } is too small to make connected graph of {n = } vertexes."
+            )
 
-                    if 1 not in adj_mat[choice]:
-                        main_comp.remove(choice)
+        if rng is None:
+            rng = np.random.default_rng()
+
+        edges = [(i, j) for i, row in
+                 enumerate(Graph.generate_with_gnl_model(n, l, rng).adjacency_list)
+                 for j in row if i < j]
+        edges = [edges[index] for index in rng.permutation(len(edges))]
+
+        # keep the edges which join two components, i.e. a random spanning forest.
+        # the other edges lie on cycles and can be moved without disconnecting anything
+        graph = Graph.empty(n)
+        connectivity = graph.track_connectivity()
+        spare_edges = []
+        for i, j in edges:
+            if connectivity.same_component(i, j):
+                spare_edges.append((i, j))
+            else:
+                graph.add_edge(i, j)
 
-                    if main_comp == []:
-                        main_comp = comp_list[-1]
+        # join the trees of the forest with as many edges as are dropped from
+        # spare_edges, which keeps the total edge count at l
+        trees = components_from_labels(connectivity.component_labels())
+        trees = [trees[index] for index in rng.permutation(len(trees))]
+        for index in range(1, len(trees)):
+            other_tree = trees[rng.integers(index)]
+            graph.add_edge(trees[index][rng.integers(len(trees[index]))],
+                           other_tree[rng.integers(len(other_tree))])
 
-            adjlist = graph.adjacency_list
+        for i, j in spare_edges[max(len(trees) - 1, 0):]:
+            graph.add_edge(i, j)
 
-            for i in range(n):
-                for j in adjlist[i]:
-                    weight = randrange(1, 10 + 1)
+        weights = iter(rng.integers(1, 10 + 1, size=graph.edge_count).tolist())
+        output = [[] for _ in range(n)]
+        for i in range(n):
+            for j in graph.adjacency_list[i]:
+                if i < j:
+                    weight = next(weights)
 
                     output[i].append(IWeightedGraph.Adjacency(j, weight))
                     output[j].append(IWeightedGraph.Adjacency(i, weight))
 
-                    adjlist[j].remove(i)
-        else:
-            raise RuntimeError(
-                f"{l = } is too small to make connected graph of {n = } vertexes."
-            )
-
         return cls(output)
 
     def dijkstra(self, s: int) -> tuple[list, list]:
@@ -98,55 +79,24 @@ class WeightedGraph(IUndirectedGraph, IWeightedGraph):
         Returns a tuple of two lists, where the first contains the distances to each vertex,
         and the second contains each vertex's predecessor in all shortest paths."""
 
-        def init(g: Self, s: int) -> tuple[list, list]:
-            """A function where tables containing distances and predecessors are initialized"""
-            d = []
-            p = []
-            for _ in range(len(g.adjacency_list)):
-                d.append(1e7)
-                p.append(None)
-            d[s] = 0
-            return d, p
-
-        def relax(w: int, u: int, d: list, p: list, g: Self) -> tuple[list, list]:
-            """Relaxing edges in Dijkstra algorithm"""
-            id_u = -1
-            for i in range(len(self.adjacency_list[w])):
-                if g.adjacency_list[w][i].vertex == u:
-                    id_u = i
-            if d[w] > d[u]+g.adjacency_list[w][id_u].weight:
-                d[w] = d[u]+g.adjacency_list[w][id_u].weight
-                p[w] = u
-            return d, p
-
-        init_result = init(self, s)
-        d = init_result[0]
-        p = init_result[1]
-        s_list = []
-        q_list = []
-        for i in range(len(self.adjacency_list)):
-            q_list.append(i)
-        min_d = 1e7
-        id = -1
-        while len(q_list) > 0:
-            min_d = 1e7
-            for j in range(len(q_list)):
-                if d[q_list[j]] < min_d:
-                    min_d = d[q_list[j]]
-                    id = q_list[j]
-            s_list.append(id)
+        n = len(self.adjacency_list)
+        d = [1e7 for _ in range(n)]
+        p = [None for _ in range(n)]
+        d[s] = 0
+
+        # vertices whose distance is not final yet
+        queued = [True for _ in range(n)]
+        q_list = set(range(n))
+        while q_list:
+            id = min(q_list, key=d.__getitem__)
             q_list.remove(id)
-            for k in range(len(self.adjacency_list[id])):
-                w = self.adjacency_list[id][k].vertex
-                fl = False
-                for l in range(len(q_list)):
-                    if q_list[l] == w:
-                        fl = True
-                if not fl:
-                    continue
-                relax_result = relax(w, id, d, p, self)
-                d = relax_result[0]
-                p = relax_result[1]
+            queued[id] = False
+            d_id = d[id]
+            for w, weight in self.adjacency_list[id]:
+                # relax the edge (id, w)
+                if queued[w] and d[w] > d_id + weight:
+                    d[w] = d_id + weight
+                    p[w] = id
         return d, p
 
     def calculate_all_distances(self) -> list:
@@ -203,41 +153,20 @@ class WeightedGraph(IUndirectedGraph, IWeightedGraph):
 
     def min_spanning_tree(self) -> WeightedGraph:
         """Finds the minimum spanning tree of a graph using Kruskal's algorithm"""
-        def find_set(x: int, parent: list) -> int:
-            """A function that finds the set of a given vertex"""
-            if x != parent[x]:
-                parent[x] = find_set(parent[x], parent)
-            return parent[x]
-
-        def union(x: int, y: int, parent: list, rank: list):
-            """A function that unites two sets"""
-            x_root = find_set(x, parent)
-            y_root = find_set(y, parent)
-            if rank[x_root] < rank[y_root]:
-                parent[x_root] = y_root
-            elif rank[x_root] > rank[y_root]:
-                parent[y_root] = x_root
-            else:
-                parent[y_root] = x_root
-                rank[x_root] += 1
-
-        parent = list(range(len(self.adjacency_list)))
-        rank = [0 for i in range(len(self.adjacency_list))]
+        sets = UnionFind(len(self.adjacency_list))
 
         edges = [
-            (self.adjacency_list[i][j].weight,
-             i, self.adjacency_list[i][j].vertex)
-            for i in range(len(self.adjacency_list))
-            for j in range(len(self.adjacency_list[i]))
+            (weight, i, vertex)
+            for i, row in enumerate(self.adjacency_list)
+            for vertex, weight in row
+            if i < vertex
         ]
         edges.sort()
         result = [[] for i in range(len(self.adjacency_list))]
-        for edge in edges:
-            weight, x_v, y_v = edge
-            if find_set(x_v, parent) != find_set(y_v, parent):
+        for weight, x_v, y_v in edges:
+            if sets.union(x_v, y_v):
                 result[x_v].append(IWeightedGraph.Adjacency(y_v, weight))
                 result[y_v].append(IWeightedGraph.Adjacency(x_v, weight))
-                union(x_v, y_v, parent, rank)
         return WeightedGraph(result)
 
     def __eq__(self, other: object) -> bool:
@@ -249,6 +178,8 @@ class WeightedGraph(IUndirectedGraph, IWeightedGraph):
 
         return True
 
+    __hash__ = IGraph.__hash__
+
 
 if __name__ == "__main__":
     pass
@@ -2,20 +2,21 @@
 
 import argparse
 import sys
-import matplotlib.pyplot as plt
-import networkx as nx
 from graph import Graph
 
 
 def task1(arguments):
-    graph = Graph.parse_with_representation(
-        sys.stdin.read(), arguments.input_representation)
-    print(graph.dump_with_representation(arguments.output_representation), end="")
+    graph = Graph.parse_file_with_representation(
+        sys.stdin, arguments.input_representation)
+    graph.dump_to(sys.stdout, arguments.output_representation)
 
 
 def task2(arguments):
-    adjacencies = Graph.parse_with_representation(
-        sys.stdin.read(), arguments.input_representation).adjacency_list
+    import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+    import networkx as nx  # pylint: disable=import-outside-toplevel
+
+    adjacencies = Graph.parse_file_with_representation(
+        sys.stdin, arguments.input_representation).adjacency_list
 
     graph = nx.Graph()
     for i in range(0, len(adjacencies)):
@@ -32,11 +33,11 @@ def task2(arguments):
 
 def task3(arguments):
     if arguments.model == "gnl":
-        print(Graph.generate_with_gnl_model(arguments.n, arguments.l).dump_with_representation(
-            arguments.output_representation), end="")
+        Graph.generate_with_gnl_model(arguments.n, arguments.l).dump_to(
+            sys.stdout, arguments.output_representation)
     elif arguments.model == "gnp":
-        print(Graph.generate_with_gnp_model(arguments.n, arguments.p).dump_with_representation(
-            arguments.output_representation), end="")
+        Graph.generate_with_gnp_model(arguments.n, arguments.p).dump_to(
+            sys.stdout, arguments.output_representation)
 
 
 def main():
@@ -45,13 +46,16 @@ def main():
 
     subparser_1 = subparsers.add_parser("1")
     subparser_1.add_argument("-i", "--input-representation",
-                             choices=["adjlist", "adjmatrix", "incmatrix"], default="adjlist")
+                             choices=["adjlist", "adjmatrix", "incmatrix", "binary"],
+                             default="adjlist")
     subparser_1.add_argument("-o", "--output-representation",
-                             choices=["adjlist", "adjmatrix", "incmatrix"], default="adjlist")
+                             choices=["adjlist", "adjmatrix", "incmatrix", "binary"],
+                             default="adjlist")
 
     subparser_2 = subparsers.add_parser("2")
     subparser_2.add_argument("-i", "--input-representation",
-                             choices=["adjlist", "adjmatrix", "incmatrix"], default="adjlist")
+                             choices=["adjlist", "adjmatrix", "incmatrix", "binary"],
+                             default="adjlist")
     subparser_2.add_argument("-o", "--output-filename", default="graph.png")
 
     subparser_3 = subparsers.add_parser("3")
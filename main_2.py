@@ -2,6 +2,7 @@ import argparse
 import sys
 
 from graph import Graph
+from graph.hamiltonian import DEFAULT_SPLIT_DEPTH
 
 
 def task1(arguments):
@@ -9,7 +10,7 @@ def task1(arguments):
     if Graph.check_if_sequence_is_graphic(sequence):
         output_graph = Graph.from_graphic_sequence(sequence)
         assert output_graph is not None
-        print(output_graph.dump_with_representation(arguments.output_representation), end="")
+        output_graph.dump_to(sys.stdout, arguments.output_representation)
     else:
         print("-")
 
@@ -21,14 +22,14 @@ def task2(arguments):
         assert graph_from_sequence is not None
         output_graph = graph_from_sequence.randomize_edges(
             graph_from_sequence.edge_count)
-        print(output_graph.dump_with_representation(arguments.output_representation), end="")
+        output_graph.dump_to(sys.stdout, arguments.output_representation)
     else:
         print("-")
 
 
 def task3(arguments):
-    input_graph = Graph.parse_with_representation(
-        sys.stdin.read(), arguments.input_representation)
+    input_graph = Graph.parse_file_with_representation(
+        sys.stdin, arguments.input_representation)
     print(*max(input_graph.find_components(), key=len))
 
 
@@ -36,18 +37,24 @@ def task4(arguments):
     graph = Graph.euler_graph_generator(arguments.n, arguments.k)
     cycle = graph.euler_cycle_finder()
     print(" ".join(map(str, cycle)))
-    print(graph.dump_with_representation(arguments.output_representation), end="")
+    graph.dump_to(sys.stdout, arguments.output_representation)
 
 
 def task5(arguments):
     output_graph = Graph.generate_random_regular(arguments.n, arguments.k)
-    print(output_graph.dump_with_representation(arguments.output_representation), end="")
+    output_graph.dump_to(sys.stdout, arguments.output_representation)
 
 
 def task6(arguments):
-    input_graph = Graph.parse_with_representation(
-        sys.stdin.read(), arguments.input_representation)
-    print("yes" if input_graph.find_hamiltonian_cycle() is not None else "no")
+    input_graph = Graph.parse_file_with_representation(
+        sys.stdin, arguments.input_representation)
+    try:
+        cycle = input_graph.find_hamiltonian_cycle(arguments.parallel, arguments.split_depth,
+                                                   arguments.workers, arguments.timeout)
+    except TimeoutError:
+        print("unknown")
+        return
+    print("yes" if cycle is not None else "no")
 
 
 def main():
@@ -56,31 +63,41 @@ def main():
 
     subparser_1 = subparsers.add_parser("1")
     subparser_1.add_argument("-o", "--output-representation",
-                             choices=["adjlist", "adjmatrix", "incmatrix"], default="adjlist")
+                             choices=["adjlist", "adjmatrix", "incmatrix", "binary"],
+                             default="adjlist")
 
     subparser_2 = subparsers.add_parser("2")
     subparser_2.add_argument("-o", "--output-representation",
-                             choices=["adjlist", "adjmatrix", "incmatrix"], default="adjlist")
+                             choices=["adjlist", "adjmatrix", "incmatrix", "binary"],
+                             default="adjlist")
 
     subparser_3 = subparsers.add_parser("3")
     subparser_3.add_argument("-i", "--input-representation",
-                             choices=["adjlist", "adjmatrix", "incmatrix"], default="adjlist")
+                             choices=["adjlist", "adjmatrix", "incmatrix", "binary"],
+                             default="adjlist")
 
     subparser_4 = subparsers.add_parser("4")
     subparser_4.add_argument("n", type=int)
     subparser_4.add_argument("k", type=int)
     subparser_4.add_argument("-o", "--output-representation",
-                             choices=["adjlist", "adjmatrix", "incmatrix"], default="adjlist")
+                             choices=["adjlist", "adjmatrix", "incmatrix", "binary"],
+                             default="adjlist")
 
     subparser_5 = subparsers.add_parser("5")
     subparser_5.add_argument("n", type=int)
     subparser_5.add_argument("k", type=int)
     subparser_5.add_argument("-o", "--output-representation",
-                             choices=["adjlist", "adjmatrix", "incmatrix"], default="adjlist")
+                             choices=["adjlist", "adjmatrix", "incmatrix", "binary"],
+                             default="adjlist")
 
     subparser_6 = subparsers.add_parser("6")
     subparser_6.add_argument("-i", "--input-representation",
-                             choices=["adjlist", "adjmatrix", "incmatrix"], default="adjlist")
+                             choices=["adjlist", "adjmatrix", "incmatrix", "binary"],
+                             default="adjlist")
+    subparser_6.add_argument("-p", "--parallel", action="store_true")
+    subparser_6.add_argument("-d", "--split-depth", type=int, default=DEFAULT_SPLIT_DEPTH)
+    subparser_6.add_argument("-w", "--workers", type=int)
+    subparser_6.add_argument("-t", "--timeout", type=float)
 
     arguments = parser.parse_args()
     arguments.task = int(arguments.task)
@@ -5,11 +5,11 @@ from graph import WeightedGraph
 
 
 def task1(arguments):
-    print(WeightedGraph.generate_weighted_connected(arguments.n, arguments.l).dump(), end="")
+    WeightedGraph.generate_weighted_connected(arguments.n, arguments.l).dump_to(sys.stdout)
 
 
 def task2(arguments):
-    graph = WeightedGraph.parse(sys.stdin.read())
+    graph = WeightedGraph.parse_file(sys.stdin)
     distances, predecessors = graph.dijkstra(arguments.v)
     for h in range(len(graph.adjacency_list)):
         vertex_predecessor = predecessors[h]
@@ -24,7 +24,7 @@ def task2(arguments):
 
 
 def task3(_):
-    graph = WeightedGraph.parse(sys.stdin.read())
+    graph = WeightedGraph.parse_file(sys.stdin)
     distances = graph.calculate_all_distances()
     element_width = max(len(str(element))
                         for row in distances for element in row)
@@ -35,7 +35,7 @@ def task3(_):
 
 
 def task4(_):
-    graph = WeightedGraph.parse(sys.stdin.read())
+    graph = WeightedGraph.parse_file(sys.stdin)
     min_sum_center = graph.find_min_sum_center()
     min_max_center = graph.find_min_max_center()
     print(f"center: {min_sum_center}")
@@ -43,8 +43,8 @@ def task4(_):
 
 
 def task5(_):
-    graph = WeightedGraph.parse(sys.stdin.read())
-    print(graph.min_spanning_tree().dump(), end="")
+    graph = WeightedGraph.parse_file(sys.stdin)
+    graph.min_spanning_tree().dump_to(sys.stdout)
 
 
 def main():
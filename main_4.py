@@ -5,12 +5,12 @@ from graph import WeightedDigraph
 
 
 def task1(arguments):
-    print(Digraph.generate_with_gnp_model(
-        arguments.n, arguments.p).dump(), end="")
+    Digraph.generate_with_gnp_model(
+        arguments.n, arguments.p).dump_to(sys.stdout)
 
 
 def task2(_):
-    for component in Digraph.parse(sys.stdin.read()).find_strongly_connected_components():
+    for component in Digraph.parse_file(sys.stdin).find_strongly_connected_components():
         print(' '.join(map(str, component)))
 
 
@@ -21,17 +21,16 @@ def task3a(arguments):
             break
     
     weighted_digraph = WeightedDigraph.generate_weighted_digraph(digraph, -5, 11)
-    print(weighted_digraph.dump(), end="")
+    weighted_digraph.dump_to(sys.stdout)
 
 
 def task3b(arguments):
-    result = WeightedDigraph.parse(sys.stdin.read()).bellman_ford(arguments.v, True)
+    result = WeightedDigraph.parse_file(sys.stdin).bellman_ford(arguments.v, True)
     print(result[0])
 
 
 def task4(arguments):
-    asdf = sys.stdin.read()
-    result = WeightedDigraph.parse(asdf).johnson(verbose=arguments.verbose)
+    result = WeightedDigraph.parse_file(sys.stdin).johnson(verbose=arguments.verbose)
     if result is None:
         print("graph has negative cycle")
     else:
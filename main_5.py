@@ -5,11 +5,11 @@ from graph import WeightedDigraph
 
 def task1(arguments):
     WDigraph = WeightedDigraph.generate_flow_graph(arguments.n)
-    print(WDigraph.dump(), end="")
+    WDigraph.dump_to(sys.stdout)
 
 
 def task2(arguments):
-    WDigraph = WeightedDigraph.parse(sys.stdin.read())
+    WDigraph = WeightedDigraph.parse_file(sys.stdin)
     WDigraph.Edmonds_Karp(arguments.s, arguments.t, arguments.filename)
 
 
@@ -6,7 +6,7 @@ from graph import WeightedDigraph, Digraph
 
 
 def task1(arguments):
-    digraph = Digraph.parse(sys.stdin.read())
+    digraph = Digraph.parse_file(sys.stdin)
 
     visits = None
     if arguments.page_type == "random":
@@ -0,0 +1,83 @@
+from unittest import TestCase
+import numpy as np
+
+from graph import BitsetGraph, CSRGraph, Digraph, Graph
+from graph.bitset import _lookup_popcount, density, popcount
+
+
+class BitsetGraphTestCase(TestCase):
+    """Test BitsetGraph class and conversions to and from it"""
+
+    def test_round_trip(self):
+        rng = np.random.default_rng(12345)
+        for vertex_count in [0, 1, 63, 64, 65, 130]:
+            graph = Graph.generate_with_gnp_model(vertex_count, 0.3, rng)
+            bitset = graph.to_bitset()
+            self.assertEqual(bitset.vertex_count, vertex_count)
+            self.assertEqual(bitset.edge_count, graph.edge_count)
+            self.assertEqual(bitset.vertex_degrees.tolist(), graph.vertex_degrees)
+            self.assertEqual(Graph.from_bitset(bitset).adjacency_list,
+                             [sorted(row) for row in graph.adjacency_list])
+            self.assertEqual(bitset.masks(),
+                             [sum(1 << v for v in row) for row in graph.adjacency_list])
+
+            digraph = Digraph.generate_with_gnp_model(vertex_count, 0.3, rng)
+            self.assertEqual(Digraph.from_bitset(digraph.to_bitset()).adjacency_list,
+                             [sorted(row) for row in digraph.adjacency_list])
+
+        self.assertRaises(ValueError, Digraph.from_bitset, Graph([[1], [0]]).to_bitset())
+        self.assertRaises(ValueError, BitsetGraph.from_csr,
+                          CSRGraph([0, 1, 2], [1, 0], [5, 5]))
+
+    def test_queries(self):
+        graph = Graph([[1, 2, 3], [0, 2], [0, 1], [0], []])
+        bitset = graph.to_bitset()
+        self.assertTrue(bitset.has_edge(0, 3))
+        self.assertFalse(bitset.has_edge(1, 3))
+        self.assertEqual(bitset.has_edges([0, 1, 3, 4], [2, 3, 0, 0]).tolist(),
+                         [True, False, True, False])
+        self.assertEqual(bitset.neighbours(0).tolist(), [1, 2, 3])
+        self.assertEqual(bitset.common_neighbours(1, 2).tolist(), [0])
+        self.assertEqual(bitset.common_neighbour_count(0, 1), 1)
+        self.assertAlmostEqual(bitset.density, density(5, 4))
+
+        bitset.remove_edges([0], [3])
+        bitset.add_edges([4], [3])
+        self.assertEqual(bitset.to_adjacency_list(), [[1, 2], [0, 2], [0, 1], [4], [3]])
+
+    def test_popcount(self):
+        rng = np.random.default_rng(12345)
+        words = rng.integers(0, 2 ** 64, (5, 3), dtype=np.uint64)
+        expected = [[bin(int(word)).count("1") for word in row] for row in words]
+        self.assertEqual(popcount(words).tolist(), expected)
+        # the fallback for NumPy versions without np.bitwise_count
+        self.assertEqual(_lookup_popcount(words).tolist(), expected)
+        self.assertEqual(_lookup_popcount(words[:, 1]).tolist(), [row[1] for row in expected])
+        self.assertEqual(_lookup_popcount(np.zeros((2, 0), dtype=np.uint64)).shape, (2, 0))
+
+    def test_component_labels(self):
+        rng = np.random.default_rng(12345)
+        for vertex_count in [1, 10, 100, 200]:
+            graph = Graph.generate_with_gnp_model(vertex_count, 1 / vertex_count, rng)
+            self.assertEqual(graph.component_labels("bitset").tolist(),
+                             graph.component_labels("search").tolist())
+
+        # weak components of a directed graph
+        digraph = Digraph([[1], [], [1], [4], []])
+        self.assertEqual(digraph.to_bitset().component_labels().tolist(), [0, 0, 0, 1, 1])
+
+    def test_dense_graphs(self):
+        rng = np.random.default_rng(12345)
+        graph = Graph.generate_with_gnp_model(60, 0.5, rng)
+        degrees = graph.vertex_degrees
+        statistics = graph.swap_edges(500, rng=rng)
+        self.assertEqual(statistics.swaps, 500)
+        self.assertEqual(graph.vertex_degrees, degrees)
+        for vertex, row in enumerate(graph.adjacency_list):
+            self.assertNotIn(vertex, row)
+            self.assertEqual(len(set(row)), len(row))
+
+        cycle = graph.find_hamiltonian_cycle()
+        self.assertEqual(sorted(cycle), list(range(60)))
+        for vertex_a, vertex_b in zip(cycle, cycle[1:] + cycle[:1]):
+            self.assertTrue(graph.has_edge(vertex_a, vertex_b))
@@ -0,0 +1,59 @@
+from unittest import TestCase
+
+from graph import Graph
+from graph.connectivity import UnionFind
+
+
+class UnionFindTestCase(TestCase):
+    """Test UnionFind class"""
+
+    def test_union_find(self):
+        sets = UnionFind(6)
+        self.assertEqual(sets.component_count, 6)
+        self.assertTrue(sets.union(0, 1))
+        self.assertTrue(sets.union(4, 5))
+        self.assertTrue(sets.union(1, 5))
+        self.assertFalse(sets.union(0, 4))
+        self.assertEqual(sets.component_count, 3)
+        self.assertTrue(sets.same(0, 4))
+        self.assertFalse(sets.same(2, 3))
+        self.assertEqual(sets.labels().tolist(), [0, 0, 1, 2, 0, 0])
+
+    def test_long_chain(self):
+        sets = UnionFind(100000)
+        for x in range(1, len(sets)):
+            sets.union(x - 1, x)
+        self.assertEqual(sets.component_count, 1)
+        self.assertTrue(sets.same(0, len(sets) - 1))
+
+
+class ConnectivityTrackerTestCase(TestCase):
+    """Test ConnectivityTracker class"""
+
+    def test_edge_insertion(self):
+        graph = Graph([[1], [0], [], [], []])
+        connectivity = graph.track_connectivity()
+        self.assertIs(graph.track_connectivity(), connectivity)
+        self.assertEqual(connectivity.component_count, 4)
+
+        graph.add_edge(3, 4)
+        graph.add_edge(1, 3)
+        self.assertEqual(connectivity.component_count, 2)
+        self.assertTrue(connectivity.same_component(0, 4))
+        self.assertFalse(connectivity.same_component(0, 2))
+        self.assertEqual(connectivity.component_labels().tolist(), [0, 0, 1, 0, 0])
+
+    def test_fallback_after_removal(self):
+        graph = Graph([[1], [0, 2], [1]])
+        connectivity = graph.track_connectivity()
+        self.assertEqual(connectivity.component_count, 1)
+
+        graph.remove_edge(1, 2)
+        self.assertEqual(connectivity.component_count, 2)
+        self.assertFalse(connectivity.same_component(0, 2))
+
+        graph.add_edge(0, 2)
+        self.assertEqual(connectivity.component_count, 1)
+
+        graph.adjacency_list = [[], [], []]
+        self.assertEqual(connectivity.component_count, 3)
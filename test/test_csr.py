@@ -0,0 +1,39 @@
+from unittest import TestCase
+import numpy as np
+
+from graph import CSRGraph, Digraph, Graph, WeightedDigraph, WeightedGraph
+
+
+class CSRGraphTestCase(TestCase):
+    """Test CSRGraph class and conversions to and from it"""
+
+    def test_round_trip(self):
+        graphs = [
+            Graph([[1, 2], [0], [0]]),
+            Digraph([[1], [2], [0, 1]]),
+            WeightedGraph.parse("1:3 2:-4\n0:3\n0:-4\n"),
+            WeightedDigraph.parse("1:5\n\n0:7 1:2\n"),
+        ]
+        for graph in graphs:
+            csr = graph.to_csr()
+            self.assertEqual(csr.vertex_count, graph.vertex_count)
+            self.assertEqual(csr.edge_count, graph.edge_count)
+            self.assertEqual(csr.directed, graph.is_directed)
+            self.assertEqual(type(graph).from_csr(csr).dump(), graph.dump())
+
+    def test_served_from_arrays(self):
+        graph = Graph([[1, 2, 3], [0], [0], [0], []])
+        csr = graph.to_csr()
+        self.assertEqual(csr.indices.dtype, np.int32)
+        self.assertEqual(csr.indptr.tolist(), [0, 3, 4, 5, 6, 6])
+        self.assertEqual(csr.vertex_degrees.tolist(), graph.vertex_degrees)
+        self.assertEqual(list(csr.iter_adjacent(0)), [1, 2, 3])
+        self.assertEqual(list(csr.iter_adjacent(4)), [])
+
+        weighted = WeightedDigraph.parse("1:5 2:6\n\n\n")
+        self.assertEqual(list(weighted.to_csr().iter_adjacent(0)), [(1, 5), (2, 6)])
+
+    def test_from_csr_type_mismatch(self):
+        self.assertRaises(ValueError, Digraph.from_csr, Graph([[1], [0]]).to_csr())
+        self.assertRaises(ValueError, WeightedGraph.from_csr, Graph([[1], [0]]).to_csr())
+        self.assertRaises(ValueError, CSRGraph, [0, 1], [])
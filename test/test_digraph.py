@@ -1,4 +1,5 @@
 from unittest import TestCase
+import numpy as np
 
 from graph import Digraph
 
@@ -53,3 +54,66 @@ class DigraphTestCase(TestCase):
             frozenset([5, 7, 8]),
             frozenset([6, 9, 10]),
         ]))
+
+    def test_strongly_connected_components_of_long_cycle(self):
+        vertex_count = 100000
+        digraph = Digraph([[(i + 1) % vertex_count] for i in range(vertex_count)])
+        self.assertEqual(digraph.find_strongly_connected_components(),
+                         {frozenset(range(vertex_count))})
+
+    def test_transpose(self):
+        digraph = Digraph([[1, 2], [2], [0], []])
+        self.assertEqual(digraph.transpose().adjacency_list, [[2], [0], [0, 1], []])
+        self.assertEqual(digraph.transpose().transpose(), digraph)
+
+        csr = Digraph.generate_with_gnp_model(100, 0.1).to_csr()
+        transposed = csr.transpose()
+        self.assertEqual(transposed.vertex_degrees.tolist(),
+                         np.bincount(csr.indices, minlength=100).tolist())
+        self.assertEqual(transposed.transpose(), csr)
+
+    def test_predecessor_lists(self):
+        digraph = Digraph([[1, 2], [2], [0], []])
+        self.assertEqual(digraph.predecessor_lists, [[2], [0], [0, 1], []])
+        self.assertEqual(digraph.in_degrees, [1, 1, 2, 0])
+
+        # kept up to date by add_edge and remove_edge
+        predecessor_lists = digraph.predecessor_lists
+        digraph.add_edge(3, 1)
+        digraph.remove_edge(0, 2)
+        self.assertIs(digraph.predecessor_lists, predecessor_lists)
+        self.assertEqual(digraph.predecessor_lists, [[2], [0, 3], [1], []])
+        self.assertEqual(list(digraph.iter_predecessors(1)), [0, 3])
+        self.assertEqual(digraph.in_degrees, [1, 2, 1, 0])
+
+        # other modifications make it rebuild
+        digraph.adjacency_list[3].append(0)
+        digraph.mark_modified()
+        self.assertEqual(digraph.predecessor_lists, [[2, 3], [0, 3], [1], []])
+
+    def test_gnp_generation(self):
+        self.assertEqual(Digraph.generate_with_gnp_model(4, 0).adjacency_list,
+                         [[], [], [], []])
+        self.assertEqual(Digraph.generate_with_gnp_model(3, 1).adjacency_list,
+                         [[1, 2], [0, 2], [0, 1]])
+        digraph = Digraph.generate_with_gnp_model(30, 0.5)
+        self.assertTrue(all(i not in row for i, row in enumerate(digraph.adjacency_list)))
+        self.assertRaises(ValueError, Digraph.generate_with_gnp_model, 3, 1.5)
+        self.assertRaises(ValueError, Digraph.generate_with_gnp_model, -1, 0.5)
+
+    def test_edge_index(self):
+        digraph = Digraph([[1, 2], [2], []], "eager")
+        self.assertTrue(digraph.has_edge(0, 2))
+        self.assertFalse(digraph.has_edge(2, 0))
+        digraph.remove_edge(0, 1)
+        digraph.add_edge(2, 0)
+        self.assertFalse(digraph.has_edge(0, 1))
+        self.assertTrue(digraph.has_edge(2, 0))
+        self.assertEqual(digraph.adjacency_list, [[2], [2], [0]])
+        self.assertRaises(ValueError, digraph.remove_edge, 1, 0)
+
+    def test_fingerprint(self):
+        self.assertEqual(Digraph([[1], [2], []]).fingerprint(),
+                         Digraph([[], [0], [1]]).fingerprint())
+        self.assertNotEqual(Digraph([[1], [2], []]).fingerprint(),
+                            Digraph([[1, 2], [], []]).fingerprint())
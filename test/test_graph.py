@@ -1,10 +1,12 @@
 import itertools
 import random
+import time
 from typing import Iterable
 from unittest import TestCase
 import numpy as np
 
 from graph import Graph
+from graph.hamiltonian import held_karp
 
 
 class GraphTestCase(TestCase):
@@ -158,6 +160,35 @@ class GraphTestCase(TestCase):
                         sorted(sequence)
                     )
 
+    def test_graphic_sequence_batch_check(self):
+        for vertex_count in range(7):
+            graphic_sequences = {tuple(graph.vertex_degrees) for graph in
+                                 self.generate_all_graphs_with_vertex_count(vertex_count)}
+            sequences = list(itertools.product(range(-1, vertex_count + 2), repeat=vertex_count))
+            self.assertEqual(
+                Graph.check_if_sequences_are_graphic(
+                    np.array(sequences).reshape(len(sequences), vertex_count)).tolist(),
+                [sequence in graphic_sequences for sequence in sequences]
+            )
+
+        # long sequences are checked with numpy
+        self.assertTrue(Graph.check_if_sequence_is_graphic([3] * 100))
+        self.assertFalse(Graph.check_if_sequence_is_graphic([99] * 2 + [1] * 98))
+        self.assertFalse(Graph.check_if_sequence_is_graphic([3] * 99))
+
+    def test_havel_hakimi_on_large_sequences(self):
+        # the degrees of a random graph are graphic and a graph can be rebuilt from them
+        sequence = list(Graph.generate_with_gnp_model(300, 0.05).vertex_degrees)
+        self.assertTrue(Graph.check_if_sequence_is_graphic(sequence))
+        graph = Graph.from_graphic_sequence(sequence)
+        assert graph is not None
+        self.assertEqual(list(graph.vertex_degrees), sequence)
+        for vertex, row in enumerate(graph.adjacency_list):
+            self.assertNotIn(vertex, row)
+            self.assertEqual(len(set(row)), len(row))
+
+        self.assertIsNone(Graph.from_graphic_sequence([99] * 2 + [1] * 98))
+
     def test_find_components(self):
         for _ in range(1000):
             vertex_count = random.randrange(1, 50)
@@ -196,6 +227,88 @@ class GraphTestCase(TestCase):
                 frozenset(map(frozenset, graph.find_components())),
                 frozenset(map(frozenset, components))
             )
+            self.assertEqual(
+                Graph(graph.adjacency_list).find_components("propagation"),
+                graph.find_components()
+            )
+
+    def test_find_components_of_long_path(self):
+        vertex_count = 100000
+        path = [[1]] + [[i - 1, i + 1] for i in range(1, vertex_count - 1)] + [[vertex_count - 2]]
+        for method in ["search", "propagation"]:
+            graph = Graph([list(row) for row in path])
+            self.assertEqual(graph.find_components(method), [list(range(vertex_count))])
+            graph.remove_edge(500, 501)
+            self.assertEqual(graph.component_labels(method).tolist(),
+                             [0] * 501 + [1] * (vertex_count - 501))
+
+    def test_swap_edges(self):
+        graph = Graph.generate_random_regular(100, 4, np.random.default_rng(12345))
+        original = [list(row) for row in graph.adjacency_list]
+        statistics = graph.swap_edges(1000, rng=np.random.default_rng(12345))
+        self.assertEqual(statistics.swaps, 1000)
+        self.assertGreaterEqual(statistics.attempts, 1000)
+        self.assertTrue(0 < statistics.acceptance_rate <= 1)
+        self.assertNotEqual(graph.adjacency_list, original)
+        self.assertEqual(graph.vertex_degrees, [4] * 100)
+        for vertex, row in enumerate(graph.adjacency_list):
+            self.assertNotIn(vertex, row)
+            self.assertEqual(len(set(row)), len(row))
+
+        # a cycle stays connected, even though most swaps would split it
+        cycle = Graph([[(i - 1) % 50, (i + 1) % 50] for i in range(50)])
+        statistics = cycle.swap_edges(20, connected=True, rng=np.random.default_rng(12345))
+        self.assertEqual(statistics.swaps, 20)
+        self.assertGreater(statistics.rolled_back, 0)
+        self.assertEqual(len(cycle.find_components()), 1)
+        self.assertEqual(cycle.vertex_degrees, [2] * 50)
+
+        self.assertRaises(ValueError, Graph([[1], [0], [3], [2]]).swap_edges, 1, True)
+        self.assertRaises(ValueError, Graph([[1, 1], [0, 0]]).swap_edges, 1)
+
+    def test_randomize_edges(self):
+        graph = Graph.generate_random_regular(30, 3, np.random.default_rng(12345))
+        original = [list(row) for row in graph.adjacency_list]
+        randomized = graph.randomize_edges(20)
+        self.assertEqual(graph.adjacency_list, original)
+        self.assertEqual(randomized.vertex_degrees, graph.vertex_degrees)
+        self.assertWarns(RuntimeWarning, Graph([[1, 2], [0, 2], [0, 1]]).randomize_edges, 1)
+
+    def test_euler_graph_generator(self):
+        rng = np.random.default_rng(12345)
+        for node, edge, is_connected in [(5, 5, True), (5, 6, True), (6, 8, True), (6, 12, True),
+                                         (7, 21, True), (10, 3, False), (10, 40, False),
+                                         (200, 5000, True), (200, 15000, True)]:
+            graph = Graph.euler_graph_generator(node, edge, is_connected, rng)
+            self.assertEqual(graph.vertex_count, node)
+            self.assertEqual(graph.edge_count, edge)
+            self.assertTrue(all(degree % 2 == 0 for degree in graph.vertex_degrees))
+            if is_connected:
+                self.assertEqual(len(graph.find_components()), 1)
+            self.assertEqual(len(graph.euler_cycle_finder()), edge + 1)
+
+        # K6 has odd degrees, and with one or two edges fewer than K7 some degree is odd
+        for node, edge in [(6, 13), (7, 20), (7, 19), (4, 5), (5, 4)]:
+            self.assertRaises(ArithmeticError, Graph.euler_graph_generator, node, edge)
+        self.assertRaises(ArithmeticError, Graph.euler_graph_generator, 10, 2, False)
+
+    def test_euler_cycle_finder(self):
+        for graph in [Graph([[1, 2], [0, 2], [0, 1, 3, 4], [2, 4], [2, 3]]),
+                      Graph([[], [2, 3], [1, 3], [1, 2]]),
+                      Graph([[0, 0, 1, 1], [0, 0]]),
+                      Graph.generate_random_regular(1000, 6)]:
+            cycle = graph.euler_cycle_finder().tolist()
+            self.assertEqual(cycle[0], cycle[-1])
+            self.assertEqual(len(cycle), graph.edge_count + 1)
+            remaining = Graph([list(row) for row in graph.adjacency_list])
+            for a, b in zip(cycle, cycle[1:]):
+                remaining.remove_edge(a, b)
+            self.assertEqual(remaining.edge_count, 0)
+
+        self.assertEqual(Graph.empty(3).euler_cycle_finder().tolist(), [])
+        self.assertRaises(ArithmeticError, Graph([[1], [0]]).euler_cycle_finder)
+        self.assertRaises(ArithmeticError, Graph([[1, 2], [0, 2], [0, 1],
+                                                  [4, 5], [3, 5], [3, 4]]).euler_cycle_finder)
 
     def test_find_hamiltonian_cycle(self):
         for vertex_count in range(1, 6):
@@ -206,3 +319,290 @@ class GraphTestCase(TestCase):
                     self.assertIn(found_cycle, cycles)
                 else:
                     self.assertFalse(cycles)
+
+    def test_find_hamiltonian_cycle_in_larger_graphs(self):
+        def assert_cycle(graph: Graph, cycle: list[int]):
+            self.assertEqual(sorted(cycle), list(range(graph.vertex_count)))
+            for vertex_a, vertex_b in zip(cycle, cycle[1:] + cycle[:1]):
+                self.assertTrue(graph.has_edge(vertex_a, vertex_b))
+
+        rng = np.random.default_rng(random.randrange(1 << 32))
+        for vertex_count in [12, 30, 80]:
+            # a random cycle with some chords
+            order = rng.permutation(vertex_count).tolist()
+            graph = Graph([[] for _ in range(vertex_count)])
+            for vertex_a, vertex_b in zip(order, order[1:] + order[:1]):
+                graph.add_edge(vertex_a, vertex_b)
+            for _ in range(vertex_count):
+                vertex_a, vertex_b = rng.choice(vertex_count, size=2, replace=False).tolist()
+                if not graph.has_edge(vertex_a, vertex_b):
+                    graph.add_edge(vertex_a, vertex_b)
+            assert_cycle(graph, graph.find_hamiltonian_cycle())
+
+            # two cliques sharing one vertex
+            half = vertex_count // 2
+            graph = Graph([[v for v in range(half + 1) if v != u] for u in range(half + 1)]
+                          + [[] for _ in range(vertex_count - half - 1)])
+            for vertex_a in range(half, vertex_count):
+                for vertex_b in range(vertex_a + 1, vertex_count):
+                    graph.add_edge(vertex_a, vertex_b)
+            self.assertIsNone(graph.find_hamiltonian_cycle())
+
+            # complete bipartite graph with unequal sides
+            graph = Graph([[v for v in range(half - 1, vertex_count)] for _ in range(half - 1)]
+                          + [[v for v in range(half - 1)] for _ in range(vertex_count - half + 1)])
+            self.assertIsNone(graph.find_hamiltonian_cycle())
+
+        # a clique joined to an independent set has a Hamiltonian cycle only if
+        # the independent set isn't larger, otherwise removing the clique
+        # leaves more components than it has vertices
+        for clique, independent in [(10, 10), (10, 11), (12, 12), (12, 13), (30, 31)]:
+            vertex_count = clique + independent
+            graph = Graph([[v for v in range(vertex_count) if v != u] for u in range(clique)]
+                          + [list(range(clique)) for _ in range(independent)])
+            cycle = graph.find_hamiltonian_cycle(timeout=10)
+            if independent > clique:
+                self.assertIsNone(cycle)
+            else:
+                assert_cycle(graph, cycle)
+
+        # the generalized Petersen graphs GP(n, 2) with n = 5 mod 6 are
+        # 3-connected but have no Hamiltonian cycle, GP(5, 2) is the Petersen graph
+        for n in [5, 11, 17]:
+            petersen = Graph([[] for _ in range(2 * n)])
+            for i in range(n):
+                petersen.add_edge(i, (i + 1) % n)
+                petersen.add_edge(i, i + n)
+                petersen.add_edge(i + n, (i + 2) % n + n)
+            self.assertIsNone(petersen.find_hamiltonian_cycle())
+
+    def test_find_hamiltonian_cycle_in_parallel(self):
+        vertex_count = 40
+        order = list(range(vertex_count))
+        random.shuffle(order)
+        graph = Graph([[] for _ in range(vertex_count)])
+        for vertex_a, vertex_b in zip(order, order[1:] + order[:1]):
+            graph.add_edge(vertex_a, vertex_b)
+        for _ in range(2 * vertex_count):
+            vertex_a, vertex_b = random.sample(range(vertex_count), 2)
+            if not graph.has_edge(vertex_a, vertex_b):
+                graph.add_edge(vertex_a, vertex_b)
+
+        # the parallel and the serial search both find a cycle
+        for parallel in [True, False]:
+            cycle = graph.find_hamiltonian_cycle(parallel=parallel, split_depth=2, workers=2)
+            self.assertEqual(sorted(cycle), list(range(vertex_count)))
+            for vertex_a, vertex_b in zip(cycle, cycle[1:] + cycle[:1]):
+                self.assertTrue(graph.has_edge(vertex_a, vertex_b))
+
+        # and both search all of a graph without one, the generalized
+        # Petersen graph GP(17, 2)
+        petersen = Graph([[] for _ in range(34)])
+        for i in range(17):
+            petersen.add_edge(i, (i + 1) % 17)
+            petersen.add_edge(i, i + 17)
+            petersen.add_edge(i + 17, (i + 2) % 17 + 17)
+        for parallel in [True, False]:
+            self.assertIsNone(petersen.find_hamiltonian_cycle(parallel=parallel, workers=2))
+
+        # an expired timeout stops every search, including Held-Karp
+        for parallel in [True, False]:
+            with self.assertRaises(TimeoutError):
+                graph.find_hamiltonian_cycle(parallel=parallel, workers=2, timeout=0)
+        complete = [((1 << 20) - 1) ^ 1 << vertex for vertex in range(20)]
+        with self.assertRaises(TimeoutError):
+            held_karp(complete, deadline=time.monotonic())
+
+    def test_clustering(self):
+        # two triangles sharing the edge 1-2, and a pendant vertex 4
+        graph = Graph([[1, 2], [0, 2, 3], [0, 1, 3, 4], [1, 2], [2]])
+        self.assertEqual(graph.triangle_counts().tolist(), [1, 2, 2, 1, 0])
+        self.assertEqual(graph.local_clustering().tolist(), [1, 2 / 3, 1 / 3, 1, 0])
+        self.assertAlmostEqual(graph.average_clustering(), 3 / 5)
+        self.assertAlmostEqual(graph.transitivity(), 6 / 11)
+
+        for vertex_count in range(1, 6):
+            for graph in self.generate_all_graphs_with_vertex_count(vertex_count):
+                expected = [0] * vertex_count
+                for triangle in itertools.combinations(range(vertex_count), 3):
+                    if all(graph.has_edge(a, b) for a, b in itertools.combinations(triangle, 2)):
+                        for vertex in triangle:
+                            expected[vertex] += 1
+                self.assertEqual(graph.triangle_counts().tolist(), expected)
+
+        # sparse graphs are counted by the forward algorithm
+        graph = Graph.generate_random_regular(200, 6, np.random.default_rng(12345))
+        expected = [sum(graph.has_edge(a, b) for a, b in itertools.combinations(row, 2))
+                    for row in graph.adjacency_list]
+        self.assertEqual(graph.triangle_counts().tolist(), expected)
+
+        self.assertEqual(Graph([]).average_clustering(), 0.0)
+        self.assertEqual(Graph([[1], [0]]).transitivity(), 0.0)
+
+    def test_edge_index(self):
+        for edge_index in ["lazy", "eager", "off"]:
+            vertex_count = 30
+            graph = Graph([[] for _ in range(vertex_count)], edge_index)  # type: ignore
+            edges = set()
+            for _ in range(500):
+                vertex_0 = random.randrange(vertex_count)
+                vertex_1 = random.randrange(vertex_count)
+                edge = (min(vertex_0, vertex_1), max(vertex_0, vertex_1))
+                if vertex_0 == vertex_1:
+                    continue
+
+                self.assertEqual(graph.has_edge(vertex_0, vertex_1), edge in edges)
+                self.assertEqual(graph.has_edge(vertex_1, vertex_0), edge in edges)
+                if edge in edges:
+                    graph.remove_edge(vertex_0, vertex_1)
+                    edges.remove(edge)
+                else:
+                    graph.add_edge(vertex_0, vertex_1)
+                    edges.add(edge)
+
+            self.assertEqual(graph.edge_count, len(edges))
+            for vertex in range(vertex_count):
+                self.assertEqual(
+                    sorted(graph.iter_adjacent(vertex)),
+                    sorted([b for a, b in edges if a == vertex]
+                           + [a for a, b in edges if b == vertex]))
+
+        self.assertRaises(ValueError, Graph([[1], [0], []], "eager").remove_edge, 0, 2)
+        self.assertRaises(ValueError, Graph([[1], [0], []], "off").remove_edge, 0, 2)
+
+        # removing an edge keeps the order of the other neighbours
+        graph = Graph([[1, 2, 3, 4], [0], [0], [0], [0]], "eager")
+        graph.remove_edge(0, 2)
+        self.assertEqual(graph.adjacency_list[0], [1, 3, 4])
+        graph.remove_edge(0, 1)
+        graph.add_edge(0, 2)
+        self.assertEqual(graph.adjacency_list[0], [3, 4, 2])
+        self.assertTrue(graph.has_edge(0, 4))
+        graph.remove_edge(0, 4)
+        self.assertEqual(graph.adjacency_list[0], [3, 2])
+
+        # parallel edges make the index unusable, but queries still work
+        graph = Graph([[1, 1], [0, 0]])
+        self.assertTrue(graph.has_edge(0, 1))
+        graph.remove_edge(0, 1)
+        self.assertEqual(graph.adjacency_list, [[1], [0]])
+
+    def test_remove_edges_of_high_degree_vertex(self):
+        vertex_count = 20001
+        removed = random.sample(range(1, vertex_count), 2000)
+        remaining = sorted(set(range(1, vertex_count)) - set(removed))
+        for edge_index in ["lazy", "eager", "off"]:
+            star = [list(range(1, vertex_count))] + [[0] for _ in range(1, vertex_count)]
+            graph = Graph(star, edge_index)  # type: ignore
+            if edge_index == "lazy":
+                self.assertTrue(graph.has_edge(0, 1))
+
+            start = time.perf_counter()
+            for vertex in removed:
+                graph.remove_edge(0, vertex)
+            self.assertEqual(graph.adjacency_list[0], remaining)
+            if edge_index != "off":
+                # every removal is O(1) with an index, it used to shift the
+                # positions of all later neighbours
+                self.assertLess(time.perf_counter() - start, 0.5)
+            self.assertEqual(graph.edge_count, len(remaining))
+            self.assertFalse(graph.has_edge(removed[0], 0))
+
+    def test_cached_properties(self):
+        graph = Graph([[1], [0], []])
+        self.assertEqual(graph.edge_count, 1)
+        self.assertEqual(graph.vertex_degrees, [1, 1, 0])
+        old_hash = hash(graph)
+
+        graph.add_edge(1, 2)
+        self.assertEqual(graph.edge_count, 2)
+        self.assertEqual(graph.vertex_degrees, [1, 2, 1])
+        self.assertEqual(hash(graph), hash(Graph([[1], [0, 2], [1]])))
+
+        graph.remove_edge(1, 2)
+        self.assertEqual(graph.edge_count, 1)
+        self.assertEqual(hash(graph), old_hash)
+
+        graph.adjacency_list = [[], []]
+        self.assertEqual(graph.edge_count, 0)
+
+        graph.adjacency_list[0].append(1)
+        graph.adjacency_list[1].append(0)
+        graph.mark_modified()
+        self.assertEqual(graph.vertex_degrees, [1, 1])
+        # returned lists are copies of the cached degrees
+        graph.vertex_degrees.append(5)
+        self.assertEqual(graph.vertex_degrees, [1, 1])
+
+        # in place modifications also invalidate the edge index
+        for edge_index in ["lazy", "eager"]:
+            graph = Graph([[1], [0], []], edge_index)  # type: ignore
+            self.assertFalse(graph.has_edge(1, 2))
+            graph.remove_edge(0, 1)
+            graph.adjacency_list[1].append(2)
+            graph.adjacency_list[2].append(1)
+            graph.mark_modified()
+            self.assertEqual(graph.adjacency_list, [[], [2], [1]])
+            self.assertTrue(graph.has_edge(1, 2))
+            graph.remove_edge(1, 2)
+            self.assertEqual(graph.adjacency_list, [[], [], []])
+
+    def test_fingerprint(self):
+        for _ in range(20):
+            vertex_count = random.randrange(1, 30)
+            graph = Graph.generate_with_gnl_model(
+                vertex_count, random.randrange(vertex_count * (vertex_count - 1) // 2 + 1))
+
+            # relabel the vertices with a random permutation
+            permutation = list(range(vertex_count))
+            random.shuffle(permutation)
+            relabelled = Graph.empty(vertex_count)
+            for vertex_a, row in enumerate(graph.adjacency_list):
+                for vertex_b in row:
+                    if vertex_a < vertex_b:
+                        relabelled.add_edge(permutation[vertex_a], permutation[vertex_b])
+
+            self.assertEqual(graph.fingerprint(), relabelled.fingerprint())
+
+        path = Graph([[1], [0, 2], [1, 3], [2]])
+        star = Graph([[1, 2, 3], [0], [0], [0]])
+        self.assertNotEqual(path.fingerprint(), star.fingerprint())
+
+        # colour refinement can't tell apart regular graphs with equal degrees, so two
+        # triangles and a hexagon share a fingerprint despite not being isomorphic
+        self.assertEqual(
+            Graph([[1, 2], [0, 2], [0, 1], [4, 5], [3, 5], [3, 4]]).fingerprint(),
+            Graph([[1, 5], [0, 2], [1, 3], [2, 4], [3, 5], [4, 0]]).fingerprint())
+
+    def test_representation_conversions(self):
+        with open("test/resources/graph_representations/adjlist.txt", encoding="utf-8") as file:
+            adjacency_list = Graph.parse(file.read()).adjacency_list
+        with open("test/resources/graph_representations/adjmatrix.txt", encoding="utf-8") as file:
+            adjacency_matrix = [[int(v) for v in line.split()] for line in file]
+        with open("test/resources/graph_representations/incmatrix.txt", encoding="utf-8") as file:
+            incidence_matrix = [[int(v) for v in line.split()] for line in file]
+
+        self.assertEqual(Graph.adjacency_list_to_adjacency_matrix(adjacency_list),
+                         adjacency_matrix)
+        self.assertEqual(Graph.adjacency_list_to_incidence_matrix(adjacency_list),
+                         incidence_matrix)
+        self.assertEqual(Graph.adjacency_matrix_to_adjacency_list(adjacency_matrix),
+                         adjacency_list)
+        self.assertEqual(Graph.incidence_matrix_to_adjacency_list(incidence_matrix),
+                         adjacency_list)
+        self.assertEqual(Graph.adjacency_matrix_to_adjacency_list([]), [])
+        self.assertEqual(Graph.incidence_matrix_to_adjacency_list([[], []]), [[], []])
+
+        try:
+            import scipy.sparse  # pylint: disable=import-outside-toplevel,unused-import
+        except ImportError:
+            self.skipTest("scipy is not installed")
+
+        sparse_adjacency = Graph.adjacency_list_to_adjacency_matrix(adjacency_list, sparse=True)
+        sparse_incidence = Graph.adjacency_list_to_incidence_matrix(adjacency_list, sparse=True)
+        self.assertEqual(sparse_adjacency.toarray().tolist(), adjacency_matrix)
+        self.assertEqual(sparse_incidence.toarray().tolist(), incidence_matrix)
+        self.assertEqual(Graph.adjacency_matrix_to_adjacency_list(sparse_adjacency),
+                         adjacency_list)
+        self.assertEqual(Graph.incidence_matrix_to_adjacency_list(sparse_incidence),
+                         adjacency_list)
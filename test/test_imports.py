@@ -0,0 +1,43 @@
+import subprocess
+import sys
+from unittest import TestCase
+
+# upper bound for importing the graph package in a fresh interpreter, in seconds.
+# the package itself only needs NumPy, which takes about half of this on its own
+IMPORT_TIME_BUDGET = 0.25
+
+PLOTTING_MODULES = ["matplotlib", "networkx", "pygraphviz"]
+
+# modules only needed by some methods, which import them when they are called
+DEFERRED_MODULES = ["concurrent.futures", "multiprocessing", "scipy"]
+
+
+class ImportTestCase(TestCase):
+    """Test the cost of importing the graph package"""
+
+    def run_python(self, code: str) -> str:
+        return subprocess.run([sys.executable, "-c", code], check=True,
+                              capture_output=True, text=True).stdout
+
+    def test_plotting_modules_not_imported(self):
+        output = self.run_python(
+            "import sys\n"
+            "import graph\n"
+            f"print(*[m for m in {PLOTTING_MODULES!r} if m in sys.modules])\n")
+        self.assertEqual(output.split(), [])
+
+    def test_deferred_modules_not_imported(self):
+        output = self.run_python(
+            "import sys\n"
+            "import graph\n"
+            f"print(*[m for m in {DEFERRED_MODULES!r} if m in sys.modules])\n")
+        self.assertEqual(output.split(), [])
+
+    def test_import_time_budget(self):
+        # the best of several runs, so a busy machine doesn't fail the test
+        durations = [float(self.run_python(
+            "import time\n"
+            "start = time.perf_counter()\n"
+            "import graph\n"
+            "print(time.perf_counter() - start)\n")) for _ in range(3)]
+        self.assertLess(min(durations), IMPORT_TIME_BUDGET)
@@ -0,0 +1,79 @@
+from unittest import TestCase
+import numpy as np
+
+from graph.sampling import (decode_ordered_pairs, decode_pairs, encode_pairs, pair_count,
+                            sample_bernoulli, sample_distinct, sample_regular_edges)
+
+
+class SamplingTestCase(TestCase):
+    """Test helpers for sampling random graphs"""
+
+    def test_decode_pairs(self):
+        for n in [0, 1, 2, 3, 10, 101]:
+            rows, columns = decode_pairs(n, np.arange(pair_count(n)))
+            self.assertEqual(list(zip(rows.tolist(), columns.tolist())),
+                             [(i, j) for i in range(n) for j in range(i + 1, n)])
+
+        n = 10 ** 6
+        rows, columns = decode_pairs(n, np.array([pair_count(n) - 1]))
+        self.assertEqual((rows[0], columns[0]), (n - 2, n - 1))
+
+    def test_encode_pairs(self):
+        n = 10
+        rows, columns = decode_pairs(n, np.arange(pair_count(n)))
+        self.assertEqual(encode_pairs(n, rows, columns).tolist(), list(range(pair_count(n))))
+        self.assertEqual(encode_pairs(n, columns, rows).tolist(), list(range(pair_count(n))))
+
+    def test_decode_ordered_pairs(self):
+        for n in [0, 1, 2, 3, 10]:
+            rows, columns = decode_ordered_pairs(n, np.arange(n * (n - 1)))
+            self.assertEqual(list(zip(rows.tolist(), columns.tolist())),
+                             [(i, j) for i in range(n) for j in range(n) if i != j])
+
+    def test_sample_bernoulli(self):
+        rng = np.random.default_rng(12345)
+        self.assertEqual(len(sample_bernoulli(100, 0, rng)), 0)
+        self.assertEqual(sample_bernoulli(100, 1, rng).tolist(), list(range(100)))
+        self.assertEqual(len(sample_bernoulli(0, 0.5, rng)), 0)
+
+        sample = sample_bernoulli(10 ** 6, 0.01, rng, chunk_size=1000)
+        self.assertTrue((np.diff(sample) > 0).all())
+        self.assertTrue(0 <= sample[0] and sample[-1] < 10 ** 6)
+        self.assertTrue(abs(len(sample) - 10 ** 4) < 500, len(sample))
+
+        # every index should be included about equally often
+        counts = np.bincount(np.concatenate(
+            [sample_bernoulli(10, 0.3, rng) for _ in range(3000)]), minlength=10)
+        self.assertTrue((np.abs(counts - 900) < 150).all(), counts)
+
+    def test_sample_distinct(self):
+        rng = np.random.default_rng(12345)
+        for total, count in [(0, 0), (10, 0), (10, 3), (10, 7), (10, 10), (1000, 999)]:
+            sample = sample_distinct(total, count, rng)
+            self.assertEqual(len(sample), count)
+            self.assertEqual(len(np.unique(sample)), count)
+            self.assertTrue(((sample >= 0) & (sample < total)).all())
+
+        # every value should be picked about equally often
+        counts = np.bincount(np.concatenate(
+            [sample_distinct(10, 3, rng) for _ in range(3000)]), minlength=10)
+        self.assertTrue((np.abs(counts - 900) < 150).all(), counts)
+
+    def test_sample_regular_edges(self):
+        rng = np.random.default_rng(12345)
+        for n, k in [(1, 0), (4, 1), (7, 2), (8, 3), (10, 6), (9, 8), (1000, 10)]:
+            first, second = sample_regular_edges(n, k, rng)
+            self.assertEqual(len(first), n * k // 2)
+            self.assertFalse((first == second).any())
+            self.assertEqual(len(np.unique(encode_pairs(n, first, second))), len(first))
+            self.assertEqual(np.bincount(np.concatenate((first, second)),
+                                         minlength=n).tolist(), [k] * n)
+
+        # both 2-regular graphs on 6 vertices, a hexagon and two triangles, should appear
+        shapes = set()
+        for _ in range(100):
+            first, second = sample_regular_edges(6, 2, rng)
+            keys = set(encode_pairs(6, first, second).tolist())
+            neighbours = np.concatenate((second[first == 0], first[second == 0]))
+            shapes.add(int(encode_pairs(6, neighbours[:1], neighbours[1:])[0]) in keys)
+        self.assertEqual(shapes, {False, True})
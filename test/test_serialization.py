@@ -0,0 +1,134 @@
+from io import BytesIO, StringIO, TextIOWrapper
+import os
+import tempfile
+from unittest import TestCase
+
+from graph import Digraph, Graph, WeightedDigraph, WeightedGraph
+from graph.serialization import read_adjacency_list, read_binary, read_incidence_matrix, \
+    tokenize_lines
+
+
+class SerializationTestCase(TestCase):
+    """Test reading and writing graph text formats"""
+
+    def test_tokenize_lines(self):
+        counts, values = tokenize_lines(b"1 2 3\n\n-4  5\n6")
+        self.assertEqual(counts.tolist(), [3, 0, 2, 1])
+        self.assertEqual(values.tolist(), [1, 2, 3, -4, 5, 6])
+
+        self.assertRaises(ValueError, tokenize_lines, b"1 2x\n")
+        self.assertRaises(ValueError, tokenize_lines, b"1-2\n")
+
+    def test_chunked_reading(self):
+        with open("test/resources/graph_representations/adjlist.txt", encoding="utf-8") as file:
+            string = file.read()
+        expected = Graph.parse(string)
+
+        for chunk_size in [1, 2, 7, 64, 1 << 20]:
+            csr = read_adjacency_list(StringIO(string), chunk_size=chunk_size)
+            self.assertEqual(Graph.from_csr(csr), expected)
+
+            csr = read_adjacency_list(BytesIO(string.encode()), chunk_size=chunk_size)
+            self.assertEqual(Graph.from_csr(csr), expected)
+
+        with open("test/resources/graph_representations/incmatrix.txt", encoding="utf-8") as file:
+            csr = read_incidence_matrix(file, chunk_size=5)
+        self.assertEqual(Graph.from_csr(csr), expected)
+
+    def test_parse_file(self):
+        for representation in ["adjlist", "adjmatrix", "incmatrix"]:
+            path = f"test/resources/graph_representations/{representation}.txt"
+            with open(path, encoding="utf-8") as file:
+                self.assertEqual(Graph.parse_file_with_representation(path, representation),
+                                 Graph.parse_with_representation(file.read(), representation))
+
+        string = "1:5 2:-3\n\n0:7\n"
+        graph = WeightedDigraph.parse_file(StringIO(string))
+        self.assertEqual(graph.dump(), string)
+        self.assertRaises(ValueError, WeightedDigraph.parse, "1:5 2\n")
+
+    def test_dump_to(self):
+        with open("test/resources/graph_representations/adjlist.txt", encoding="utf-8") as file:
+            graph = Graph.parse_file(file)
+
+        for representation in ["adjlist", "adjmatrix", "incmatrix"]:
+            writes = []
+
+            class RecordingFile:
+                """Minimal writable file object recording every write call"""
+
+                def write(self, string):
+                    writes.append(string)
+
+            with open(f"test/resources/graph_representations/{representation}.txt",
+                      encoding="utf-8") as file:
+                expected = file.read()
+
+            graph.dump_to(RecordingFile(), representation)  # type: ignore
+            self.assertEqual("".join(writes), expected)
+
+        self.assertEqual(Graph([]).dump_with_representation("adjmatrix"), "")
+        self.assertEqual(Graph([[], []]).dump_with_representation("incmatrix"), "\n\n")
+
+    def test_binary_round_trip(self):
+        graphs = [
+            Graph([[1, 2], [0], [0], []]),
+            Digraph([[1], [2], [0, 1]]),
+            WeightedGraph.parse("1:3 2:-4\n0:3\n0:-4\n"),
+            WeightedDigraph.parse("1:5\n\n0:7 1:2\n"),
+            Digraph([]),
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            for index, graph in enumerate(graphs):
+                path = os.path.join(directory, f"{index}.bin")
+                graph.dump_binary(path)
+
+                csr = read_binary(path)
+                if graph.edge_count > 0:
+                    # the arrays are views into the mapped file
+                    self.assertFalse(csr.indices.flags.owndata)
+                self.assertEqual(csr, graph.to_csr())
+                self.assertEqual(type(graph).parse_binary(path), graph)
+
+                buffer = BytesIO()
+                graph.dump_binary(buffer)
+                buffer.seek(0)
+                self.assertEqual(type(graph).parse_binary(buffer), graph)
+
+        self.assertRaises(ValueError, read_binary, BytesIO(b"0 1\n1 0\n"))
+        self.assertRaises(ValueError, Digraph.parse_binary, BytesIO(b""))
+
+    def test_binary_is_not_text(self):
+        graph = Graph([[1], [0]])
+        self.assertRaises(ValueError, graph.dump_with_representation, "binary")
+        self.assertRaises(ValueError, graph.dump_to, StringIO(), "binary")
+
+        # text files write it to their underlying binary buffer
+        buffer = BytesIO()
+        text = TextIOWrapper(buffer, encoding="utf-8")
+        graph.dump_to(text, "binary")
+        buffer.seek(0)
+        self.assertEqual(Graph.parse_binary(buffer), graph)
+
+    def test_parse_binary_keeps_arrays_mapped(self):
+        graph = Graph([[1, 2], [0], [0], []])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "graph.bin")
+            graph.dump_binary(path)
+
+            loaded = Graph.parse_binary(path)
+            self.assertEqual(loaded.vertex_count, 4)
+            self.assertEqual(loaded.edge_count, 2)
+            self.assertEqual(loaded.vertex_degrees, [2, 1, 1, 0])
+            # the arrays are still views into the mapped file
+            self.assertFalse(loaded.to_csr().indices.flags.owndata)
+
+            # adjacency lists are built on first access, after which the graph
+            # is an ordinary mutable graph
+            self.assertEqual(loaded.adjacency_list, graph.adjacency_list)
+            loaded.add_edge(2, 3)
+            self.assertEqual(loaded.edge_count, 3)
+            self.assertTrue(loaded.to_csr().indices.flags.owndata)
+
+            loaded = Graph.parse_file_with_representation(path, "binary")
+            self.assertEqual(loaded, graph)
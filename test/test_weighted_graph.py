@@ -0,0 +1,63 @@
+from unittest import TestCase
+import numpy as np
+
+from graph import IWeightedGraph, WeightedGraph
+
+
+class WeightedGraphTestCase(TestCase):
+    """Test WeightedGraph class"""
+
+    def test_parse_and_dump(self):
+        string = "1:3 2:1\n0:3 2:-1\n0:1 1:-1\n\n"
+        graph = WeightedGraph.parse(string)
+        self.assertEqual(graph.dump(), string)
+        self.assertEqual(graph, WeightedGraph.parse(string))
+        self.assertEqual(graph.adjacency_list[0][0], IWeightedGraph.Adjacency(1, 3))
+        self.assertEqual(graph.adjacency_list[1][1].vertex, 2)
+        self.assertEqual(graph.adjacency_list[1][1].weight, -1)
+
+        for malformed in ["1 3\n0:3\n", "1 :3\n0:3\n", "1:3:4 2\n", "1::3\n", "1:3\n0: 3\n"]:
+            self.assertRaises(ValueError, WeightedGraph.parse, malformed)
+
+    def test_dijkstra(self):
+        graph = WeightedGraph.parse("1:3 2:1\n0:3 2:1\n0:1 1:1\n")
+        self.assertEqual(graph.dijkstra(0), ([0, 2, 1], [None, 2, 0]))
+
+    def test_min_spanning_tree(self):
+        graph = WeightedGraph.parse("1:3 2:1\n0:3 2:1\n0:1 1:1\n")
+        self.assertEqual(graph.min_spanning_tree(),
+                         WeightedGraph.parse("2:1\n2:1\n0:1 1:1\n"))
+
+    def test_edge_weight(self):
+        graph = WeightedGraph.parse("1:3 2:1\n0:3 2:1\n0:1 1:1\n")
+        self.assertEqual(graph.edge_weight(0, 1), 3)
+        self.assertTrue(graph.has_edge(2, 1))
+        graph.remove_edge(1, 2)
+        self.assertFalse(graph.has_edge(2, 1))
+        self.assertRaises(ValueError, graph.edge_weight, 1, 2)
+        self.assertEqual(graph.edge_count, 2)
+
+        # every parallel entry is removed, and missing edges are ignored
+        graph = WeightedGraph.parse("1:3 1:5 2:1\n0:3 0:5\n0:1\n")
+        graph.remove_edge(0, 1)
+        self.assertEqual(graph, WeightedGraph.parse("2:1\n\n0:1\n"))
+        graph.remove_edge(0, 1)
+        self.assertEqual(graph.edge_count, 1)
+
+    def test_generate_weighted_connected(self):
+        for n, l in [(1, 0), (10, 9), (10, 12), (40, 45)]:
+            graph = WeightedGraph.generate_weighted_connected(n, l)
+            self.assertEqual(graph.edge_count, l)
+            self.assertTrue(all(d < 1e7 for d in graph.dijkstra(0)[0]))
+
+        # the structure and the weights are drawn from the same generator
+        self.assertEqual(
+            WeightedGraph.generate_weighted_connected(40, 45, np.random.default_rng(12345)),
+            WeightedGraph.generate_weighted_connected(40, 45, np.random.default_rng(12345)))
+
+    def test_fingerprint(self):
+        graph = WeightedGraph.parse("1:3 2:1\n0:3\n0:1\n")
+        relabelled = WeightedGraph.parse("2:1\n2:3\n0:1 1:3\n")
+        reweighted = WeightedGraph.parse("1:3 2:2\n0:3\n0:2\n")
+        self.assertEqual(graph.fingerprint(), relabelled.fingerprint())
+        self.assertNotEqual(graph.fingerprint(), reweighted.fingerprint())